@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Benchmark retrieval-augmented single-shot answering against the tool-using agent
+Runs the same questions through VoiceDigitalTwin with and without the fast
+path against a local stub LLM (an OpenAI-compatible endpoint answering after a
+fixed delay) and reports LLM calls per turn and end-to-end latency. The stub
+behaves like a ReAct model: without knowledge in the prompt it first calls the
+"Search Knowledge Base" tool, then answers.
+
+Usage:
+    python benchmark_fast_path.py [--llm-latency 0.5] [--repeat 1]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+QUESTIONS = [
+    "What is your research about?",
+    "Which programming languages do you use?",
+    "Where did you study before Harvard?",
+    "What is SpatialAssignR?",
+    "What spatial transcriptomics technologies have you worked with?",
+    "What are you working on at Boston Children's Hospital?",
+    "What awards have you received?",
+    "Can you introduce yourself?",
+]
+
+
+def start_stub_llm(latency):
+    """
+    Serve an OpenAI-compatible /v1/chat/completions endpoint after `latency`
+    seconds per call: a tool call first, then a final answer, unless the
+    prompt already contains retrieved knowledge
+    """
+    state = {"calls": 0}
+    lock = threading.Lock()
+
+    class StubLLMHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with lock:
+                state["calls"] += 1
+            time.sleep(latency)
+
+            messages = request.get("messages", [])
+            prompt = "\n".join(str(m.get("content", "")) for m in messages)
+            question = str(messages[-1].get("content", ""))[-80:] if messages else ""
+            if "Knowledge base excerpts" in prompt:
+                content = f"This is a stub answer from retrieved knowledge about: {question}"
+            elif "Observation:" in prompt:
+                content = ("Thought: I now can give a great answer\n"
+                           f"Final Answer: This is a stub answer about: {question}")
+            else:
+                content = ("Thought: I should look this up in the knowledge base\n"
+                           "Action: Search Knowledge Base\n"
+                           f"Action Input: {json.dumps({'query': question})}")
+
+            data = json.dumps({
+                "id": "stub", "object": "chat.completion", "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLMHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def run_mode(fast_path, questions, state):
+    """Answer every question; returns per-turn dicts"""
+    from digital_twin_like.voice_agent import VoiceDigitalTwin
+
+    twin = VoiceDigitalTwin(whisper_model="base", use_response_cache=False, warm_up_stt=False,
+                            fast_path=fast_path)
+    twin.conversation_crew  # build outside the timed turns
+
+    turns = []
+    for question in questions:
+        calls_before = state["calls"]
+        start = time.perf_counter()
+        twin.respond_to_text(question)
+        turns.append({
+            "latency_s": time.perf_counter() - start,
+            "llm_calls": state["calls"] - calls_before,
+            "path": twin.last_turn_timings.get("path"),
+        })
+    return turns
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub LLM delay in seconds")
+    parser.add_argument("--repeat", type=int, default=1, help="Times to ask each question")
+    args = parser.parse_args()
+
+    llm_server, state = start_stub_llm(args.llm_latency)
+    stub_url = f"http://127.0.0.1:{llm_server.server_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_API_BASE"] = stub_url
+    os.environ["OPENAI_BASE_URL"] = stub_url
+
+    questions = QUESTIONS * args.repeat
+    results = {
+        "Agent (tools)": run_mode(False, questions, state),
+        "Fast path": run_mode(True, questions, state),
+    }
+
+    print("\n" + "="*60)
+    print("FAST PATH BENCHMARK")
+    print("="*60)
+    print(f"{len(questions)} questions, stub LLM latency {args.llm_latency:.2f}s per call\n")
+
+    for name, turns in results.items():
+        latencies = sorted(t["latency_s"] for t in turns)
+        calls = sum(t["llm_calls"] for t in turns)
+        fast = sum(t["path"] == "fast" for t in turns)
+        print(f"{name:<14} LLM calls/turn {calls / len(turns):.2f}  "
+              f"latency mean {sum(latencies) / len(latencies):.2f}s "
+              f"p50 {latencies[len(latencies) // 2]:.2f}s max {latencies[-1]:.2f}s  "
+              f"({fast}/{len(turns)} turns on the fast path)")
+
+    for question, agent, fast in zip(questions, *results.values()):
+        print(f"  {question[:48]:<50} {agent['llm_calls']} -> {fast['llm_calls']} calls "
+              f"({fast['path']})")
+    print("="*60 + "\n")
+    llm_server.shutdown()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Benchmark cold start of the knowledge base: raw files vs the compiled bundle
+For synthetic corpora of increasing size (copies of knowledge/ with varied
+vocabulary), a fresh process either reads every file and builds the BM25 index
+in memory, or maps the compiled bundle, then answers one search. Reports
+time to the first result and peak RSS of that process.
+
+Usage:
+    python benchmark_knowledge_bundle.py [--sizes 10 100 1000] [--query "spatial transcriptomics"]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+KNOWLEDGE_DIR = Path(__file__).parent / "knowledge"
+
+COLD_START = """
+import json, resource, sys, time
+
+
+def peak_rss_mb():
+    # ru_maxrss is inherited across exec from the parent, VmHWM is not
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+start = time.perf_counter()
+mode, knowledge_dir, bundle_path, query = sys.argv[1:5]
+if mode == "raw":
+    from digital_twin_like.tools.knowledge_index import KnowledgeIndex
+    from digital_twin_like.tools.knowledge_store import KnowledgeStore
+    index = KnowledgeIndex()
+    index.sync(KnowledgeStore(knowledge_dir).load_all())
+else:
+    from digital_twin_like.tools.knowledge_bundle import KnowledgeBundle
+    index = KnowledgeBundle(bundle_path)
+ready = time.perf_counter()
+results = index.search(query)
+done = time.perf_counter()
+print(json.dumps({"ready_s": ready - start, "first_search_s": done - ready, "total_s": done - start,
+                  "results": len(results),
+                  "peak_rss_mb": peak_rss_mb()}))
+"""
+
+
+def make_corpus(directory, n_docs):
+    """Write n_docs markdown files derived from the real knowledge files"""
+    sources = [p.read_text() for p in sorted(KNOWLEDGE_DIR.glob("*.md"))]
+    for i in range(n_docs):
+        text = sources[i % len(sources)]
+        # Vary the vocabulary so the index grows with the corpus
+        text = text.replace("research", f"research{i}").replace("data", f"data{i % 97}")
+        (directory / f"doc_{i:05d}.md").write_text(text)
+
+
+def cold_start(mode, knowledge_dir, bundle_path, query):
+    """Measure one mode in a fresh interpreter"""
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent / "src"))
+    output = subprocess.run([sys.executable, "-c", COLD_START, mode, str(knowledge_dir),
+                             str(bundle_path), query],
+                            check=True, capture_output=True, text=True, env=env).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Corpus sizes in documents")
+    parser.add_argument("--query", default="spatial transcriptomics research")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).parent / "src"))
+    from digital_twin_like.tools.knowledge_bundle import build_bundle
+
+    print("\n" + "="*60)
+    print("KNOWLEDGE BUNDLE BENCHMARK")
+    print("="*60)
+
+    for n_docs in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            knowledge_dir = Path(tmp) / "knowledge"
+            knowledge_dir.mkdir()
+            make_corpus(knowledge_dir, n_docs)
+            bundle_path = Path(tmp) / "knowledge.bundle"
+
+            start = time.perf_counter()
+            build_bundle(knowledge_dir, bundle_path)
+            build_s = time.perf_counter() - start
+
+            print(f"\n{n_docs} documents (bundle {bundle_path.stat().st_size / 1024:.0f} KB, "
+                  f"built in {build_s:.2f}s)")
+            for mode, name in (("raw", "Raw files + index"), ("bundle", "Mapped bundle")):
+                result = cold_start(mode, knowledge_dir, bundle_path, args.query)
+                print(f"  {name:<18} ready {result['ready_s'] * 1000:8.1f} ms  "
+                      f"first search {result['first_search_s'] * 1000:7.1f} ms  "
+                      f"total {result['total_s'] * 1000:8.1f} ms  "
+                      f"peak RSS {result['peak_rss_mb']:6.1f} MB")
+    print("="*60 + "\n")
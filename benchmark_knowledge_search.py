@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Benchmark knowledge retrieval: original substring scan vs BM25 vs semantic search
+Reports recall (does the returned context contain the answer?) and latency per query
+"""
+import time
+
+from digital_twin_like.tools.knowledge_store import get_knowledge_store
+from digital_twin_like.tools.knowledge_index import get_knowledge_index
+from digital_twin_like.tools.semantic_search import SemanticIndex, create_embedder
+
+
+# (question, text that must appear in the retrieved context)
+QUERIES = [
+    ("spatial transcriptomics", "MERFISH"),
+    ("What do you study?", "neural stem cell"),
+    ("Where did you go to school?", "University of Toronto"),
+    ("What was your GPA at Harvard?", "3.86"),
+    ("Which programming languages do you use?", "Python"),
+    ("Have you won any awards?", "UTSW"),
+    ("What tools have you built?", "SpatialAssignR"),
+    ("Do you have cloud experience?", "AWS"),
+    ("Where do you work?", "Boston Children's Hospital"),
+    ("What journals have you published in?", "Nature Neuroscience"),
+    ("deep learning frameworks", "PyTorch"),
+    ("How does pregnancy affect the brain?", "pregnancy"),
+]
+
+REPEATS = 50
+
+
+def legacy_search(query, documents):
+    """The original search_knowledge: per-line substring scan with ±2 lines of context"""
+    results = []
+    query_lower = query.lower()
+    for content in documents.values():
+        if query_lower in content.lower():
+            lines = content.split('\n')
+            relevant_lines = []
+            for i, line in enumerate(lines):
+                if query_lower in line.lower():
+                    relevant_lines.extend(lines[max(0, i-2):min(len(lines), i+3)])
+            if relevant_lines:
+                results.append('\n'.join(relevant_lines))
+    return '\n'.join(results)
+
+
+def passages_text(results):
+    return '\n'.join(f"{r['section']}\n{r['text']}" for r in results)
+
+
+def run_benchmark(name, search):
+    hits = 0
+    context_chars = 0
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for query, answer in QUERIES:
+            search(query)
+    elapsed = time.perf_counter() - start
+
+    for query, answer in QUERIES:
+        context = search(query)
+        context_chars += len(context)
+        if answer.lower() in context.lower():
+            hits += 1
+
+    per_query_ms = elapsed / (REPEATS * len(QUERIES)) * 1000
+    print(f"{name:<28} recall {hits:>2}/{len(QUERIES)}   "
+          f"{per_query_ms:7.3f} ms/query   {context_chars / len(QUERIES):7.0f} chars/answer")
+
+
+if __name__ == "__main__":
+    documents = get_knowledge_store().load_all()
+    index = get_knowledge_index()
+
+    print("\n" + "="*78)
+    print("KNOWLEDGE SEARCH BENCHMARK")
+    print("="*78)
+    print(f"{len(documents)} files, {len(index)} passages, {len(QUERIES)} queries x {REPEATS} repeats\n")
+
+    run_benchmark("Substring scan (original)", lambda q: legacy_search(q, documents))
+    run_benchmark("BM25 inverted index", lambda q: passages_text(index.search(q, top_k=5)))
+
+    embedders = [create_embedder("hashed")]
+    local_model = create_embedder("auto")
+    if local_model.name != embedders[0].name:
+        embedders.append(local_model)
+
+    for embedder in embedders:
+        semantic = SemanticIndex(embedder=embedder)
+        semantic.sync(documents)
+        run_benchmark(f"Semantic ({embedder.name})"[:28],
+                      lambda q: passages_text(semantic.search(q, top_k=3)))
+
+    print()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Benchmark per-utterance transcription overhead:
+original temp-WAV round trip (write + ffmpeg decode) vs passing the array in memory
+
+Usage:
+    python benchmark_transcription.py [recording.wav] [--model base] [--runs 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+import whisper
+
+from digital_twin_like.speech_to_text import SpeechToText, prepare_audio
+
+
+def legacy_prepare(audio_data, sample_rate):
+    """The original path: write a temp WAV and let Whisper re-decode it via ffmpeg"""
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
+        tmp_path = tmp_file.name
+    try:
+        sf.write(tmp_path, audio_data, sample_rate)
+        return whisper.load_audio(tmp_path)
+    finally:
+        os.remove(tmp_path)
+
+
+def load_input(path):
+    if path:
+        audio, sample_rate = sf.read(path, dtype="float32")
+        return audio, sample_rate
+    # 5 seconds of low-level noise stands in for a recorded utterance
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(5 * 16000) * 0.01).astype(np.float32), 16000
+
+
+def time_it(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("wav", nargs="?", help="Recording to transcribe (default: 5 s of noise)")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--runs", type=int, default=5, help="Repetitions per measurement")
+    args = parser.parse_args()
+
+    audio, sample_rate = load_input(args.wav)
+    stt = SpeechToText(model_size=args.model)
+
+    print("\n" + "="*60)
+    print("TRANSCRIPTION BENCHMARK")
+    print("="*60)
+    print(f"Input: {len(audio) / sample_rate:.1f} s at {sample_rate} Hz, model '{args.model}'\n")
+
+    legacy_prep = time_it(lambda: legacy_prepare(audio, sample_rate), args.runs)
+    memory_prep = time_it(lambda: prepare_audio(audio, sample_rate), args.runs)
+    print(f"Audio preparation  temp WAV + ffmpeg: {legacy_prep * 1000:8.1f} ms")
+    print(f"Audio preparation  in memory:         {memory_prep * 1000:8.1f} ms")
+
+    legacy_total = time_it(
+        lambda: stt.model.transcribe(legacy_prepare(audio, sample_rate), language="en"), args.runs)
+    memory_total = time_it(lambda: stt.transcribe_audio(audio, sample_rate), args.runs)
+    print(f"\nEnd to end         temp WAV + ffmpeg: {legacy_total * 1000:8.1f} ms")
+    print(f"End to end         in memory:         {memory_total * 1000:8.1f} ms")
+    print(f"\nSaving per utterance: {(legacy_total - memory_total) * 1000:.1f} ms")
+    print("="*60 + "\n")
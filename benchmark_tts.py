@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""
+Benchmark single-shot vs sentence-chunked parallel synthesis in AdvancedTTS
+Reports total synthesis time and time until the first chunk is ready to play
+
+With --stub, the OpenAI/ElevenLabs backends talk to a local stub HTTP server
+that streams PCM, so pooled vs per-request clients, streaming time-to-first-audio
+and retries can be measured without API keys.
+
+Usage:
+    python benchmark_tts.py [--backend gtts] [--workers 4]
+    python benchmark_tts.py --backend openai --stub [--stub-latency 0.2] [--stub-failures 1]
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+from digital_twin_like.advanced_tts import PCM_SAMPLE_RATE, AdvancedTTS
+from digital_twin_like.streaming_speech import split_sentences
+
+
+# Roughly the length of an introduction_task answer (3-4 paragraphs)
+SAMPLE_TEXT = """Hello everyone! I'm Tim Cao, a graduate student in Computational Biology and
+Quantitative Genetics at Harvard. Before Harvard, I studied Statistics, Biochemistry and
+Immunology at the University of Toronto, where I graduated with High Distinction.
+
+My research sits at the intersection of neuroscience and computation. At Boston Children's
+Hospital, I study how pregnancy remodels the neural stem cell niche, using spatial
+transcriptomics technologies like MERFISH, Xenium and Visium HD to map cells in their
+native tissue context.
+
+On the technical side, I work mostly in Python and R. I build reproducible pipelines for
+spatial omics data, and I developed SpatialAssignR, a tool for anatomical segmentation
+that is now a lab standard. I enjoy turning hours of manual processing into minutes.
+
+Outside of research, I love explaining complex ideas clearly, and I'm excited to keep
+building tools that help scientists understand biological systems."""
+
+
+def time_single_shot(tts, text):
+    start = time.perf_counter()
+    tts.synthesize(text)
+    total = time.perf_counter() - start
+    return total, total
+
+
+def start_stub_server(latency, failures, chars_per_second=15):
+    """
+    Serve fake OpenAI (/v1/audio/speech) and ElevenLabs (/v1/text-to-speech/<voice>/stream)
+    endpoints streaming silent 24 kHz PCM in real time after `latency` seconds
+
+    The first `failures` requests get a 503 to exercise retries.
+    """
+    state = {"requests": 0, "connections": set()}
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with lock:
+                state["requests"] += 1
+                state["connections"].add(self.client_address)
+                fail = state["requests"] <= failures
+
+            if fail:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            text = body.get("input") or body.get("text") or ""
+            seconds = max(len(text) / chars_per_second, 0.5)
+            chunk = bytes(int(PCM_SAMPLE_RATE * 0.1) * 2)  # 100 ms of silence
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/pcm")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for _ in range(int(seconds * 10)):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                time.sleep(0.01)  # faster than real time, like the real APIs
+            self.wfile.write(b"0\r\n\r\n")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def time_first_audio(tts, text):
+    start = time.perf_counter()
+    first = None
+    for _ in tts._iter_samples(text):
+        if first is None:
+            first = time.perf_counter() - start
+    return time.perf_counter() - start, first
+
+
+def time_new_client(make_tts, text):
+    start = time.perf_counter()
+    tts = make_tts()
+    tts.synthesize(text)
+    tts.close()
+    total = time.perf_counter() - start
+    return total, total
+
+
+def time_chunked(tts, text):
+    sentences = split_sentences(text)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=tts.chunk_workers) as executor:
+        futures = [executor.submit(tts.synthesize, s, True) for s in sentences]
+        futures[0].result()
+        first = time.perf_counter() - start
+        for future in futures:
+            future.result()
+    total = time.perf_counter() - start
+    return total, first
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", default="gtts", help="gtts, openai, elevenlabs or kokoro")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel chunk workers")
+    parser.add_argument("--runs", type=int, default=3, help="Repetitions per mode")
+    parser.add_argument("--stub", action="store_true",
+                        help="Point openai/elevenlabs at a local stub server")
+    parser.add_argument("--stub-latency", type=float, default=0.2,
+                        help="Stub server delay before the first audio byte")
+    parser.add_argument("--stub-failures", type=int, default=0,
+                        help="Number of initial stub requests answered with 503")
+    args = parser.parse_args()
+
+    load_dotenv()
+    options = {}
+    server = state = None
+    if args.stub:
+        server, state = start_stub_server(args.stub_latency, args.stub_failures)
+        root = f"http://127.0.0.1:{server.server_port}"
+        options = {"api_key": "stub", "retry_backoff": 0.1,
+                   "base_url": f"{root}/v1" if args.backend == "openai" else root}
+
+    # The audio cache is disabled so every run really synthesizes
+    def make_tts():
+        return AdvancedTTS(backend=args.backend, use_cache=False,
+                           chunk_workers=args.workers, **options)
+    tts = make_tts()
+    # Time chunked synthesis with the Kokoro worker processes already running
+    tts.prepare_chunked(wait=True)
+
+    print("\n" + "="*60)
+    print("TTS SYNTHESIS BENCHMARK")
+    print("="*60)
+    print(f"Backend: {tts.backend}, {len(SAMPLE_TEXT)} chars, "
+          f"{len(split_sentences(SAMPLE_TEXT))} chunks, {args.workers} workers\n")
+
+    modes = [("Single-shot", lambda text: time_single_shot(tts, text)),
+             ("Chunked parallel", lambda text: time_chunked(tts, text))]
+    if tts.backend in ("openai", "elevenlabs"):
+        modes += [("Streamed", lambda text: time_first_audio(tts, text)),
+                  ("New client/call", lambda text: time_new_client(make_tts, text))]
+
+    for name, fn in modes:
+        results = [fn(SAMPLE_TEXT) for _ in range(args.runs)]
+        total = sum(r[0] for r in results) / len(results)
+        first = sum(r[1] for r in results) / len(results)
+        print(f"{name:<18} total {total:6.2f}s   first chunk {first:6.2f}s")
+
+    tts.close()
+    if server is not None:
+        print(f"\nStub server: {state['requests']} requests over "
+              f"{len(state['connections'])} TCP connections")
+        server.shutdown()
+    print("="*60 + "\n")
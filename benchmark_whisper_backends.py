@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Benchmark Whisper inference backends on CPU
+Each backend (torch fp32, dynamically quantized int8, faster-whisper if
+installed) runs in its own process so load time and peak memory are measured
+in isolation, then transcribes the same recordings. Reports the real-time
+factor, peak resident memory and word error rate against reference transcripts
+(<name>.txt next to each WAV; without one the torch transcript is the reference).
+
+Usage:
+    python benchmark_whisper_backends.py [a.wav b.wav ...] [--model base] [--threads 4]
+    python benchmark_whisper_backends.py --backends torch int8     # skip faster-whisper
+
+Without WAV arguments a few spoken sample sentences are generated with gTTS
+(needs network once; they are cached) and used with their exact text as reference.
+"""
+import argparse
+import multiprocessing
+import re
+import resource
+import sys
+import time
+from pathlib import Path
+
+import soundfile as sf
+
+from digital_twin_like.model_registry import WHISPER_BACKENDS
+from digital_twin_like.paths import get_cache_dir
+from digital_twin_like.speech_to_text import WHISPER_SAMPLE_RATE, prepare_audio
+
+
+SAMPLE_SENTENCES = [
+    "My research focuses on spatial transcriptomics and computational biology.",
+    "I build reproducible analysis pipelines in Python and R.",
+    "Before moving to Boston I studied bioinformatics and statistics.",
+    "Outside of research I enjoy hiking, cooking and reading science fiction.",
+    "SpatialAssignR assigns single cells to spatial locations in tissue sections.",
+]
+
+
+def generate_samples():
+    """Speak SAMPLE_SENTENCES with gTTS into cached WAVs; returns their paths"""
+    from digital_twin_like.audio_codec import decode_audio
+
+    sample_dir = get_cache_dir("stt_samples")
+    paths = []
+    for index, sentence in enumerate(SAMPLE_SENTENCES):
+        path = Path(sample_dir) / f"sample_{index}.wav"
+        if not path.exists():
+            import io
+            from gtts import gTTS
+
+            buffer = io.BytesIO()
+            gTTS(text=sentence, lang="en").write_to_fp(buffer)
+            samples, sample_rate = decode_audio(buffer.getvalue(), "mp3")
+            sf.write(str(path), samples, sample_rate)
+            path.with_suffix(".txt").write_text(sentence)
+        paths.append(path)
+    return paths
+
+
+def normalize(text):
+    """Lowercase and strip punctuation so WER counts word differences only"""
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length"""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_backend(backend, model_size, threads, clips):
+    """Load one backend and transcribe every clip (runs in a fresh process)"""
+    from digital_twin_like.model_registry import load_whisper_model
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    model = load_whisper_model(model_size, backend, threads)
+    load_s = time.perf_counter() - start
+    model.transcribe(clips[0][:WHISPER_SAMPLE_RATE], language="en")  # warm-up
+
+    texts = []
+    start = time.perf_counter()
+    for audio in clips:
+        texts.append(model.transcribe(audio, language="en")["text"].strip())
+    elapsed = time.perf_counter() - start
+    audio_s = sum(len(a) for a in clips) / WHISPER_SAMPLE_RATE
+    return {
+        "load_s": load_s,
+        "rtf": elapsed / audio_s,
+        "peak_rss_mb": peak_rss_mb(),
+        "model_rss_mb": peak_rss_mb() - baseline,
+        "texts": texts,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("wavs", nargs="*", help="Recordings (default: generated sample sentences)")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--threads", type=int, default=None, help="CPU threads per backend")
+    parser.add_argument("--backends", nargs="+", default=list(WHISPER_BACKENDS),
+                        choices=WHISPER_BACKENDS)
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.wavs] or generate_samples()
+    clips, references = [], []
+    for path in paths:
+        audio, sample_rate = sf.read(str(path), dtype="float32")
+        clips.append(prepare_audio(audio, sample_rate))
+        reference = path.with_suffix(".txt")
+        references.append(reference.read_text().strip() if reference.exists() else None)
+
+    print("\n" + "="*60)
+    print("WHISPER BACKEND BENCHMARK")
+    print("="*60)
+    audio_s = sum(len(a) for a in clips) / WHISPER_SAMPLE_RATE
+    print(f"{len(clips)} recordings ({audio_s:.1f}s of audio), model '{args.model}', "
+          f"threads {args.threads or 'default'}\n")
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for backend in args.backends:
+        with context.Pool(1) as pool:
+            try:
+                results[backend] = pool.apply(run_backend, (backend, args.model, args.threads, clips))
+            except ImportError as e:
+                print(f"⚠️  {backend}: not available ({e})")
+
+    # Missing references fall back to the torch backend's transcript
+    baseline = results.get("torch", {}).get("texts")
+    print(f"{'Backend':<16}{'load':>8}{'RTF':>8}{'peak RSS':>11}{'model':>9}{'WER':>8}")
+    for backend, result in results.items():
+        errors = [word_error_rate(ref if ref is not None else baseline[i], text)
+                  for i, (ref, text) in enumerate(zip(references, result["texts"]))
+                  if ref is not None or baseline is not None]
+        wer = f"{100 * sum(errors) / len(errors):.1f}%" if errors else "-"
+        print(f"{backend:<16}{result['load_s']:>7.2f}s{result['rtf']:>8.3f}"
+              f"{result['peak_rss_mb']:>8.0f} MB{result['model_rss_mb']:>6.0f} MB{wer:>8}")
+
+    if "torch" in results:
+        for backend, result in results.items():
+            if backend != "torch":
+                print(f"\n{backend}: {results['torch']['rtf'] / result['rtf']:.2f}x faster than torch")
+    print("="*60 + "\n")
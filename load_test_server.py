@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+Load test for the multi-session digital twin server
+Drives N simulated sessions concurrently and reports throughput and
+p50/p95/p99 request latency. By default the server runs in-process against a
+local stub LLM (an OpenAI-compatible endpoint answering after a fixed delay),
+so the numbers measure the server, not the LLM provider.
+
+Usage:
+    python load_test_server.py [--sessions 8] [--turns 5] [--workers 4] [--llm-latency 0.5]
+    python load_test_server.py --audio sample.wav       # audio turns (exercises batched Whisper)
+    python load_test_server.py --url http://127.0.0.1:8765   # an already running server
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from digital_twin_like.twin_server import percentile
+
+
+QUESTIONS = [
+    "What is your research about?",
+    "Which programming languages do you use?",
+    "Where did you study before Harvard?",
+    "What is SpatialAssignR?",
+    "What spatial transcriptomics technologies have you worked with?",
+    "What are you working on at Boston Children's Hospital?",
+    "What do you enjoy outside of research?",
+    "How do you build reproducible pipelines?",
+]
+
+
+def start_stub_llm(latency):
+    """
+    Serve an OpenAI-compatible /v1/chat/completions endpoint that answers in
+    the ReAct 'Final Answer:' format after `latency` seconds
+    """
+    state = {"calls": 0}
+    lock = threading.Lock()
+
+    class StubLLMHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with lock:
+                state["calls"] += 1
+            time.sleep(latency)
+            question = request.get("messages", [{}])[-1].get("content", "")[-80:]
+            content = ("Thought: I now can give a great answer\n"
+                       f"Final Answer: This is a stub answer about: {question}")
+            data = json.dumps({
+                "id": "stub", "object": "chat.completion", "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLMHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def start_twin_server(args):
+    """Start a TwinServer in-process on a free port"""
+    from digital_twin_like.twin_server import TwinServer, create_http_server
+
+    twin = TwinServer(workers=args.workers, whisper_model=args.whisper_model,
+                      batch_size=args.batch_size, use_response_cache=args.response_cache)
+    if args.audio:
+        twin.warm_up()
+    server = create_http_server(twin, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, twin
+
+
+def request(url, method="GET", body=None, content_type="application/json"):
+    req = urllib.request.Request(url, data=body, method=method,
+                                 headers={"Content-Type": content_type})
+    with urllib.request.urlopen(req, timeout=300) as response:
+        return json.loads(response.read())
+
+
+def run_session(base_url, index, turns, audio):
+    """Hold one conversation; returns (latencies, errors)"""
+    latencies = []
+    errors = 0
+    session_id = request(f"{base_url}/sessions", "POST", b"{}")["session_id"]
+    for turn in range(turns):
+        start = time.perf_counter()
+        try:
+            if audio is not None:
+                request(f"{base_url}/sessions/{session_id}/audio", "POST", audio, "audio/wav")
+            else:
+                question = QUESTIONS[(index + turn) % len(QUESTIONS)]
+                body = json.dumps({"text": f"{question} (session {index})"}).encode()
+                request(f"{base_url}/sessions/{session_id}/text", "POST", body)
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors += 1
+            print(f"⚠️  Session {index} turn {turn}: {e}")
+    request(f"{base_url}/sessions/{session_id}", "DELETE")
+    return latencies, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent simulated sessions")
+    parser.add_argument("--turns", type=int, default=5, help="Requests per session")
+    parser.add_argument("--workers", type=int, default=4, help="Server conversation workers")
+    parser.add_argument("--batch-size", type=int, default=8, help="Server transcription batch size")
+    parser.add_argument("--whisper-model", default="tiny")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub LLM delay in seconds")
+    parser.add_argument("--audio", help="WAV file sent as every turn instead of text")
+    parser.add_argument("--response-cache", action="store_true",
+                        help="Keep the server's response cache on (off so every turn hits the LLM)")
+    parser.add_argument("--url", help="Use a running server instead of starting one")
+    args = parser.parse_args()
+
+    llm_server = llm_state = http_server = twin = None
+    base_url = args.url
+    if base_url is None:
+        llm_server, llm_state = start_stub_llm(args.llm_latency)
+        stub_url = f"http://127.0.0.1:{llm_server.server_port}/v1"
+        os.environ["OPENAI_API_KEY"] = "stub"
+        os.environ["OPENAI_API_BASE"] = stub_url
+        os.environ["OPENAI_BASE_URL"] = stub_url
+        http_server, twin = start_twin_server(args)
+        base_url = f"http://127.0.0.1:{http_server.server_port}"
+
+    audio = None
+    if args.audio:
+        with open(args.audio, "rb") as f:
+            audio = f.read()
+
+    print("\n" + "="*60)
+    print("DIGITAL TWIN SERVER LOAD TEST")
+    print("="*60)
+    print(f"{args.sessions} sessions x {args.turns} {'audio' if audio else 'text'} turns "
+          f"against {base_url}\n")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        results = list(executor.map(lambda i: run_session(base_url, i, args.turns, audio),
+                                    range(args.sessions)))
+    wall = time.perf_counter() - start
+
+    latencies = [l for session, _ in results for l in session]
+    errors = sum(e for _, e in results)
+
+    def pct(fraction):
+        value = percentile(latencies, fraction)
+        return float("nan") if value is None else value
+
+    print(f"Requests:    {len(latencies)} ok, {errors} failed in {wall:.2f}s")
+    print(f"Throughput:  {len(latencies) / wall:.2f} requests/s")
+    print(f"Latency:     p50 {pct(0.50):.3f}s   p95 {pct(0.95):.3f}s   p99 {pct(0.99):.3f}s")
+
+    stats = request(f"{base_url}/stats")
+    transcription = stats.get("transcription", {})
+    if transcription.get("requests"):
+        print(f"Whisper:     {transcription['requests']} transcriptions in "
+              f"{transcription['batches']} batches (mean {transcription['mean_batch_size']:.1f})")
+    if llm_state is not None:
+        print(f"Stub LLM:    {llm_state['calls']} calls")
+    print("="*60 + "\n")
+
+    if http_server is not None:
+        http_server.shutdown()
+        twin.close()
+        llm_server.shutdown()
@@ -5,17 +5,76 @@ Advanced Text-to-Speech with multiple backend options:
 3. ElevenLabs - Voice cloning, requires API key
 4. Kokoro TTS - Local, high quality
 """
+import io
+import multiprocessing
 import os
+import shutil
 import tempfile
-import subprocess
-import platform
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
+from digital_twin_like.audio_cache import audio_cache_key, get_audio_cache, gtts_cache_key
+from digital_twin_like.audio_codec import decode_audio, encode_wav, resample
+from digital_twin_like.audio_playback import get_playback_engine, play_audio_bytes, play_audio_file
+from digital_twin_like.streaming_speech import StreamingSpeaker, split_sentences
+
+
+KOKORO_MODEL = "kokoro-v0_19.onnx"
+KOKORO_VOICES = "voices.bin"
+
+# Network backends are asked for raw 16-bit mono PCM so responses can be
+# played while they are still downloading
+STREAMING_BACKENDS = ("openai", "elevenlabs")
+PCM_SAMPLE_RATE = 24000
+ELEVENLABS_BASE_URL = "https://api.elevenlabs.io"
+RETRY_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+
+# Per-process Kokoro instance for the chunked-synthesis process pool
+_worker_kokoro = None
+
+
+def _init_kokoro_worker(model_path, voices_path):
+    global _worker_kokoro
+    from kokoro_onnx import Kokoro
+    _worker_kokoro = Kokoro(model_path, voices_path)
+
+
+def _kokoro_worker_create(text, voice, speed):
+    return _worker_kokoro.create(text, voice=voice, speed=speed, lang='en-us')
+
+
+def _kokoro_worker_ready():
+    return _worker_kokoro is not None
+
+
+def _is_retryable(error):
+    """Whether a failed TTS request is worth retrying (timeouts, 429 and 5xx)"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status in RETRY_STATUS_CODES
+
+    import httpx
+    return (isinstance(error, (httpx.TransportError, TimeoutError, ConnectionError))
+            or isinstance(error.__cause__, httpx.TransportError))
+
+
+def pcm_to_samples(data):
+    """Convert little-endian 16-bit PCM bytes to float32 samples"""
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
 
 class AdvancedTTS:
     """Advanced TTS with multiple backend options"""
 
-    def __init__(self, backend="gtts", api_key=None, voice_id=None):
+    def __init__(self, backend="gtts", api_key=None, voice_id=None, use_cache=True,
+                 chunk_workers=4, base_url=None, timeout=30.0, max_retries=2,
+                 retry_backoff=0.5, chunked=False):
         """
         Initialize Advanced TTS
 
@@ -23,28 +82,103 @@ class AdvancedTTS:
             backend: 'gtts', 'openai', 'elevenlabs', or 'kokoro'
             api_key: API key for OpenAI or ElevenLabs
             voice_id: Voice ID for ElevenLabs or model for others
+            use_cache: Reuse previously synthesized clips from the shared audio cache
+            chunk_workers: Sentences synthesized in parallel in chunked mode
+            base_url: Override the OpenAI/ElevenLabs API base URL (e.g. a local stub server)
+            timeout: Per-request timeout in seconds for network backends
+            max_retries: Retries for timeouts, 429 and 5xx responses
+            retry_backoff: First retry delay in seconds, doubled on each attempt
+            chunked: Chunked speech will be used, so start the Kokoro worker
+                     processes in the background right away
         """
         self.backend = backend
-        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if backend == "elevenlabs":
+            self.api_key = api_key or os.getenv("ELEVENLABS_API_KEY") or os.getenv("OPENAI_API_KEY")
+        else:
+            self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.voice_id = voice_id
+        self.speed = 1.0
+        self.audio_cache = get_audio_cache() if use_cache else None
+        self.chunk_workers = chunk_workers
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._kokoro_pool = None
+        self._kokoro_warmup = []
+        self._kokoro_pool_lock = threading.Lock()
+        self._http = None
+        self._openai_client = None
+
+        if backend in STREAMING_BACKENDS:
+            try:
+                self._create_clients()
+            except Exception as e:
+                print(f"⚠️ {backend} client failed to initialize: {e}")
+                print("Falling back to gTTS")
+                self.backend = "gtts"
 
         if backend == "kokoro":
             try:
                 from kokoro_onnx import Kokoro
-                self.kokoro = Kokoro("kokoro-v0_19.onnx", "voices.bin")
+                self.kokoro = Kokoro(KOKORO_MODEL, KOKORO_VOICES)
                 print("✓ Kokoro TTS initialized")
             except Exception as e:
                 print(f"⚠️ Kokoro TTS failed to initialize: {e}")
                 print("Falling back to gTTS")
                 self.backend = "gtts"
 
-    def speak(self, text, save_to_file=None):
+        if chunked:
+            self.prepare_chunked()
+
+    def prepare_chunked(self, wait=False):
+        """
+        Start the Kokoro worker processes used for chunked synthesis
+
+        Each worker loads the model in its initializer. Until all of them are
+        ready, parallel chunks are synthesized in this process instead, so the
+        first chunk never waits for a worker to start.
+
+        Args:
+            wait: Block until every worker has loaded the model
+        """
+        if self.backend != "kokoro" or self.chunk_workers <= 1:
+            return
+        with self._kokoro_pool_lock:
+            if self._kokoro_pool is None:
+                # Spawned, not forked: this process already holds an onnxruntime
+                # session and its threads, which fork does not copy safely
+                self._kokoro_pool = ProcessPoolExecutor(
+                    max_workers=self.chunk_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_kokoro_worker,
+                    initargs=(KOKORO_MODEL, KOKORO_VOICES),
+                )
+                # One job per worker makes the pool start all of them now
+                self._kokoro_warmup = [self._kokoro_pool.submit(_kokoro_worker_ready)
+                                       for _ in range(self.chunk_workers)]
+            warmup = self._kokoro_warmup
+        if wait:
+            for future in warmup:
+                future.exception()
+
+    def _ready_kokoro_pool(self):
+        """The Kokoro process pool once every worker has loaded the model, else None"""
+        self.prepare_chunked()
+        with self._kokoro_pool_lock:
+            pool, warmup = self._kokoro_pool, self._kokoro_warmup
+        if pool is None or not all(f.done() and f.exception() is None for f in warmup):
+            return None
+        return pool
+
+    def speak(self, text, save_to_file=None, chunked=False):
         """
         Convert text to speech using selected backend
 
         Args:
             text: Text to convert
             save_to_file: Optional path to save audio
+            chunked: Split into sentences and synthesize them in parallel
         """
         if not text or not text.strip():
             print("⚠️ No text to speak")
@@ -52,156 +186,351 @@ class AdvancedTTS:
 
         print(f"🔊 Speaking with {self.backend}: {text[:100]}{'...' if len(text) > 100 else ''}")
 
-        if self.backend == "gtts":
-            self._speak_gtts(text, save_to_file)
-        elif self.backend == "openai":
-            self._speak_openai(text, save_to_file)
-        elif self.backend == "elevenlabs":
-            self._speak_elevenlabs(text, save_to_file)
-        elif self.backend == "kokoro":
-            self._speak_kokoro(text, save_to_file)
-
-    def _speak_gtts(self, text, save_to_file=None):
-        """Use Google TTS"""
-        from gtts import gTTS
+        if chunked:
+            self.prepare_chunked()
+            self._speak_chunked(text, save_to_file)
+            return
 
-        if save_to_file:
-            audio_file = save_to_file
-            delete_after = False
-        else:
-            tmp_file = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-            audio_file = tmp_file.name
-            tmp_file.close()
-            delete_after = True
+        if not save_to_file:
+            if self.backend in STREAMING_BACKENDS and self._speak_streaming(text):
+                return
+            # Decoded straight from memory (cached clips usually come from the memory tier)
+            data, ext = self.synthesize(text)
+            play_audio_bytes(data, ext)
+            return
 
+        audio_file, delete_after = self._audio_file(text)
         try:
-            tts = gTTS(text=text, lang='en', slow=False)
-            tts.save(audio_file)
+            shutil.copyfile(audio_file, save_to_file)
             self._play_audio(audio_file)
         finally:
             if delete_after and os.path.exists(audio_file):
                 os.remove(audio_file)
 
-    def _speak_openai(self, text, save_to_file=None):
-        """Use OpenAI TTS API"""
-        try:
-            from openai import OpenAI
+    def synthesize(self, text, parallel=False):
+        """
+        Synthesize text with the selected backend, using the audio cache
 
-            client = OpenAI(api_key=self.api_key)
+        Backends that fail fall back to gTTS; the fallback clip is cached
+        under the gTTS key so the real backend is retried next time.
 
-            # Default to 'alloy' voice, or use specified voice
-            voice = self.voice_id or "alloy"  # Options: alloy, echo, fable, onyx, nova, shimmer
+        Args:
+            text: Text to convert
+            parallel: Called concurrently for one chunk of a longer text
+                      (Kokoro then runs in a worker process)
 
-            if save_to_file:
-                audio_file = save_to_file
-                delete_after = False
+        Returns:
+            Tuple of (encoded audio bytes, file extension)
+        """
+        cached = self._cache_get(self.backend, text)
+        if cached is not None:
+            return cached
+        return self._synthesize_and_cache(text, parallel)
+
+    def _synthesize_and_cache(self, text, parallel=False):
+        """Synthesize after a cache miss and store the clip"""
+        backend = self.backend
+        try:
+            if backend == "openai":
+                data, ext = self._synthesize_openai(text)
+            elif backend == "elevenlabs":
+                data, ext = self._synthesize_elevenlabs(text)
+            elif backend == "kokoro":
+                data, ext = self._synthesize_kokoro(text, parallel)
             else:
-                tmp_file = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-                audio_file = tmp_file.name
-                tmp_file.close()
-                delete_after = True
+                backend = "gtts"
+                data, ext = self._synthesize_gtts(text)
+        except Exception as e:
+            if backend == "gtts":
+                raise
+            print(f"⚠️ {backend} TTS error: {e}")
+            return self._fallback_gtts(text)
+
+        self._cache_put(backend, text, data, ext)
+        return data, ext
+
+    def _fallback_gtts(self, text):
+        """Synthesize with gTTS after another backend failed"""
+        print("Falling back to gTTS")
+        cached = self._cache_get("gtts", text)
+        if cached is not None:
+            return cached
+        data, ext = self._synthesize_gtts(text)
+        self._cache_put("gtts", text, data, ext)
+        return data, ext
+
+    def synthesize_chunked(self, text):
+        """
+        Synthesize long text sentence by sentence in parallel
 
-            try:
-                response = client.audio.speech.create(
-                    model="tts-1",  # or "tts-1-hd" for higher quality
-                    voice=voice,
-                    input=text
-                )
+        Network backends run on a thread pool; Kokoro runs on a process pool
+        (see _synthesize_kokoro). Chunks are decoded and joined in order at
+        the sample rate of the first chunk.
 
-                response.stream_to_file(audio_file)
-                self._play_audio(audio_file)
-            finally:
-                if delete_after and os.path.exists(audio_file):
-                    os.remove(audio_file)
+        Args:
+            text: Text to convert
 
-        except Exception as e:
-            print(f"⚠️ OpenAI TTS error: {e}")
-            print("Falling back to gTTS")
-            self._speak_gtts(text, save_to_file)
+        Returns:
+            Tuple of (float32 samples, sample rate)
+        """
+        sentences = split_sentences(text)
+        with ThreadPoolExecutor(max_workers=self.chunk_workers) as executor:
+            clips = list(executor.map(lambda s: self.synthesize(s, parallel=True), sentences))
+
+        pieces = []
+        sample_rate = None
+        for data, ext in clips:
+            samples, rate = decode_audio(data, ext)
+            if sample_rate is None:
+                sample_rate = rate
+            pieces.append(resample(samples, rate, sample_rate))
+        if not pieces:
+            return np.zeros(0, dtype=np.float32), 24000
+        return np.concatenate(pieces), sample_rate
+
+    def _speak_chunked(self, text, save_to_file=None):
+        """Play sentences in order as soon as each one is synthesized"""
+        if save_to_file:
+            samples, sample_rate = self.synthesize_chunked(text)
+            with open(save_to_file, 'wb') as f:
+                f.write(encode_wav(samples, sample_rate))
+            self._play_audio(save_to_file)
+            return
 
-    def _speak_elevenlabs(self, text, save_to_file=None):
-        """Use ElevenLabs TTS/Voice Cloning"""
+        speaker = StreamingSpeaker(self._synthesize_to_temp, self._play_audio,
+                                   max_workers=self.chunk_workers,
+                                   max_pending=self.chunk_workers * 2).start()
+        for sentence in split_sentences(text):
+            speaker.submit(sentence)
+        time_to_first_audio = speaker.finish()
+        if time_to_first_audio is not None:
+            print(f"⏱️ First chunk played after {time_to_first_audio:.2f}s ({speaker.sentences} chunks)")
+
+    def _synthesize_to_temp(self, text):
+        """Synthesize into a temp file owned by the caller"""
+        data, ext = self.synthesize(text, parallel=True)
+        tmp_file = tempfile.NamedTemporaryFile(suffix=f".{ext}", delete=False)
+        tmp_file.write(data)
+        tmp_file.close()
+        return tmp_file.name
+
+    def close(self):
+        """Shut down the Kokoro process pool and pooled HTTP connections"""
+        with self._kokoro_pool_lock:
+            pool, self._kokoro_pool, self._kokoro_warmup = self._kokoro_pool, None, []
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+            self._openai_client = None
+
+    def _create_clients(self):
+        """Create the pooled HTTP client (and OpenAI client) reused by every request"""
+        import httpx
+
+        self._http = httpx.Client(
+            timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0)),
+            limits=httpx.Limits(max_connections=max(self.chunk_workers, 4),
+                                max_keepalive_connections=max(self.chunk_workers, 4)),
+        )
+        if self.backend == "openai":
+            from openai import OpenAI
+
+            # Retries are handled by _stream_with_retries so they do not
+            # restart a response that is already playing
+            self._openai_client = OpenAI(api_key=self.api_key, base_url=self.base_url,
+                                         timeout=self.timeout, max_retries=0,
+                                         http_client=self._http)
+
+    def _stream_with_retries(self, open_stream, text):
+        """
+        Yield response chunks, retrying with exponential backoff
+
+        A request is only retried if it failed before its first chunk arrived.
+        """
+        for attempt in range(self.max_retries + 1):
+            started = False
+            try:
+                for chunk in open_stream(text):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                delay = self.retry_backoff * 2 ** attempt
+                print(f"⚠️ {self.backend} request failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _stream_pcm(self, text):
+        """Stream raw PCM from the selected network backend"""
+        if self.backend == "openai":
+            return self._stream_with_retries(self._stream_openai, text)
+        return self._stream_with_retries(self._stream_elevenlabs, text)
+
+    def _iter_samples(self, text):
+        """Yield float32 sample blocks as PCM arrives, keeping odd bytes for the next chunk"""
+        leftover = b""
+        for chunk in self._stream_pcm(text):
+            data = leftover + chunk
+            usable = len(data) - len(data) % 2
+            leftover = data[usable:]
+            if usable:
+                yield pcm_to_samples(data[:usable])
+
+    def _speak_streaming(self, text):
+        """
+        Play a network backend's response while it downloads
+
+        Returns:
+            True if the text was spoken, False to use the buffered path instead
+        """
+        cached = self._cache_get(self.backend, text)
+        if cached is not None:
+            play_audio_bytes(*cached)
+            return True
+
+        engine = get_playback_engine()
+        if engine is None:
+            return False
+
+        # One cancel token for every chunk, so stop() (barge-in) ends the whole utterance
+        utterance = engine.begin_utterance()
+        pieces = []
         try:
-            from elevenlabs import generate, play, set_api_key
+            for samples in self._iter_samples(text):
+                if not pieces:
+                    print("🔊 Streaming audio...")
+                pieces.append(samples)
+                if not engine.play(samples, PCM_SAMPLE_RATE, block=False, utterance=utterance):
+                    return True
+            engine.wait(utterance)
+        except Exception as e:
+            if pieces:
+                print(f"⚠️ {self.backend} stream interrupted: {e}")
+                engine.wait(utterance)
+                return True
+            print(f"⚠️ {self.backend} TTS error: {e}")
+            play_audio_bytes(*self._fallback_gtts(text))
+            return True
+        finally:
+            engine.end_utterance(utterance)
 
-            set_api_key(self.api_key)
+        if pieces:
+            self._cache_put(self.backend, text, encode_wav(np.concatenate(pieces), PCM_SAMPLE_RATE), "wav")
+        return True
 
-            # Use specified voice_id or default voice
-            voice_id = self.voice_id or "21m00Tcm4TlvDq8ikWAM"  # Default: Rachel voice
+    def _cache_key(self, backend, text):
+        if backend == "gtts":
+            return gtts_cache_key(text)
+        return audio_cache_key(backend, self.voice_id, "en", self.speed, text)
 
-            audio = generate(
-                text=text,
-                voice=voice_id,
-                model="eleven_monolingual_v1"
-            )
+    def _cache_get(self, backend, text):
+        if self.audio_cache is None:
+            return None
+        return self.audio_cache.get(self._cache_key(backend, text))
 
-            if save_to_file:
-                with open(save_to_file, 'wb') as f:
-                    f.write(audio)
-                self._play_audio(save_to_file)
-            else:
-                # Play directly
-                play(audio)
+    def _cache_put(self, backend, text, data, ext):
+        if self.audio_cache is not None:
+            self.audio_cache.put(self._cache_key(backend, text), data, ext)
 
-        except Exception as e:
-            print(f"⚠️ ElevenLabs error: {e}")
-            print("Falling back to gTTS")
-            self._speak_gtts(text, save_to_file)
+    def _audio_file(self, text):
+        """
+        Get a playable file for the text
 
-    def _speak_kokoro(self, text, save_to_file=None):
-        """Use Kokoro TTS (local, high quality)"""
-        try:
-            if save_to_file:
-                audio_file = save_to_file
-                delete_after = False
-            else:
-                tmp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-                audio_file = tmp_file.name
-                tmp_file.close()
-                delete_after = True
+        Returns:
+            Tuple of (path, is_temp); cached clips are played in place
+        """
+        if self.audio_cache is not None:
+            path = self.audio_cache.get_path(self._cache_key(self.backend, text))
+            if path is not None:
+                return str(path), False
+            # The lookup above already counted the miss
+            data, ext = self._synthesize_and_cache(text)
+        else:
+            data, ext = self.synthesize(text)
+        tmp_file = tempfile.NamedTemporaryFile(suffix=f".{ext}", delete=False)
+        tmp_file.write(data)
+        tmp_file.close()
+        return tmp_file.name, True
 
-            try:
-                # Generate audio
-                samples, sample_rate = self.kokoro.create(
-                    text,
-                    voice=self.voice_id or 'af_sky',  # Default voice
-                    speed=1.0,
-                    lang='en-us'
-                )
+    def _synthesize_gtts(self, text):
+        """Use Google TTS"""
+        from gtts import gTTS
 
-                # Save to file
-                import soundfile as sf
-                sf.write(audio_file, samples, sample_rate)
+        buffer = io.BytesIO()
+        gTTS(text=text, lang='en', slow=False).write_to_fp(buffer)
+        return buffer.getvalue(), "mp3"
 
-                # Play
-                self._play_audio(audio_file)
-            finally:
-                if delete_after and os.path.exists(audio_file):
-                    os.remove(audio_file)
+    def _synthesize_openai(self, text):
+        """Use OpenAI TTS API"""
+        return self._synthesize_streamed(text)
 
-        except Exception as e:
-            print(f"⚠️ Kokoro TTS error: {e}")
-            print("Falling back to gTTS")
-            self._speak_gtts(text, save_to_file)
+    def _synthesize_elevenlabs(self, text):
+        """Use ElevenLabs TTS/Voice Cloning"""
+        return self._synthesize_streamed(text)
+
+    def _synthesize_streamed(self, text):
+        """Collect a streamed PCM response into a WAV clip"""
+        pieces = list(self._iter_samples(text))
+        if not pieces:
+            raise RuntimeError(f"{self.backend} returned no audio")
+        return encode_wav(np.concatenate(pieces), PCM_SAMPLE_RATE), "wav"
+
+    def _stream_openai(self, text):
+        """Stream PCM from the OpenAI speech endpoint over the pooled client"""
+        # Default to 'alloy' voice, or use specified voice
+        voice = self.voice_id or "alloy"  # Options: alloy, echo, fable, onyx, nova, shimmer
+
+        with self._openai_client.audio.speech.with_streaming_response.create(
+            model="tts-1",  # or "tts-1-hd" for higher quality
+            voice=voice,
+            input=text,
+            response_format="pcm",  # 24 kHz 16-bit mono
+            speed=self.speed,
+        ) as response:
+            yield from response.iter_bytes(8192)
+
+    def _stream_elevenlabs(self, text):
+        """Stream PCM from the ElevenLabs streaming endpoint over the pooled client"""
+        # Use specified voice_id or default voice
+        voice_id = self.voice_id or "21m00Tcm4TlvDq8ikWAM"  # Default: Rachel voice
+        base_url = (self.base_url or ELEVENLABS_BASE_URL).rstrip("/")
+
+        with self._http.stream(
+            "POST",
+            f"{base_url}/v1/text-to-speech/{voice_id}/stream",
+            params={"output_format": f"pcm_{PCM_SAMPLE_RATE}"},
+            headers={"xi-api-key": self.api_key or ""},
+            json={"text": text, "model_id": "eleven_monolingual_v1"},
+        ) as response:
+            response.raise_for_status()
+            yield from response.iter_bytes(8192)
+
+    def _synthesize_kokoro(self, text, parallel=False):
+        """Use Kokoro TTS (local, high quality)"""
+        voice = self.voice_id or 'af_sky'  # Default voice
+
+        # ONNX inference is CPU-bound: parallel chunks go to worker processes
+        # once they are up (see prepare_chunked)
+        pool = self._ready_kokoro_pool() if parallel else None
+        if pool is not None:
+            samples, sample_rate = pool.submit(
+                _kokoro_worker_create, text, voice, self.speed).result()
+        else:
+            samples, sample_rate = self.kokoro.create(
+                text,
+                voice=voice,
+                speed=self.speed,
+                lang='en-us'
+            )
 
-    def _play_audio(self, audio_file):
-        """Play audio file using platform-specific command"""
-        system = platform.system()
+        return encode_wav(samples, sample_rate), "wav"
 
-        try:
-            if system == "Darwin":  # macOS
-                subprocess.run(["afplay", audio_file], check=True)
-            elif system == "Linux":
-                for player in ["mpg123", "ffplay", "cvlc"]:
-                    try:
-                        subprocess.run([player, "-q", audio_file], check=True)
-                        break
-                    except FileNotFoundError:
-                        continue
-            elif system == "Windows":
-                os.startfile(audio_file)
-        except Exception as e:
-            print(f"⚠️ Error playing audio: {e}")
+    def _play_audio(self, audio_file):
+        """Play audio file through the shared in-process playback engine"""
+        play_audio_file(audio_file)
 
 
 # Quick test function
@@ -0,0 +1,250 @@
+"""
+Content-addressed cache of synthesized speech shared by all TTS backends
+Encoded clips live on disk under a size-bounded LRU policy, with the hottest
+clips also kept in memory
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from digital_twin_like.paths import get_cache_dir
+
+
+def audio_cache_key(backend, voice_id, language, speed, text):
+    """
+    Build the cache key for a synthesized clip
+
+    Args:
+        backend: TTS backend name ('gtts', 'openai', ...)
+        voice_id: Voice identifier (None for the backend default)
+        language: Language code
+        speed: Speaking speed / slow flag
+        text: Text being spoken (whitespace is normalized)
+
+    Returns:
+        Hex digest identifying the clip
+    """
+    normalized = re.sub(r"\s+", " ", text).strip()
+    material = "\x1f".join([backend, str(voice_id), str(language), str(speed), normalized])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def gtts_cache_key(text, language="en", slow=False):
+    """
+    Cache key for a gTTS clip, shared by TextToSpeech and AdvancedTTS
+
+    gTTS has no voices and only a slow flag, so both callers must key its
+    clips the same way for identical clips to be reused.
+
+    Args:
+        text: Text being spoken
+        language: Language code
+        slow: gTTS slow-speech flag
+
+    Returns:
+        Hex digest identifying the clip
+    """
+    return audio_cache_key("gtts", None, language, bool(slow), text)
+
+
+class AudioCache:
+    """Two-tier (memory + disk) LRU cache of encoded audio clips"""
+
+    def __init__(self, cache_dir=None, max_bytes=200 * 1024 * 1024,
+                 memory_items=32, memory_max_bytes=16 * 1024 * 1024):
+        """
+        Initialize the audio cache
+
+        Args:
+            cache_dir: Directory for cached clips (default: <cache dir>/audio)
+            max_bytes: Disk budget; least recently used clips are evicted beyond it
+            memory_items: Maximum clips kept in memory
+            memory_max_bytes: Memory budget for the in-memory tier
+        """
+        self.cache_dir = cache_dir or get_cache_dir("audio")
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory_max_bytes = memory_max_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # key -> bytes
+        self._memory_bytes = 0
+        self._disk = OrderedDict()     # key -> (filename, size), least recent first
+        self._disk_bytes = 0
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            path = self.cache_dir / filename
+            key, _, ext = filename.partition(".")
+            if ext and not filename.startswith(".") and path.is_file():
+                stat = path.stat()
+                entries.append((stat.st_mtime, key, filename, stat.st_size))
+        for _, key, filename, size in sorted(entries):
+            self._disk[key] = (filename, size)
+            self._disk_bytes += size
+
+    def get_path(self, key):
+        """
+        Get the on-disk path of a cached clip (for file-based players)
+
+        Args:
+            key: Key from audio_cache_key()
+
+        Returns:
+            Path, or None on a miss
+        """
+        with self._lock:
+            entry = self._disk.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            path = self.cache_dir / entry[0]
+            if not path.exists():
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._touch(key, path)
+            self.hits += 1
+            return path
+
+    def get(self, key):
+        """
+        Get a cached clip
+
+        Args:
+            key: Key from audio_cache_key()
+
+        Returns:
+            Tuple of (encoded bytes, file extension), or None on a miss
+        """
+        with self._lock:
+            entry = self._disk.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            ext = entry[0].partition(".")[2]
+
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._disk.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return data, ext
+
+            path = self.cache_dir / entry[0]
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._touch(key, path)
+            self._remember(key, data)
+            self.hits += 1
+            return data, ext
+
+    def put(self, key, data, ext):
+        """
+        Store a clip
+
+        Args:
+            key: Key from audio_cache_key()
+            data: Encoded audio bytes
+            ext: File extension without the dot ('mp3', 'wav')
+
+        Returns:
+            Path of the stored clip
+        """
+        filename = f"{key}.{ext}"
+        path = self.cache_dir / filename
+        tmp_path = self.cache_dir / f".{filename}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if key in self._disk:
+                self._disk_bytes -= self._disk[key][1]
+            self._disk[key] = (filename, len(data))
+            self._disk.move_to_end(key)
+            self._disk_bytes += len(data)
+            self._remember(key, data)
+
+            while self._disk_bytes > self.max_bytes and len(self._disk) > 1:
+                oldest = next(iter(self._disk))
+                old_path = self.cache_dir / self._disk[oldest][0]
+                self._drop(oldest)
+                self.evictions += 1
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+        return path
+
+    def _touch(self, key, path):
+        self._disk.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _remember(self, key, data):
+        if len(data) > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while (len(self._memory) > self.memory_items
+               or self._memory_bytes > self.memory_max_bytes):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _drop(self, key):
+        filename, size = self._disk.pop(key)
+        self._disk_bytes -= size
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+
+    def stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            Dict with hit/miss counters and tier sizes
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "disk_clips": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "memory_clips": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+            }
+
+
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """Get the process-wide audio cache shared by TextToSpeech and AdvancedTTS"""
+    global _audio_cache
+    with _audio_cache_lock:
+        if _audio_cache is None:
+            _audio_cache = AudioCache()
+    return _audio_cache
@@ -0,0 +1,77 @@
+"""
+Decoding and encoding helpers for synthesized audio clips
+"""
+import io
+
+import numpy as np
+
+
+def decode_audio(data, ext):
+    """
+    Decode an encoded clip into mono float32 PCM
+
+    Args:
+        data: Encoded audio bytes
+        ext: Format extension ('wav', 'mp3', ...)
+
+    Returns:
+        Tuple of (float32 samples in [-1, 1], sample rate)
+    """
+    try:
+        # libsndfile >= 1.1 (bundled with soundfile 0.12 wheels) also decodes MP3,
+        # which avoids pydub's ffmpeg subprocess
+        import soundfile as sf
+
+        samples, sample_rate = sf.read(io.BytesIO(data), dtype="float32")
+    except Exception:
+        from pydub import AudioSegment
+
+        segment = AudioSegment.from_file(io.BytesIO(data), format=ext)
+        samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+        samples /= float(1 << (8 * segment.sample_width - 1))
+        if segment.channels > 1:
+            samples = samples.reshape(-1, segment.channels)
+        sample_rate = segment.frame_rate
+
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return np.ascontiguousarray(samples, dtype=np.float32), sample_rate
+
+
+def resample(samples, sample_rate, target_rate):
+    """
+    Resample PCM to a target rate
+
+    Args:
+        samples: float32 samples
+        sample_rate: Current sample rate
+        target_rate: Desired sample rate
+
+    Returns:
+        float32 samples at target_rate
+    """
+    if sample_rate == target_rate:
+        return samples
+    from math import gcd
+    from scipy.signal import resample_poly
+
+    divisor = gcd(int(sample_rate), int(target_rate))
+    return resample_poly(samples, target_rate // divisor, sample_rate // divisor).astype(np.float32)
+
+
+def encode_wav(samples, sample_rate):
+    """
+    Encode float32 PCM as WAV bytes
+
+    Args:
+        samples: float32 samples
+        sample_rate: Sample rate
+
+    Returns:
+        WAV file bytes
+    """
+    import soundfile as sf
+
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, sample_rate, format="WAV")
+    return buffer.getvalue()
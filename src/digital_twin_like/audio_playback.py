@@ -0,0 +1,345 @@
+"""
+In-process audio playback
+A long-lived sounddevice output stream is fed decoded PCM from a ring buffer,
+so utterances play without spawning an external player each time. External
+players are discovered once and only used when no output device is available.
+"""
+import os
+import platform
+import shutil
+import subprocess
+import threading
+
+import numpy as np
+
+from digital_twin_like.audio_codec import decode_audio, resample
+
+
+class RingBuffer:
+    """Fixed-capacity float32 FIFO shared between producers and the audio callback"""
+
+    def __init__(self, capacity):
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._read = 0
+        self._size = 0
+        self._condition = threading.Condition()
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    def __len__(self):
+        return self._size
+
+    def write(self, samples, cancelled=None):
+        """
+        Append samples, blocking while the buffer is full
+
+        Args:
+            samples: 1-D float32 array
+            cancelled: Optional threading.Event that aborts the write
+
+        Returns:
+            True if every sample was written
+        """
+        offset = 0
+        while offset < len(samples):
+            with self._condition:
+                while self._size == self.capacity:
+                    if cancelled is not None and cancelled.is_set():
+                        return False
+                    self._condition.wait(0.05)
+                if cancelled is not None and cancelled.is_set():
+                    return False
+
+                count = min(len(samples) - offset, self.capacity - self._size)
+                start = (self._read + self._size) % self.capacity
+                first = min(count, self.capacity - start)
+                self._data[start:start + first] = samples[offset:offset + first]
+                self._data[:count - first] = samples[offset + first:offset + count]
+                self._size += count
+                offset += count
+        return True
+
+    def read_into(self, out):
+        """
+        Fill an output block, padding with silence when the buffer runs dry
+
+        Args:
+            out: 1-D float32 array to fill
+
+        Returns:
+            Number of real samples copied
+        """
+        with self._condition:
+            count = min(len(out), self._size)
+            first = min(count, self.capacity - self._read)
+            out[:first] = self._data[self._read:self._read + first]
+            out[first:count] = self._data[:count - first]
+            out[count:] = 0.0
+            self._read = (self._read + count) % self.capacity
+            self._size -= count
+            if count:
+                self._condition.notify_all()
+            return count
+
+    def clear(self):
+        """Drop everything buffered"""
+        with self._condition:
+            self._read = 0
+            self._size = 0
+            self._condition.notify_all()
+
+    def wait_empty(self, cancelled=None):
+        """Block until every buffered sample has been consumed"""
+        with self._condition:
+            while self._size:
+                if cancelled is not None and cancelled.is_set():
+                    return
+                self._condition.wait(0.05)
+
+
+class PlaybackEngine:
+    """Long-lived output stream playing PCM buffers straight from memory"""
+
+    def __init__(self, sample_rate=24000, buffer_seconds=30.0, block_size=1024):
+        """
+        Initialize the engine (the output stream opens on first use)
+
+        Args:
+            sample_rate: Output rate; clips at other rates are resampled
+            buffer_seconds: Ring buffer capacity in seconds
+            block_size: Frames per audio callback
+        """
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.buffer = RingBuffer(int(sample_rate * buffer_seconds))
+        self._stream = None
+        self._lock = threading.Lock()
+        self._utterances = set()   # cancel tokens of utterances being played
+
+    def _callback(self, outdata, frames, time_info, status):
+        self.buffer.read_into(outdata[:, 0])
+
+    def _ensure_stream(self):
+        with self._lock:
+            if self._stream is None:
+                import sounddevice as sd
+
+                self._stream = sd.OutputStream(samplerate=self.sample_rate, channels=1,
+                                               dtype=np.float32, blocksize=self.block_size,
+                                               callback=self._callback)
+                self._stream.start()
+
+    def begin_utterance(self):
+        """
+        Start an utterance that stop() cancels as a whole
+
+        Returns:
+            Cancel token (threading.Event) to pass to play() for every chunk
+            of the utterance, and to end_utterance() once it is done
+        """
+        token = threading.Event()
+        with self._lock:
+            self._utterances.add(token)
+        return token
+
+    def end_utterance(self, utterance):
+        """Forget a finished utterance's cancel token"""
+        with self._lock:
+            self._utterances.discard(utterance)
+
+    def play(self, samples, sample_rate, block=True, utterance=None):
+        """
+        Queue PCM for playback
+
+        Args:
+            samples: 1-D float32 samples
+            sample_rate: Sample rate of the samples
+            block: Wait until the clip has finished playing
+            utterance: Token from begin_utterance() shared by the chunks of one
+                       utterance; once stop() cancels it, later chunks are
+                       dropped. None plays the clip as an utterance of its own.
+
+        Returns:
+            False if the utterance was stopped before the clip was fully queued
+        """
+        own_utterance = utterance is None
+        if own_utterance:
+            utterance = self.begin_utterance()
+        try:
+            if utterance.is_set():
+                return False
+            self._ensure_stream()
+            written = self.buffer.write(resample(np.asarray(samples, dtype=np.float32),
+                                                 sample_rate, self.sample_rate),
+                                        cancelled=utterance)
+            if block:
+                self.buffer.wait_empty(cancelled=utterance)
+            return written and not utterance.is_set()
+        finally:
+            if own_utterance:
+                self.end_utterance(utterance)
+
+    def play_bytes(self, data, ext, block=True, utterance=None):
+        """
+        Decode an encoded clip in memory and play it
+
+        Args:
+            data: Encoded audio bytes
+            ext: Format extension ('mp3', 'wav')
+            block: Wait until the clip has finished playing
+            utterance: Cancel token from begin_utterance(), see play()
+
+        Returns:
+            False if the utterance was stopped before the clip was fully queued
+        """
+        samples, sample_rate = decode_audio(data, ext)
+        return self.play(samples, sample_rate, block=block, utterance=utterance)
+
+    def play_file(self, path, block=True, utterance=None):
+        """Decode an audio file and play it"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        return self.play_bytes(data, os.path.splitext(str(path))[1].lstrip(".").lower(),
+                               block=block, utterance=utterance)
+
+    def wait(self, utterance=None):
+        """
+        Block until everything queued has been played, or until stop()
+
+        Args:
+            utterance: Also return as soon as this utterance is cancelled
+        """
+        token = utterance if utterance is not None else self.begin_utterance()
+        try:
+            self.buffer.wait_empty(cancelled=token)
+        finally:
+            if utterance is None:
+                self.end_utterance(token)
+
+    @property
+    def is_playing(self):
+        return len(self.buffer) > 0
+
+    def stop(self):
+        """Stop playback immediately, drop queued audio and cancel every current utterance (e.g. for barge-in)"""
+        with self._lock:
+            utterances = list(self._utterances)
+        for utterance in utterances:
+            utterance.set()
+        self.buffer.clear()
+
+    def close(self):
+        """Close the output stream"""
+        self.stop()
+        with self._lock:
+            if self._stream is not None:
+                self._stream.stop()
+                self._stream.close()
+                self._stream = None
+
+
+_engine = None
+_engine_checked = False
+_engine_lock = threading.Lock()
+_external_player = None
+_external_checked = False
+
+
+def get_playback_engine():
+    """
+    Get the process-wide playback engine
+
+    Returns:
+        PlaybackEngine, or None if no audio output device is usable
+    """
+    global _engine, _engine_checked
+    with _engine_lock:
+        if not _engine_checked:
+            _engine_checked = True
+            try:
+                import sounddevice as sd
+
+                sd.query_devices(kind="output")
+                _engine = PlaybackEngine()
+            except Exception as e:
+                print(f"⚠️  In-process playback unavailable ({e}), using external player")
+    return _engine
+
+
+def find_external_player():
+    """
+    Discover an external command-line player once per process
+
+    Returns:
+        Command list prefix (e.g. ['mpg123', '-q']), or None
+    """
+    global _external_player, _external_checked
+    if not _external_checked:
+        _external_checked = True
+        system = platform.system()
+        if system == "Darwin":
+            _external_player = ["afplay"]
+        elif system == "Linux":
+            for player, args in (("mpg123", ["-q"]), ("ffplay", ["-nodisp", "-autoexit", "-loglevel", "quiet"]),
+                                 ("cvlc", ["-q", "--play-and-exit"])):
+                if shutil.which(player):
+                    _external_player = [player] + args
+                    break
+    return _external_player
+
+
+def play_audio_file(audio_file):
+    """
+    Play an audio file in-process, falling back to an external player
+
+    Args:
+        audio_file: Path to audio file to play
+    """
+    try:
+        engine = get_playback_engine()
+        if engine is not None:
+            engine.play_file(audio_file)
+            return
+
+        if platform.system() == "Windows":
+            os.startfile(audio_file)
+            return
+
+        player = find_external_player()
+        if player is None:
+            print(f"⚠️  Cannot play audio on {platform.system()}: no output device or player found")
+            return
+        subprocess.run(player + [str(audio_file)], check=True)
+
+    except Exception as e:
+        print(f"⚠️  Error playing audio: {e}")
+
+
+def play_audio_bytes(data, ext):
+    """
+    Play an encoded clip from memory, writing a temp file only for external players
+
+    Args:
+        data: Encoded audio bytes
+        ext: Format extension ('mp3', 'wav')
+    """
+    engine = get_playback_engine()
+    if engine is not None:
+        try:
+            engine.play_bytes(data, ext)
+            return
+        except Exception as e:
+            print(f"⚠️  Error playing audio: {e}")
+            return
+
+    import tempfile
+
+    tmp_file = tempfile.NamedTemporaryFile(suffix=f".{ext}", delete=False)
+    tmp_file.write(data)
+    tmp_file.close()
+    try:
+        play_audio_file(tmp_file.name)
+    finally:
+        os.remove(tmp_file.name)
@@ -0,0 +1,257 @@
+"""
+Batched Whisper transcription
+transcribe_batch() cuts every utterance into 30 s windows, stacks the log-mel
+windows of all utterances and decodes them in one forward pass per batch.
+BatchTranscriber is a micro-batching scheduler in front of it: concurrent
+callers submit audio, and requests arriving within max_wait of each other are
+decoded together.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from digital_twin_like.model_registry import get_model_registry
+from digital_twin_like.speech_to_text import WHISPER_SAMPLE_RATE, prepare_audio
+
+
+# Whisper's transcribe() defaults for rejecting a greedy decode
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def split_windows(audio, window_samples):
+    """Cut audio into consecutive windows of at most window_samples"""
+    if len(audio) <= window_samples:
+        return [audio]
+    return [audio[i:i + window_samples] for i in range(0, len(audio), window_samples)]
+
+
+def decode_in_windows(audios, window_samples, max_windows, decode_chunk):
+    """
+    Decode utterances window by window in chunks and reassemble the transcripts
+
+    Args:
+        audios: List of sample arrays
+        window_samples: Longest window in samples
+        max_windows: Most windows passed to decode_chunk at once
+        decode_chunk: Callable(list of window arrays) -> list of texts, one
+                      per window ('' for windows without speech)
+
+    Returns:
+        List of transcript strings, in input order
+    """
+    windows = []   # (utterance index, samples)
+    for index, audio in enumerate(audios):
+        for window in split_windows(audio, window_samples):
+            if len(window):
+                windows.append((index, window))
+
+    pieces = [[] for _ in audios]
+    for start in range(0, len(windows), max_windows):
+        chunk = windows[start:start + max_windows]
+        texts = decode_chunk([samples for _, samples in chunk])
+        for (index, _), text in zip(chunk, texts):
+            pieces[index].append(text.strip())
+
+    return [" ".join(p for p in texts if p) for texts in pieces]
+
+
+def transcribe_batch(model, audios, language="en", max_windows=16):
+    """
+    Transcribe several utterances with batched decoding
+
+    Each utterance is cut into 30 s windows; windows are padded to 30 s,
+    converted to log-mel, stacked and greedily decoded together, up to
+    max_windows per forward pass. Windows whose greedy result Whisper would
+    reject (repetitive or low-confidence) are re-decoded on their own with
+    transcribe()'s temperature fallback. Models without openai-whisper's
+    decode interface (faster-whisper) transcribe one utterance at a time.
+    Call with the model lock held.
+
+    Args:
+        model: Loaded Whisper model
+        audios: List of float32 16 kHz arrays
+        language: Spoken language
+        max_windows: Most 30 s windows in one forward pass
+
+    Returns:
+        List of transcript strings, in input order
+    """
+    if not hasattr(model, "dims"):
+        return [model.transcribe(audio, language=language)["text"].strip() for audio in audios]
+
+    import torch
+    import whisper
+    from whisper.audio import N_SAMPLES, log_mel_spectrogram, pad_or_trim
+
+    options = whisper.DecodingOptions(language=language, without_timestamps=True,
+                                      fp16=model.device.type != "cpu")
+
+    def decode_chunk(chunk):
+        mels = torch.stack([
+            log_mel_spectrogram(pad_or_trim(torch.from_numpy(samples)), model.dims.n_mels)
+            for samples in chunk
+        ]).to(model.device)
+        texts = []
+        for samples, result in zip(chunk, whisper.decode(model, mels, options)):
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                texts.append("")
+            elif (result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                    or result.avg_logprob < LOGPROB_THRESHOLD):
+                texts.append(model.transcribe(samples, language=language)["text"])
+            else:
+                texts.append(result.text)
+        return texts
+
+    return decode_in_windows(audios, N_SAMPLES, max_windows, decode_chunk)
+
+
+class BatchTranscriber:
+    """Groups concurrent transcription requests for one shared Whisper model"""
+
+    def __init__(self, model_size="base", max_batch_size=8, max_wait=0.02, batched=True,
+                 backend="torch"):
+        """
+        Initialize the batcher
+
+        Args:
+            model_size: Whisper model size, shared through the model registry
+            max_batch_size: Most requests transcribed in one batch
+            max_wait: Seconds the first request of a batch waits for company
+            batched: Decode a batch in one forward pass (False: one
+                     transcribe() call per request, for comparison)
+            backend: Whisper inference backend (see model_registry)
+        """
+        self.model_size = model_size
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batched = batched
+        self._requests = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.requests = 0
+        self.audio_seconds = 0.0
+        self.processing_seconds = 0.0
+        self.latencies = deque(maxlen=10000)
+
+    def start(self):
+        """Start the scheduler thread (also called lazily by submit())"""
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="batch-transcriber",
+                                                daemon=True)
+                self._worker.start()
+        return self
+
+    def close(self):
+        """Stop the scheduler thread after the queued requests"""
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def submit(self, audio, sample_rate=WHISPER_SAMPLE_RATE):
+        """
+        Queue audio for transcription
+
+        Args:
+            audio: 1-D float samples
+            sample_rate: Sample rate of the samples
+
+        Returns:
+            Future resolving to the transcript text
+        """
+        self.start()
+        future = Future()
+        self._requests.put((prepare_audio(audio, sample_rate), future, time.perf_counter()))
+        return future
+
+    def transcribe(self, audio, sample_rate=WHISPER_SAMPLE_RATE):
+        """Transcribe audio, blocking until its batch has been processed"""
+        return self.submit(audio, sample_rate).result()
+
+    def _next_batch(self):
+        first = self._requests.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._requests.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            audios = [audio for audio, _, _ in batch]
+            start = time.perf_counter()
+            try:
+                texts = self._transcribe_batch(audios)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finished = time.perf_counter()
+
+            with self._lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.audio_seconds += sum(len(a) for a in audios) / WHISPER_SAMPLE_RATE
+                self.processing_seconds += finished - start
+                self.latencies.extend(finished - submitted for _, _, submitted in batch)
+            for (_, future, _), text in zip(batch, texts):
+                future.set_result(text)
+
+    def _transcribe_batch(self, audios):
+        """Transcribe a batch while holding the model lock once"""
+        registry = get_model_registry()
+        model = registry.get(self.model_size, self.backend)
+        with registry.lock_for(self.model_size, self.backend):
+            if self.batched:
+                return transcribe_batch(model, audios, max_windows=max(self.max_batch_size, 1))
+            return [model.transcribe(audio, language="en")["text"].strip() for audio in audios]
+
+    def stats(self):
+        """
+        Get batching statistics
+
+        Returns:
+            Dict with batch and request counts, the mean batch size, per-request
+            latency percentiles (queueing included) and the aggregate real-time
+            factor (processing time / audio duration; below 1 is faster than real time)
+        """
+        with self._lock:
+            latencies = np.array(self.latencies) if self.latencies else None
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "queued": self._requests.qsize(),
+                "audio_s": self.audio_seconds,
+                "processing_s": self.processing_seconds,
+                "real_time_factor": (self.processing_seconds / self.audio_seconds
+                                     if self.audio_seconds else None),
+                "latency_p50_s": float(np.percentile(latencies, 50)) if latencies is not None else None,
+                "latency_p95_s": float(np.percentile(latencies, 95)) if latencies is not None else None,
+            }
@@ -0,0 +1,276 @@
+"""
+Bulk offline transcription of a directory of recordings
+Files are streamed in chunks (cut at quiet points) instead of being loaded
+whole, transcribed on a process pool with one Whisper model per worker, and
+written as JSONL segments with timestamps. A manifest and per-file progress
+checkpoints let an interrupted run resume where it stopped.
+
+Usage:
+    bulk_transcribe recordings/ [--output transcripts/] [--workers 4] [--model base] [--backend int8]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from digital_twin_like.model_registry import WHISPER_BACKENDS
+
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3")
+MANIFEST_NAME = "manifest.json"
+
+# Per-process Whisper model for the transcription pool
+_worker_model = None
+
+
+def find_cut(audio, sample_rate, search_seconds=3.0, frame_seconds=0.05):
+    """
+    Pick a chunk boundary at the quietest frame near the end of a block
+
+    Args:
+        audio: 1-D float32 samples
+        sample_rate: Sample rate of the samples
+        search_seconds: How far back from the end to look for a pause
+        frame_seconds: Energy frame length
+
+    Returns:
+        Sample index to cut at
+    """
+    frame = max(1, int(frame_seconds * sample_rate))
+    search_start = max(0, len(audio) - int(search_seconds * sample_rate))
+    tail = audio[search_start:]
+    n_frames = len(tail) // frame
+    if n_frames < 2:
+        return len(audio)
+    energy = np.square(tail[:n_frames * frame].reshape(n_frames, frame)).mean(axis=1)
+    quietest = int(np.argmin(energy))
+    return search_start + quietest * frame + frame // 2
+
+
+def atomic_write_json(path, data):
+    """Write JSON so a crash never leaves a half-written file"""
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def file_signature(path):
+    """Size and modification time identifying one version of a recording"""
+    stat = Path(path).stat()
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def _init_worker(model_size, threads, backend="torch"):
+    global _worker_model
+    from digital_twin_like.model_registry import load_whisper_model
+
+    # Each worker gets its own share of the cores instead of all of them
+    _worker_model = load_whisper_model(model_size, backend, threads)
+
+
+def transcribe_file(path, relative, output_dir, chunk_seconds=30.0):
+    """
+    Transcribe one recording chunk by chunk (runs in a pool worker)
+
+    Progress is checkpointed after every chunk as (frames consumed, bytes of
+    JSONL written), so a restarted run truncates the partial output to the
+    last checkpoint and continues from there. The checkpoint records the
+    recording's size and mtime; if the recording changed since, the partial
+    output is discarded and the file is transcribed from the start.
+
+    Args:
+        path: Audio file path
+        relative: Path relative to the input directory (used in the output)
+        output_dir: Directory for transcripts
+        chunk_seconds: Target chunk length (Whisper decodes 30 s windows)
+
+    Returns:
+        Summary dict for the manifest
+    """
+    import soundfile as sf
+    from digital_twin_like.speech_to_text import prepare_audio
+
+    output = Path(output_dir) / f"{relative}.jsonl"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    partial = Path(f"{output}.partial")
+    progress_path = Path(f"{output}.progress")
+
+    source = file_signature(path)
+    progress = None
+    if progress_path.exists() and partial.exists():
+        with open(progress_path) as f:
+            progress = json.load(f)
+        if progress.get("source") != source:
+            print(f"⚠️  {relative} changed since it was interrupted - starting over")
+            progress = None
+    if progress is None:
+        partial.unlink(missing_ok=True)
+        progress_path.unlink(missing_ok=True)
+        progress = {"frames": 0, "bytes": 0, "segments": 0, "source": source}
+
+    start = time.perf_counter()
+    prompt = None
+    with sf.SoundFile(str(path)) as audio_file, open(partial, 'ab') as out:
+        out.truncate(progress["bytes"])
+        out.seek(progress["bytes"])
+        sample_rate = audio_file.samplerate
+        chunk_frames = int(chunk_seconds * sample_rate)
+        audio_file.seek(progress["frames"])
+        offset = progress["frames"]
+        carry = np.zeros(0, dtype=np.float32)
+
+        while True:
+            block = audio_file.read(chunk_frames - len(carry), dtype="float32", always_2d=True)
+            at_end = len(block) < chunk_frames - len(carry)
+            audio = np.concatenate([carry, block.mean(axis=1)])
+            if not len(audio):
+                break
+
+            cut = len(audio) if at_end else find_cut(audio, sample_rate)
+            piece, carry = audio[:cut], audio[cut:]
+            chunk_start = offset / sample_rate
+
+            result = _worker_model.transcribe(prepare_audio(piece, sample_rate), language="en",
+                                              condition_on_previous_text=False,
+                                              initial_prompt=prompt)
+            for segment in result["segments"]:
+                text = segment["text"].strip()
+                if not text:
+                    continue
+                record = {
+                    "file": str(relative),
+                    "start": round(chunk_start + segment["start"], 2),
+                    "end": round(chunk_start + segment["end"], 2),
+                    "text": text,
+                }
+                out.write((json.dumps(record) + "\n").encode())
+                progress["segments"] += 1
+            out.flush()
+            prompt = result["text"][-200:] or None
+
+            offset += cut
+            progress["frames"] = offset
+            progress["bytes"] = out.tell()
+            atomic_write_json(progress_path, progress)
+
+            if at_end and not len(carry):
+                break
+
+        duration = audio_file.frames / sample_rate
+
+    os.replace(partial, output)
+    progress_path.unlink(missing_ok=True)
+    elapsed = time.perf_counter() - start
+    return {
+        "status": "done",
+        "output": str(output.relative_to(output_dir)),
+        "segments": progress["segments"],
+        "duration_s": round(duration, 2),
+        "elapsed_s": round(elapsed, 2),
+    }
+
+
+def find_recordings(input_dir, extensions=AUDIO_EXTENSIONS):
+    """List audio files under a directory, sorted for a stable order"""
+    input_dir = Path(input_dir)
+    return sorted(p for p in input_dir.rglob("*")
+                  if p.is_file() and p.suffix.lower() in extensions)
+
+
+def main(argv=None):
+    """Entry point for the bulk_transcribe command"""
+    parser = argparse.ArgumentParser(prog="bulk_transcribe",
+                                     description="Transcribe a directory of recordings to JSONL")
+    parser.add_argument("input_dir", help="Directory of recordings (searched recursively)")
+    parser.add_argument("--output", help="Transcript directory (default: <input_dir>/transcripts)")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--backend", default="torch", choices=WHISPER_BACKENDS,
+                        help="Whisper inference backend (int8/faster-whisper: quantized CPU)")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Worker processes, each with its own model")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Torch threads per worker (default: cores / workers)")
+    parser.add_argument("--chunk-seconds", type=float, default=30.0)
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and redo everything")
+    args = parser.parse_args(argv)
+
+    input_dir = Path(args.input_dir)
+    output_dir = Path(args.output) if args.output else input_dir / "transcripts"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+
+    manifest = {}
+    if manifest_path.exists() and not args.force:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    pending = []
+    skipped = 0
+    for path in find_recordings(input_dir):
+        if output_dir.resolve() in path.resolve().parents:
+            continue
+        relative = path.relative_to(input_dir).as_posix()
+        if args.force:
+            Path(f"{output_dir / relative}.jsonl.progress").unlink(missing_ok=True)
+        entry = manifest.get(relative, {})
+        if (entry.get("status") == "done" and entry.get("source") == file_signature(path)
+                and (output_dir / entry["output"]).exists()):
+            skipped += 1
+            continue
+        pending.append((path, relative))
+
+    print("\n" + "="*60)
+    print("BULK TRANSCRIPTION")
+    print("="*60)
+    print(f"{len(pending)} to transcribe, {skipped} already done, "
+          f"{args.workers} workers, model '{args.model}' ({args.backend})\n")
+    if not pending:
+        return
+
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    start = time.perf_counter()
+    total_audio = 0.0
+    failures = 0
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.model, threads, args.backend)) as pool:
+        futures = {
+            pool.submit(transcribe_file, str(path), relative, str(output_dir), args.chunk_seconds):
+                (path, relative)
+            for path, relative in pending
+        }
+        try:
+            for future in as_completed(futures):
+                path, relative = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    failures += 1
+                    print(f"⚠️  {relative}: {e}")
+                    manifest[relative] = {"status": "failed", "error": str(e)}
+                else:
+                    entry["source"] = file_signature(path)
+                    manifest[relative] = entry
+                    total_audio += entry["duration_s"]
+                    print(f"✓ {relative}: {entry['segments']} segments, {entry['duration_s']:.0f}s "
+                          f"of audio in {entry['elapsed_s']:.0f}s")
+                atomic_write_json(manifest_path, manifest)
+        except KeyboardInterrupt:
+            print("\n\nInterrupted - rerun the same command to resume")
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✓ {len(pending) - failures} files, {total_audio / 60:.1f} min of audio in "
+          f"{elapsed / 60:.1f} min (RTF {elapsed / total_audio if total_audio else 0:.3f})")
+    print(f"Transcripts: {output_dir}")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Concurrent execution of the DigitalTwinLike crew's tasks
+The crew's tasks do not consume each other's output, so instead of one
+sequential crew each task runs as its own single-task crew on a bounded thread
+pool. Outputs come back in the order the tasks are defined, and each output is
+cached on disk keyed by the task and agent configuration, the kickoff inputs,
+the LLM model and a hash of the knowledge base, so re-runs skip unchanged tasks.
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+from digital_twin_like.paths import get_cache_dir
+from digital_twin_like.tools.knowledge_store import get_knowledge_store
+
+
+CONFIG_DIR = Path(__file__).parent / "config"
+
+
+def load_config(filename):
+    """Load a crew YAML config as plain data (CrewBase replaces names with objects)"""
+    with open(CONFIG_DIR / filename) as f:
+        return yaml.safe_load(f) or {}
+
+
+def task_cache_key(task_name, task_config, agent_config, inputs, knowledge_hash):
+    """
+    Cache key for one task's output
+
+    Args:
+        task_name: Name of the task in tasks.yaml
+        task_config: The task's YAML configuration
+        agent_config: Configuration of the agent performing it
+        inputs: Kickoff inputs interpolated into the task
+        knowledge_hash: Fingerprint of the knowledge base
+
+    Returns:
+        Hex digest
+    """
+    source = json.dumps({
+        "task": task_name,
+        "task_config": task_config,
+        "agent_config": agent_config,
+        "inputs": inputs,
+        "model": os.getenv("MODEL") or os.getenv("OPENAI_MODEL_NAME") or "",
+        "knowledge": knowledge_hash,
+    }, sort_keys=True)
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+class TaskOutputCache:
+    """Task outputs stored as one JSON file per cache key"""
+
+    def __init__(self, cache_dir=None):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory for the entries (default: .cache/task_outputs)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else get_cache_dir("task_outputs")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key):
+        """Cached entry dict for a key, or None"""
+        try:
+            with open(self.cache_dir / f"{key}.json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, entry):
+        """Store an entry dict (written atomically)"""
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        """Remove every cached task output"""
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+def run_task(task_name, inputs, verbose=False):
+    """
+    Run one task of the DigitalTwinLike crew as a single-task crew
+
+    A fresh CrewBase instance is created per call so concurrent tasks never
+    share an Agent (agents keep per-execution state).
+
+    Args:
+        task_name: Name of the task in tasks.yaml
+        inputs: Kickoff inputs
+        verbose: CrewAI verbose logging
+
+    Returns:
+        The task's raw output text
+    """
+    from crewai import Crew, Process
+    from digital_twin_like.crew import DigitalTwinLike
+
+    twin = DigitalTwinLike()
+    task = getattr(twin, task_name)()
+    crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=verbose)
+    return crew.kickoff(inputs=inputs).raw
+
+
+class ConcurrentCrewRunner:
+    """Runs the crew's independent tasks in parallel with per-task output caching"""
+
+    def __init__(self, max_concurrency=4, use_cache=True, cache_dir=None, verbose=False):
+        """
+        Initialize the runner
+
+        Args:
+            max_concurrency: Most tasks (LLM conversations) in flight at once
+            use_cache: Reuse the stored output of unchanged tasks
+            cache_dir: Directory for cached task outputs
+            verbose: CrewAI verbose logging (interleaves when tasks run concurrently)
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.verbose = verbose
+        self.cache = TaskOutputCache(cache_dir) if use_cache else None
+        self.tasks_config = load_config("tasks.yaml")
+        self.agents_config = load_config("agents.yaml")
+
+    def task_names(self):
+        """Task names in definition order"""
+        return list(self.tasks_config)
+
+    def run(self, inputs=None, task_names=None):
+        """
+        Run tasks concurrently
+
+        Args:
+            inputs: Kickoff inputs shared by every task
+            task_names: Tasks to run (default: all, in definition order)
+
+        Returns:
+            Dict with 'tasks' (one dict per task, in the requested order, with
+            'name', 'output', 'seconds' and 'cached'), 'wall_s', 'task_s' (sum of
+            the tasks' own durations) and 'speedup'
+        """
+        inputs = inputs or {}
+        task_names = task_names or self.task_names()
+        for name in task_names:
+            if self.tasks_config[name].get("context"):
+                raise ValueError(f"Task '{name}' depends on other tasks' output "
+                                 "and cannot run concurrently")
+
+        knowledge_hash = get_knowledge_store().fingerprint()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                thread_name_prefix="crew-task") as executor:
+            futures = [executor.submit(self._run_cached, name, inputs, knowledge_hash)
+                       for name in task_names]
+            # Collected in submission order, so the output order never depends on timing
+            results = [future.result() for future in futures]
+        wall = time.perf_counter() - start
+
+        task_seconds = sum(r["seconds"] for r in results)
+        return {
+            "tasks": results,
+            "wall_s": wall,
+            "task_s": task_seconds,
+            "speedup": task_seconds / wall if wall else 0.0,
+        }
+
+    def _run_cached(self, name, inputs, knowledge_hash):
+        config = self.tasks_config[name]
+        key = task_cache_key(name, config, self.agents_config.get(config.get("agent")),
+                             inputs, knowledge_hash)
+        if self.cache is not None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                return {"name": name, "output": entry["output"], "seconds": 0.0, "cached": True}
+
+        start = time.perf_counter()
+        output = run_task(name, inputs, verbose=self.verbose)
+        seconds = time.perf_counter() - start
+        if self.cache is not None:
+            self.cache.put(key, {"task": name, "output": output, "seconds": seconds,
+                                 "created_at": time.time()})
+        return {"name": name, "output": output, "seconds": seconds, "cached": False}
+
+
+def format_run_report(report):
+    """
+    Format the timing summary of ConcurrentCrewRunner.run()
+
+    Args:
+        report: Dict returned by run()
+
+    Returns:
+        Multi-line summary
+    """
+    lines = []
+    for task in report["tasks"]:
+        status = "cached" if task["cached"] else f"{task['seconds']:.1f}s"
+        lines.append(f"  {task['name']:<28} {status}")
+    lines.append(f"Wall clock {report['wall_s']:.1f}s vs {report['task_s']:.1f}s summed task time "
+                 f"({report['speedup']:.1f}x)")
+    return "\n".join(lines)
@@ -0,0 +1,220 @@
+"""
+Token-bounded conversation memory
+Keeps the most recent turns verbatim and folds older ones into a rolling
+summary, whose oldest lines are compacted into a single line of topics, so the
+history added to every prompt stays under a fixed token budget however long
+the conversation runs.
+"""
+import re
+import threading
+from collections import deque
+
+from digital_twin_like.tools.knowledge_sections import estimate_tokens
+
+
+def shorten(text, max_words):
+    """First max_words words of text, with an ellipsis if cut"""
+    words = text.split()
+    if len(words) <= max_words:
+        return " ".join(words)
+    return " ".join(words[:max_words]) + "..."
+
+
+def first_sentence(text):
+    """First sentence of a response (the gist of most conversational answers)"""
+    match = re.match(r"(.+?[.!?])(\s|$)", text.strip(), re.S)
+    return match.group(1) if match else text.strip()
+
+
+def summary_topic(line, max_words=6):
+    """Short topic of a summary line, e.g. 'where did you go to school'"""
+    match = re.search(r"Asked: (.*?)(?: \| |$)", line)
+    text = match.group(1) if match else line.lstrip("- ")
+    return shorten(text.rstrip("?.!"), max_words)
+
+
+def extractive_summarizer(summary_lines, turns):
+    """
+    Default summarizer: one compact line per evicted turn, no LLM call
+
+    Args:
+        summary_lines: Current summary lines (oldest first)
+        turns: Evicted (user, assistant) pairs, oldest first
+
+    Returns:
+        Updated list of summary lines
+    """
+    return summary_lines + [
+        f"- Asked: {shorten(user, 20)} | Answered: {shorten(first_sentence(assistant), 30)}"
+        for user, assistant in turns
+    ]
+
+
+class ConversationMemory:
+    """Ring buffer of recent turns plus an incrementally updated rolling summary"""
+
+    def __init__(self, max_tokens=800, max_recent_turns=4, summary_tokens=250, summarizer=None):
+        """
+        Initialize an empty memory
+
+        Args:
+            max_tokens: Budget for the whole history block added to a prompt
+            max_recent_turns: Most turns kept verbatim
+            summary_tokens: Share of the budget reserved for the summary of older turns
+            summarizer: Callable(summary_lines, evicted_turns) -> summary_lines
+                        (default: extractive_summarizer)
+        """
+        self.max_tokens = max_tokens
+        self.max_recent_turns = max_recent_turns
+        self.summary_tokens = min(summary_tokens, max_tokens)
+        self.summarizer = summarizer or extractive_summarizer
+
+        self._recent = deque()
+        self._summary = []
+        self._earlier = []          # topics of compacted summary lines, oldest first
+        self._earlier_dropped = 0   # topics that no longer fit even compacted
+        self._lock = threading.Lock()
+        self.turns = 0
+
+    def __len__(self):
+        return self.turns
+
+    def add_turn(self, user_input, response):
+        """
+        Record a completed turn, evicting the oldest turns into the summary as needed
+
+        Args:
+            user_input: What the user said
+            response: What the twin answered
+        """
+        if not user_input or not response:
+            return
+        with self._lock:
+            self.turns += 1
+            self._recent.append((user_input, response))
+
+            evicted = []
+            recent_budget = self.max_tokens - self.summary_tokens
+            while len(self._recent) > 1 and (
+                    len(self._recent) > self.max_recent_turns
+                    or self._recent_tokens() > recent_budget):
+                evicted.append(self._recent.popleft())
+            if evicted:
+                self._summary = self.summarizer(self._summary, evicted)
+                self._compact_summary()
+
+    def forget_turn(self, user_input, response):
+        """
+        Remove a turn the user never heard (e.g. an answer cut off by barge-in)
+
+        Args:
+            user_input: What the user said
+            response: The answer that was recorded for it
+
+        Returns:
+            True if the turn was still kept verbatim and has been removed
+        """
+        with self._lock:
+            for index in range(len(self._recent) - 1, -1, -1):
+                if self._recent[index] == (user_input, response):
+                    del self._recent[index]
+                    self.turns -= 1
+                    return True
+            return False
+
+    def _compact_summary(self):
+        """Fold the oldest summary lines into the 'Earlier' topics line until the summary fits its share"""
+        while self._summary and self._summary_tokens() > self.summary_tokens:
+            self._earlier.append(summary_topic(self._summary.pop(0)))
+        # Only the oldest topics are ever dropped, and they are still counted
+        while len(self._earlier) > 1 and self._summary_tokens() > self.summary_tokens:
+            self._earlier.pop(0)
+            self._earlier_dropped += 1
+
+    def _summary_lines(self):
+        lines = list(self._summary)
+        if self._earlier:
+            older = f" (+{self._earlier_dropped} older)" if self._earlier_dropped else ""
+            lines.insert(0, f"- Earlier{older}: " + "; ".join(self._earlier))
+        return lines
+
+    def _recent_tokens(self):
+        return sum(estimate_tokens(self._format_turn(u, a)) for u, a in self._recent)
+
+    def _summary_tokens(self):
+        return estimate_tokens("\n".join(self._summary_lines()))
+
+    def _format_turn(self, user_input, response):
+        return f"User: {user_input}\nTim: {response}"
+
+    def _render(self, summary_lines, turns):
+        parts = ["Conversation so far (for context; answer only the new question):"]
+        if summary_lines:
+            parts.append("Earlier topics:\n" + "\n".join(summary_lines))
+        parts.append("Recent turns:\n" + "\n\n".join(turns))
+        return "\n\n".join(parts) + "\n\n"
+
+    def context(self):
+        """
+        History block for the next prompt
+
+        Returns:
+            Summary and recent turns within max_tokens, or '' before the first turn.
+            Over budget, the oldest material is dropped first; the newest turn
+            is only shortened (from the start of its answer) if it alone is too long.
+        """
+        with self._lock:
+            if not self._recent:
+                return ""
+            summary = self._summary_lines()
+            turns = [self._format_turn(u, a) for u, a in self._recent]
+            user_input, response = self._recent[-1]
+
+        text = self._render(summary, turns)
+        while estimate_tokens(text) > self.max_tokens and (summary or len(turns) > 1):
+            if summary:
+                summary.pop(0)
+            else:
+                turns.pop(0)
+            text = self._render(summary, turns)
+        if estimate_tokens(text) <= self.max_tokens:
+            return text
+
+        # Keep the question and the end of the answer, which a follow-up most likely refers to
+        user_input = shorten(user_input, 40)
+        text = self._render([], [self._format_turn(user_input, response)])
+        excess = len(text) - self.max_tokens * 4
+        if excess > 0:
+            tail = response[excess + 3:]
+            if " " in tail:
+                tail = tail.split(" ", 1)[1]
+            text = self._render([], [self._format_turn(user_input, "..." + tail)])
+        if estimate_tokens(text) > self.max_tokens:
+            text = text[len(text) - self.max_tokens * 4:]
+        return text
+
+    def clear(self):
+        """Forget the conversation"""
+        with self._lock:
+            self._recent.clear()
+            self._summary = []
+            self._earlier = []
+            self._earlier_dropped = 0
+            self.turns = 0
+
+    def stats(self):
+        """
+        Get memory statistics
+
+        Returns:
+            Dict with total turns, verbatim turns, summary lines and context tokens
+        """
+        context_tokens = estimate_tokens(self.context())
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "recent_turns": len(self._recent),
+                "summary_lines": len(self._summary_lines()),
+                "context_tokens": context_tokens,
+                "max_tokens": self.max_tokens,
+            }
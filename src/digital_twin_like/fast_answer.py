@@ -0,0 +1,103 @@
+"""
+Retrieval-augmented single-shot answering
+Instead of letting the agent call knowledge tools (one extra LLM round trip per
+tool call in CrewAI's ReAct loop), the passages most relevant to the question
+are retrieved from the BM25 index up front and answered in a single LLM call.
+When retrieval confidence is low the caller falls back to the tool-using agent.
+"""
+from digital_twin_like.tools.knowledge_index import get_knowledge_index, tokenize
+
+
+# Retrieval is trusted when the best passage scores at least MIN_SCORE and the
+# retrieved passages cover at least MIN_COVERAGE of the question's terms
+MIN_SCORE = 1.0
+MIN_COVERAGE = 0.5
+TOP_K = 5
+
+# Upper bound on the context pasted into the prompt
+MAX_CONTEXT_CHARS = 6000
+
+FAST_PATH_INSTRUCTIONS = """You are the digital representation of Wuxinhao (Tim) Cao, a graduate student and researcher
+at Harvard University specializing in computational biology and spatial transcriptomics.
+Answer the question in the first person, conversationally and authentically, as Tim himself would.
+Use only the facts in the knowledge base excerpts below; do not invent details they do not contain."""
+
+
+def retrieve_context(question, top_k=TOP_K, max_chars=MAX_CONTEXT_CHARS):
+    """
+    Retrieve knowledge passages for a question and rate how well they cover it
+
+    Args:
+        question: User's question
+        top_k: Passages to retrieve
+        max_chars: Most characters of passage text to return
+
+    Returns:
+        Dict with 'passages' (best first), 'top_score', 'coverage' (fraction of
+        the question's terms found in the passages) and 'confidence' (coverage,
+        or 0 when the best passage scores below MIN_SCORE)
+    """
+    results = get_knowledge_index().search(question, top_k=top_k)
+
+    passages = []
+    used = 0
+    for result in results:
+        if passages and used + len(result["text"]) > max_chars:
+            break
+        passages.append(result)
+        used += len(result["text"])
+
+    terms = set(tokenize(question))
+    found = set()
+    for passage in passages:
+        found.update(tokenize(passage["section"] + " " + passage["text"]))
+    coverage = len(terms & found) / len(terms) if terms else 0.0
+    top_score = passages[0]["score"] if passages else 0.0
+
+    return {
+        "passages": passages,
+        "top_score": top_score,
+        "coverage": coverage,
+        "confidence": coverage if top_score >= MIN_SCORE else 0.0,
+    }
+
+
+def build_messages(question, passages, history=""):
+    """
+    Build the single-call chat prompt
+
+    Args:
+        question: User's question
+        passages: Retrieved passage dicts
+        history: Conversation history block from ConversationMemory.context()
+
+    Returns:
+        List of chat messages
+    """
+    context = "\n\n".join(
+        f"[{p['filename']}{' - ' + p['section'] if p['section'] else ''}]\n{p['text']}"
+        for p in passages
+    )
+    return [
+        {"role": "system", "content": f"{FAST_PATH_INSTRUCTIONS}\n\nKnowledge base excerpts:\n{context}"},
+        {"role": "user", "content": f"{history}{question}"},
+    ]
+
+
+def fast_path_messages(question, history="", min_confidence=MIN_COVERAGE):
+    """
+    Route a question to the single-call fast path or the tool-using agent
+
+    Args:
+        question: User's question
+        history: Conversation history block from ConversationMemory.context()
+        min_confidence: Lowest retrieval confidence answered on the fast path
+
+    Returns:
+        (messages, retrieval): the single-call prompt, or None when the agent
+        should answer, and the retrieve_context() result
+    """
+    retrieval = retrieve_context(question)
+    if retrieval["confidence"] < min_confidence:
+        return None, retrieval
+    return build_messages(question, retrieval["passages"], history), retrieval
@@ -22,5 +22,29 @@ def run():
     print(result)
     print("\n" + "="*50 + "\n")
 
+def run_concurrent():
+    """
+    Run all crew tasks concurrently, reusing cached outputs of unchanged tasks
+
+    Options: --concurrency N (default 4), --no-cache
+    """
+    from digital_twin_like.concurrent_crew import ConcurrentCrewRunner, format_run_report
+
+    concurrency = 4
+    if "--concurrency" in sys.argv:
+        concurrency = int(sys.argv[sys.argv.index("--concurrency") + 1])
+
+    print("=== Tim's Digital Twin (concurrent tasks) ===")
+
+    runner = ConcurrentCrewRunner(max_concurrency=concurrency,
+                                  use_cache="--no-cache" not in sys.argv)
+    report = runner.run(inputs={})
+    for task in report["tasks"]:
+        print(f"\n--- {task['name']} ---")
+        print(task["output"])
+    print("\n" + "="*50)
+    print(format_run_report(report))
+    print("="*50 + "\n")
+
 if __name__ == "__main__":
     run()
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+Process-wide registry of loaded Whisper models
+Each (model size, backend) pair is loaded once per process and can be warmed up
+in the background. Backends:
+    torch          - openai-whisper in fp32 (fp16 on GPU)
+    int8           - openai-whisper with dynamically int8-quantized linear layers (CPU)
+    faster-whisper - CTranslate2 int8 runtime, if the faster-whisper package is installed
+"""
+import threading
+import time
+
+import numpy as np
+
+from digital_twin_like.startup_profile import get_startup_profiler
+
+
+WHISPER_BACKENDS = ("torch", "int8", "faster-whisper")
+
+
+def model_key(model_size, backend="torch"):
+    """Registry key for a model size/backend pair ('base', 'base:int8', ...)"""
+    return model_size if backend == "torch" else f"{model_size}:{backend}"
+
+
+def set_inference_threads(threads):
+    """
+    Set the number of CPU threads used by PyTorch inference
+
+    Args:
+        threads: Thread count (None leaves the default, one per core)
+    """
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+
+
+def quantize_whisper_int8(model):
+    """
+    Dynamically quantize a Whisper model's linear layers to int8 for CPU inference
+
+    Args:
+        model: Loaded openai-whisper model (on CPU)
+
+    Returns:
+        The quantized model
+    """
+    import torch
+    from whisper.model import Linear as WhisperLinear
+
+    # Whisper's Linear only adds a dtype cast in forward(); turning it back
+    # into a plain nn.Linear lets quantize_dynamic recognize and replace it
+    for module in model.modules():
+        if isinstance(module, WhisperLinear):
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8,
+                                             inplace=True)
+
+
+class FasterWhisperModel:
+    """Adapter giving a faster-whisper model openai-whisper's transcribe() interface"""
+
+    def __init__(self, model_size, threads=None):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(model_size, device="cpu", compute_type="int8",
+                                  cpu_threads=threads or 0)
+
+    def transcribe(self, audio, language=None, initial_prompt=None,
+                   condition_on_previous_text=True, temperature=None, **options):
+        """
+        Transcribe audio
+
+        Returns:
+            Dict with 'text' and 'segments' (each with 'start', 'end', 'text')
+        """
+        kwargs = {}
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        segments, _ = self.model.transcribe(audio, language=language, initial_prompt=initial_prompt,
+                                            condition_on_previous_text=condition_on_previous_text,
+                                            **kwargs)
+        segments = [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
+        return {"text": "".join(s["text"] for s in segments), "segments": segments}
+
+
+def load_whisper_model(model_size, backend="torch", threads=None):
+    """
+    Load a Whisper model with the given inference backend
+
+    Args:
+        model_size: Whisper model size
+        backend: 'torch', 'int8' or 'faster-whisper'
+        threads: CPU threads for inference (None: library default)
+
+    Returns:
+        Model object with openai-whisper's transcribe() interface
+    """
+    if backend not in WHISPER_BACKENDS:
+        raise ValueError(f"Unknown Whisper backend '{backend}' (choose from {', '.join(WHISPER_BACKENDS)})")
+
+    if backend == "faster-whisper":
+        return FasterWhisperModel(model_size, threads)
+
+    import whisper
+
+    set_inference_threads(threads)
+    if backend == "int8":
+        return quantize_whisper_int8(whisper.load_model(model_size, device="cpu"))
+    return whisper.load_model(model_size)
+
+
+class WhisperModelRegistry:
+    """Loads each Whisper model size/backend once and shares it across SpeechToText instances"""
+
+    def __init__(self):
+        self._models = {}
+        self._model_locks = {}    # serializes inference: Whisper installs hooks per decode
+        self._load_locks = {}
+        self._warm = set()
+        self._lock = threading.Lock()
+        self.load_times = {}
+        self.warm_up_times = {}
+
+    def _load_lock(self, model_size):
+        with self._lock:
+            return self._load_locks.setdefault(model_size, threading.Lock())
+
+    def get(self, model_size="base", backend="torch", threads=None):
+        """
+        Get a loaded model, loading it on first use
+
+        Args:
+            model_size: Whisper model size (tiny, base, small, medium, large)
+            backend: Inference backend ('torch', 'int8', 'faster-whisper')
+            threads: CPU threads for inference, applied when the model is loaded
+
+        Returns:
+            Loaded Whisper model
+        """
+        key = model_key(model_size, backend)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._load_lock(key):
+            model = self._models.get(key)
+            if model is None:
+                profiler = get_startup_profiler()
+                with profiler.phase("import whisper"):
+                    if backend == "faster-whisper":
+                        import faster_whisper  # noqa: F401
+                    else:
+                        import whisper  # noqa: F401
+
+                print(f"Loading Whisper {key} model...")
+                start = time.perf_counter()
+                with profiler.phase(f"load whisper {key}"):
+                    model = load_whisper_model(model_size, backend, threads)
+                self.load_times[key] = time.perf_counter() - start
+                print(f"✓ Whisper {key} loaded in {self.load_times[key]:.2f}s")
+
+                with self._lock:
+                    self._model_locks[key] = threading.Lock()
+                    self._models[key] = model
+        return model
+
+    def lock_for(self, model_size="base", backend="torch"):
+        """
+        Get the lock that must be held while running inference on a model
+
+        Args:
+            model_size: Whisper model size
+            backend: Inference backend
+
+        Returns:
+            threading.Lock for the model
+        """
+        self.get(model_size, backend)
+        return self._model_locks[model_key(model_size, backend)]
+
+    def warm_up(self, model_size="base", duration=1.0, backend="torch"):
+        """
+        Run a short silent buffer through the model so the first real
+        transcription does not pay allocation and kernel warm-up costs
+
+        Args:
+            model_size: Whisper model size
+            duration: Length of the silent buffer in seconds
+            backend: Inference backend
+        """
+        key = model_key(model_size, backend)
+        if key in self._warm:
+            return
+        model = self.get(model_size, backend)
+        silence = np.zeros(int(16000 * duration), dtype=np.float32)
+
+        start = time.perf_counter()
+        with get_startup_profiler().phase(f"warm up whisper {key}"), self.lock_for(model_size, backend):
+            model.transcribe(silence, language="en")
+        self.warm_up_times[key] = time.perf_counter() - start
+        self._warm.add(key)
+        print(f"✓ Whisper {key} warmed up in {self.warm_up_times[key]:.2f}s")
+
+    def preload(self, model_size="base", warm_up=True, background=True, backend="torch",
+                threads=None):
+        """
+        Load (and optionally warm up) a model ahead of the first utterance
+
+        Args:
+            model_size: Whisper model size
+            warm_up: Also run a silent warm-up transcription
+            background: Do the work on a daemon thread and return immediately
+            backend: Inference backend
+            threads: CPU threads for inference
+
+        Returns:
+            The background thread, or None when run in the foreground
+        """
+        def work():
+            self.get(model_size, backend, threads)
+            if warm_up:
+                self.warm_up(model_size, backend=backend)
+
+        if not background:
+            work()
+            return None
+
+        thread = threading.Thread(target=work, name=f"whisper-preload-{model_key(model_size, backend)}",
+                                  daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        """
+        Get load and warm-up timings
+
+        Returns:
+            Dict keyed by model ('base', 'base:int8', ...) with 'load_s' and 'warm_up_s'
+        """
+        return {
+            size: {
+                "load_s": self.load_times.get(size),
+                "warm_up_s": self.warm_up_times.get(size),
+            }
+            for size in self._models
+        }
+
+
+_registry = WhisperModelRegistry()
+
+
+def get_model_registry():
+    """Get the process-wide Whisper model registry"""
+    return _registry
@@ -0,0 +1,28 @@
+"""
+Shared filesystem locations for caches and generated artifacts
+"""
+import os
+from pathlib import Path
+
+
+# Override with DIGITAL_TWIN_CACHE_DIR to relocate every on-disk cache
+CACHE_DIR = Path(os.getenv("DIGITAL_TWIN_CACHE_DIR", Path.home() / ".cache" / "digital_twin_like"))
+
+# Knowledge base sources (the repository's knowledge/ directory unless overridden)
+KNOWLEDGE_DIR = Path(os.getenv("DIGITAL_TWIN_KNOWLEDGE_DIR",
+                               Path(__file__).resolve().parents[2] / "knowledge"))
+
+
+def get_cache_dir(name):
+    """
+    Get (and create) a named subdirectory of the cache directory
+
+    Args:
+        name: Subdirectory name, e.g. 'knowledge'
+
+    Returns:
+        Path to the directory
+    """
+    path = CACHE_DIR / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,300 @@
+"""
+Response cache for repeated questions to the digital twin
+
+Answers are keyed on the normalized question plus a fingerprint of the
+knowledge files and agent configuration, so editing either invalidates them.
+Follow-up questions are additionally keyed on the conversation history.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from digital_twin_like.tools.knowledge_store import KnowledgeStore, get_knowledge_store
+
+
+CONFIG_DIR = Path(__file__).parent / "config"
+
+
+# Politeness and hesitation words that do not change what is being asked;
+# stripped only from the start and end of a question
+FILLER_PATTERN = re.compile(
+    r"^(?:(?:please|hey|hi|so|well|um+|uh+|ok|okay|can you|could you|would you)(?:\s+|$))+"
+    r"|(?:\s+(?:please|thanks|thank you))+$"
+)
+
+
+# Words that point back at earlier turns ("tell me more about that")
+FOLLOW_UP_WORDS = frozenset(
+    "it its that this these those they them their he him his she her there then "
+    "more else also again same another other previous earlier last above too".split()
+)
+FOLLOW_UP_START = re.compile(r"^(?:and|but|so|what about|how about)\b")
+
+
+def depends_on_context(question):
+    """
+    Whether a question likely refers to earlier turns of the conversation
+
+    Args:
+        question: Question text
+
+    Returns:
+        True for follow-ups such as "what tools did you build for that?",
+        "and your PhD?" or a bare "why?"
+    """
+    words = question.lower().replace("\u2019", "'").replace("'", "")
+    words = re.sub(r"[^a-z0-9+#]+", " ", words).split()
+    return (len(words) <= 1
+            or bool(FOLLOW_UP_START.match(" ".join(words)))
+            or any(word in FOLLOW_UP_WORDS for word in words))
+
+
+def normalize_question(text):
+    """
+    Normalize a question so trivially different phrasings share a cache entry
+
+    Only case, punctuation, whitespace and leading/trailing filler ("can you",
+    "please") are dropped. Word order, repeated words, interrogatives and
+    negations are kept, so "Where did you go to school?" and "Why did you go
+    to school?" get different keys, while "Can you introduce yourself?" and
+    "introduce yourself" match.
+
+    Args:
+        text: Question text
+
+    Returns:
+        Normalized key string ('' if nothing is left)
+    """
+    text = text.lower().replace("\u2019", "'").replace("'", "")
+    text = " ".join(re.sub(r"[^a-z0-9+#]+", " ", text).split())
+    previous = None
+    while text != previous:
+        previous = text
+        text = FILLER_PATTERN.sub("", text).strip()
+    return text
+
+
+class ResponseCache:
+    """LRU/TTL cache of twin responses with an optional SQLite backing store"""
+
+    def __init__(self, max_entries=256, ttl=24 * 3600, db_path=None, extra_fingerprint=""):
+        """
+        Initialize the response cache
+
+        Args:
+            max_entries: Maximum responses kept in memory (least recently used
+                         evicted) and in the SQLite store (oldest deleted)
+            ttl: Seconds a response stays valid (None for no expiry)
+            db_path: Optional SQLite file so cached responses survive restarts
+            extra_fingerprint: Extra configuration text (e.g. the agent backstory)
+                               folded into the invalidation fingerprint
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.extra_fingerprint = extra_fingerprint
+
+        self._entries = OrderedDict()  # key -> (response, created_at)
+        self._lock = threading.Lock()
+        self._config_store = KnowledgeStore(CONFIG_DIR)
+        self._fingerprint_sources = None
+        self._fingerprint = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, question TEXT, response TEXT, created_at REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)"
+            )
+            self._purge_db()
+            self._db.commit()
+
+    def fingerprint(self):
+        """
+        Hash of the knowledge files and agent configuration
+
+        Returns:
+            Hex digest that changes whenever knowledge/ or config/agents.yaml changes
+        """
+        documents = get_knowledge_store().load_all()
+        agents_config = self._config_store.get("agents.yaml") or ""
+        sources = [agents_config, self.extra_fingerprint]
+        for filename in sorted(documents):
+            sources.extend([filename, documents[filename]])
+
+        # The stores return the same string objects until a file changes
+        previous = self._fingerprint_sources
+        if previous is not None and len(previous) == len(sources) and all(
+                a is b for a, b in zip(previous, sources)):
+            return self._fingerprint
+
+        digest = hashlib.sha256()
+        for source in sources:
+            digest.update(source.encode())
+            digest.update(b"\0")
+        self._fingerprint_sources = sources
+        self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def _key(self, question, context=""):
+        return hashlib.sha256(
+            f"{self.fingerprint()}\n{normalize_question(question)}\n{context}".encode()
+        ).hexdigest()
+
+    def _crew_run_key(self, name):
+        # Full crew runs also depend on the task definitions
+        tasks_config = self._config_store.get("tasks.yaml") or ""
+        return hashlib.sha256(
+            f"{self.fingerprint()}\n{tasks_config}\ncrew run: {name}".encode()
+        ).hexdigest()
+
+    def _expired(self, created_at):
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def get(self, question, context=""):
+        """
+        Look up a cached response
+
+        Args:
+            question: User's question
+            context: Conversation history the answer depends on ('' for a
+                     self-contained question)
+
+        Returns:
+            Cached response text, or None on a miss
+        """
+        if not normalize_question(question):
+            return None
+        return self._lookup(self._key(question, context))
+
+    def get_crew_run(self, name):
+        """
+        Look up the cached output of a full crew run
+
+        Unlike questions, crew runs are stored under their name verbatim and
+        invalidated by edits to config/tasks.yaml as well.
+
+        Args:
+            name: Entry name, e.g. 'introduction'
+
+        Returns:
+            Cached output text, or None on a miss
+        """
+        return self._lookup(self._crew_run_key(name))
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._insert(key, entry)
+
+            if entry is not None and self._expired(entry[1]):
+                self._entries.pop(key, None)
+                if self._db is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, question, response, context=""):
+        """
+        Store a response
+
+        Args:
+            question: User's question
+            response: Twin's response text
+            context: Conversation history the answer depends on (see get)
+        """
+        if not normalize_question(question) or not response:
+            return
+        self._store(self._key(question, context), question, response)
+
+    def put_crew_run(self, name, response):
+        """
+        Store the output of a full crew run
+
+        Args:
+            name: Entry name, e.g. 'introduction'
+            response: Crew output text
+        """
+        if response:
+            self._store(self._crew_run_key(name), name, response)
+
+    def _store(self, key, question, response):
+        entry = (response, time.time())
+        with self._lock:
+            self._insert(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                    (key, question, response, entry[1]),
+                )
+                self._purge_db()
+                self._db.commit()
+
+    def _purge_db(self):
+        """Delete expired rows and all but the newest max_entries from the SQLite store"""
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM responses WHERE created_at < ?",
+                             (time.time() - self.ttl,))
+        self._db.execute(
+            "DELETE FROM responses WHERE key NOT IN ("
+            "SELECT key FROM responses ORDER BY created_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+    def _insert(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Remove every cached response, including the SQLite store"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            Dict with hit/miss/eviction counters and hit rate
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+            }
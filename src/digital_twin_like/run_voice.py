@@ -3,21 +3,99 @@
 Simple script to run voice-enabled digital twin
 """
 import sys
-from digital_twin_like.voice_agent import VoiceDigitalTwin
+from digital_twin_like.startup_profile import get_startup_profiler
+
+
+def _pop_option(name, default=None):
+    """Remove `name value` from sys.argv and return the value"""
+    if name not in sys.argv:
+        return default
+    index = sys.argv.index(name)
+    if index + 1 >= len(sys.argv):
+        sys.exit(f"{name} needs a value")
+    value = sys.argv[index + 1]
+    del sys.argv[index:index + 2]
+    return value
 
 
 def main():
     """Main entry point for voice digital twin"""
 
+    # --profile-startup: print how long imports and component setup take
+    profiler = get_startup_profiler()
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        profiler.enabled = True
+
+    # --serve: multi-session HTTP server (remaining arguments are its options)
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        from digital_twin_like.twin_server import main as serve
+        serve(sys.argv[2:])
+        return
+
+    # Heavy dependencies (CrewAI, Whisper/torch) are imported on first use by each mode
+    with profiler.phase("import voice_agent"):
+        from digital_twin_like.voice_agent import VoiceDigitalTwin
+
+    # --stream: start speaking each sentence while the rest of the answer is generated
+    streaming = "--stream" in sys.argv
+    if streaming:
+        sys.argv.remove("--stream")
+
+    # --live-transcript: transcribe while the user is still speaking
+    streaming_stt = "--live-transcript" in sys.argv
+    if streaming_stt:
+        sys.argv.remove("--live-transcript")
+
+    # --serial: one stage at a time in voice mode (the default overlaps them)
+    serial = "--serial" in sys.argv
+    if serial:
+        sys.argv.remove("--serial")
+
+    # --barge-in: speaking interrupts the answer (use headphones: on loudspeakers
+    # the twin's own voice would interrupt it)
+    barge_in = "--barge-in" in sys.argv
+    if barge_in:
+        sys.argv.remove("--barge-in")
+
+    # --fast: answer from up-front retrieved knowledge in one LLM call when confident
+    fast_path = "--fast" in sys.argv
+    if fast_path:
+        sys.argv.remove("--fast")
+
+    # --semantic-search: also give the agent the embedding-based search tool
+    semantic_search = "--semantic-search" in sys.argv or None
+    if semantic_search:
+        sys.argv.remove("--semantic-search")
+
+    # --no-memory: answer every question on its own, without earlier turns
+    # --memory-tokens N: token budget of the conversation history in each prompt
+    conversation_memory = "--no-memory" not in sys.argv
+    if not conversation_memory:
+        sys.argv.remove("--no-memory")
+    memory_tokens = int(_pop_option("--memory-tokens", 800))
+
+    # --whisper-backend int8|faster-whisper: quantized CPU speech recognition
+    # --whisper-threads N: CPU threads used by Whisper
+    whisper_backend = _pop_option("--whisper-backend", "torch")
+    whisper_threads = _pop_option("--whisper-threads")
+    whisper_threads = int(whisper_threads) if whisper_threads else None
+
     if len(sys.argv) > 1 and sys.argv[1] == "--intro":
-        # Run introduction mode
-        voice_twin = VoiceDigitalTwin(whisper_model="base")
+        # Run introduction mode (never listens, so Whisper is not loaded)
+        voice_twin = VoiceDigitalTwin(whisper_model="base", warm_up_stt=False)
+        profiler.report("Startup profile: ready")
         voice_twin.run_introduction()
+        profiler.report("Startup profile: introduction")
 
     elif len(sys.argv) > 1 and sys.argv[1] == "--text":
-        # Text Q&A mode
-        voice_twin = VoiceDigitalTwin(whisper_model="base")
+        # Text Q&A mode: no Whisper; the crew is built while the user types
+        voice_twin = VoiceDigitalTwin(whisper_model="base", warm_up_stt=False, preload_crew=True,
+                                      fast_path=fast_path, conversation_memory=conversation_memory,
+                                      memory_tokens=memory_tokens, semantic_search=semantic_search)
+        profiler.report("Startup profile: ready for input")
         print("\n💬 Text Q&A Mode - Type 'quit' to exit")
+        first_turn = True
 
         while True:
             question = input("\n👤 Ask a question: ").strip()
@@ -26,26 +104,56 @@ def main():
                 break
 
             if question:
-                response = voice_twin.respond_to_text(question)
-                print(f"\n🤖 Response: {response}")
-                voice_twin.speak(response)
+                if streaming:
+                    response = voice_twin.respond_and_speak_streaming(question)
+                    print(f"\n🤖 Response: {response}")
+                else:
+                    response = voice_twin.respond_to_text(question)
+                    print(f"\n🤖 Response: {response}")
+                    voice_twin.speak(response)
+                if first_turn:
+                    profiler.report("Startup profile: first turn")
+                    first_turn = False
 
     elif len(sys.argv) > 1 and sys.argv[1] == "--voice":
         # Voice Q&A mode
-        voice_twin = VoiceDigitalTwin(whisper_model="base")
+        voice_twin = VoiceDigitalTwin(whisper_model="base", streaming_stt=streaming_stt,
+                                      preload_crew=True, whisper_backend=whisper_backend,
+                                      whisper_threads=whisper_threads, fast_path=fast_path,
+                                      conversation_memory=conversation_memory,
+                                      memory_tokens=memory_tokens, semantic_search=semantic_search)
+        profiler.report("Startup profile: ready")
         print("\n🎤 Voice Q&A Mode - Speak when prompted, Ctrl+C to exit")
         print("(Type 'quit' after speaking to exit, or just press Ctrl+C)\n")
 
-        duration = 5
+        # Default: stop recording when the speaker pauses; a number forces a fixed duration
+        duration = None
         if len(sys.argv) > 2:
             try:
                 duration = int(sys.argv[2])
             except ValueError:
                 pass
 
+        if not (serial or streaming_stt):
+            # Listen, think, synthesize and play as overlapped asyncio stages
+            from digital_twin_like.voice_session import VoiceSession
+
+            session = VoiceSession(voice_twin, recording_duration=duration, barge_in=barge_in)
+            try:
+                session.run()
+            except KeyboardInterrupt:
+                print("\n\nGoodbye!")
+            profiler.report("Startup profile: session")
+            return
+
         try:
+            first_turn = True
             while True:
-                user_input, response = voice_twin.voice_interaction(recording_duration=duration)
+                user_input, response = voice_twin.voice_interaction(recording_duration=duration,
+                                                                 streaming=streaming)
+                if first_turn:
+                    profiler.report("Startup profile: first turn")
+                    first_turn = False
 
                 # Check if user said quit/exit
                 if user_input and any(word in user_input.lower() for word in ['quit', 'exit', 'stop', 'goodbye']):
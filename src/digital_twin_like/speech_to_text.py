@@ -1,28 +1,56 @@
 """
 Speech-to-text module using OpenAI Whisper
 """
-import whisper
-import sounddevice as sd
-import soundfile as sf
 import numpy as np
-import tempfile
-import os
+from pathlib import Path
+from digital_twin_like.audio_codec import resample
+from digital_twin_like.model_registry import get_model_registry
+from digital_twin_like.voice_activity import EndpointRecorder, MicrophoneSource
+
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+def prepare_audio(audio_data, sample_rate=WHISPER_SAMPLE_RATE):
+    """
+    Convert an in-memory buffer into the mono float32 16 kHz array Whisper expects
+
+    Args:
+        audio_data: numpy array of samples, shape (n,) or (n, channels)
+        sample_rate: Sample rate of the buffer
+
+    Returns:
+        Contiguous float32 numpy array at 16 kHz (the input itself when no
+        conversion is needed)
+    """
+    audio = np.asarray(audio_data)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    audio = resample(audio, int(sample_rate), WHISPER_SAMPLE_RATE)
+    return np.ascontiguousarray(audio, dtype=np.float32)
 
 
 class SpeechToText:
     """Handles speech-to-text conversion using Whisper"""
 
-    def __init__(self, model_size="base"):
+    def __init__(self, model_size="base", backend="torch", threads=None):
         """
         Initialize Whisper model
 
         Args:
             model_size: Size of Whisper model (tiny, base, small, medium, large)
                        'base' provides good balance of speed and accuracy
+            backend: Inference backend - 'torch' (default), 'int8' (quantized
+                     CPU model) or 'faster-whisper' (if installed)
+            threads: CPU threads for inference (None: one per core)
         """
-        print(f"Loading Whisper {model_size} model...")
-        self.model = whisper.load_model(model_size)
-        self.sample_rate = 16000  # Whisper expects 16kHz audio
+        # Models are shared per process; only the first instance pays the load
+        registry = get_model_registry()
+        self.model_size = model_size
+        self.backend = backend
+        self.model = registry.get(model_size, backend, threads)
+        self.model_lock = registry.lock_for(model_size, backend)
+        self.sample_rate = WHISPER_SAMPLE_RATE  # Whisper expects 16kHz audio
 
     def record_audio(self, duration=5, sample_rate=16000):
         """
@@ -35,6 +63,9 @@ class SpeechToText:
         Returns:
             numpy array of audio samples
         """
+        # Imported here so headless use (server, batch transcription) needs no audio device
+        import sounddevice as sd
+
         print(f"\n🎤 Recording for {duration} seconds... Speak now!")
         audio = sd.rec(int(duration * sample_rate),
                       samplerate=sample_rate,
@@ -44,48 +75,121 @@ class SpeechToText:
         print("✓ Recording complete!")
         return audio.flatten()
 
+    def record_until_silence(self, silence_duration=0.8, max_duration=30.0, source=None):
+        """
+        Record from the microphone until the speaker stops talking
+
+        Args:
+            silence_duration: Seconds of silence after speech that end the recording
+            max_duration: Hard cap on recording length in seconds
+            source: Audio source to read instead of the microphone (e.g. a WavFileSource)
+
+        Returns:
+            numpy array of audio samples with leading/trailing silence trimmed
+        """
+        recorder = EndpointRecorder(silence_duration=silence_duration, max_duration=max_duration)
+        print("\n🎤 Listening... Speak now! (recording stops when you pause)")
+        audio = recorder.record(source or MicrophoneSource(self.sample_rate))
+        if len(audio):
+            print(f"✓ Recording complete! ({len(audio) / self.sample_rate:.1f}s of speech)")
+        else:
+            print("⚠️  No speech detected")
+        return audio
+
     def transcribe_audio(self, audio_data, sample_rate=16000):
         """
         Transcribe audio data to text using Whisper
 
         Args:
-            audio_data: numpy array of audio samples
-            sample_rate: Sample rate of the audio
+            audio_data: numpy array of audio samples, or a path to an audio file
+            sample_rate: Sample rate of the audio (ignored for file paths)
 
         Returns:
             Transcribed text string
         """
-        # Create temporary file for audio
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-            tmp_path = tmp_file.name
+        if isinstance(audio_data, (str, Path)):
+            # Genuine file input: let Whisper decode it through ffmpeg
+            audio = str(audio_data)
+        else:
+            # In-memory buffer: hand the array straight to the model
+            audio = prepare_audio(audio_data, sample_rate)
+
+        print("🔄 Transcribing audio...")
+        with self.model_lock:
+            result = self.model.transcribe(audio, language="en")
+        return result["text"].strip()
+
+    def transcribe_batch(self, audio_list, sample_rate=16000):
+        """
+        Transcribe several utterances together with batched decoding
 
-        try:
-            # Save audio to temporary file
-            sf.write(tmp_path, audio_data, sample_rate)
+        Args:
+            audio_list: List of numpy arrays of audio samples
+            sample_rate: Sample rate of the arrays
 
-            # Transcribe using Whisper
-            print("🔄 Transcribing audio...")
-            result = self.model.transcribe(tmp_path, language="en")
-            transcribed_text = result["text"].strip()
+        Returns:
+            List of transcribed text strings, in input order
+        """
+        from digital_twin_like.batch_transcriber import transcribe_batch
 
-            return transcribed_text
+        audios = [prepare_audio(audio, sample_rate) for audio in audio_list]
+        print(f"🔄 Transcribing {len(audios)} utterances in a batch...")
+        with self.model_lock:
+            return transcribe_batch(self.model, audios)
 
-        finally:
-            # Clean up temporary file
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+    def listen_and_transcribe_streaming(self, silence_duration=0.8, source=None, on_partial=None):
+        """
+        Record until the speaker pauses while transcribing in the background
+
+        Partial hypotheses are produced during recording, so only a short tail
+        is left to decode once speech ends.
 
-    def listen_and_transcribe(self, duration=5):
+        Args:
+            silence_duration: Seconds of silence after speech that end the recording
+            source: Audio source to read instead of the microphone (e.g. a
+                    WavFileSource with realtime=True)
+            on_partial: Callback for partial transcripts (default: print them live)
+
+        Returns:
+            Transcribed text string ('' if no speech was detected)
+        """
+        from digital_twin_like.streaming_stt import StreamingTranscriber
+
+        if on_partial is None:
+            on_partial = lambda text: print(f"\r📝 {text[-100:]}", end="", flush=True)
+
+        transcriber = StreamingTranscriber(self, on_partial=on_partial).start()
+        recorder = EndpointRecorder(silence_duration=silence_duration)
+
+        print("\n🎤 Listening... Speak now! (recording stops when you pause)")
+        audio = recorder.record(source or MicrophoneSource(self.sample_rate),
+                                on_block=transcriber.add_audio)
+        text = transcriber.finish()
+        if not len(audio):
+            print("\n⚠️  No speech detected")
+            return ""
+        print(f"\n✓ Transcript finalized {transcriber.finalize_time:.2f}s after end of speech "
+              f"({transcriber.passes} decoding passes)")
+        return text
+
+    def listen_and_transcribe(self, duration=None, silence_duration=0.8):
         """
         Record audio from microphone and transcribe it
 
         Args:
-            duration: Recording duration in seconds
+            duration: Fixed recording duration in seconds, or None to stop
+                      automatically when the speaker goes quiet
+            silence_duration: Seconds of silence that end a VAD recording
 
         Returns:
             Transcribed text string
         """
-        audio = self.record_audio(duration, self.sample_rate)
+        if duration is None:
+            audio = self.record_until_silence(silence_duration=silence_duration)
+            if not len(audio):
+                return ""
+        else:
+            audio = self.record_audio(duration, self.sample_rate)
         text = self.transcribe_audio(audio, self.sample_rate)
         return text
 
@@ -95,5 +199,5 @@ if __name__ == "__main__":
     stt = SpeechToText(model_size="base")
 
     print("\n=== Speech-to-Text Test ===")
-    text = stt.listen_and_transcribe(duration=5)
+    text = stt.listen_and_transcribe()
     print(f"\n📝 Transcribed text: {text}")
@@ -0,0 +1,83 @@
+"""
+Startup profiling for the voice CLI
+Records how long imports and component initialization take, including work
+done lazily or on background threads, and prints a breakdown on request
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Collects named, possibly nested, timing phases"""
+
+    def __init__(self, enabled=False):
+        """
+        Initialize the profiler
+
+        Args:
+            enabled: Record phases (when False, phase() costs almost nothing)
+        """
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self._phases = []   # (name, start offset, duration, depth, thread name)
+        self._reported = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time a block of code
+
+        Args:
+            name: Label shown in the report, e.g. 'import crewai'
+        """
+        if not self.enabled:
+            yield
+            return
+
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._local.depth = depth
+            with self._lock:
+                self._phases.append((name, start - self.origin, duration, depth,
+                                     threading.current_thread().name))
+
+    def report(self, title="Startup profile"):
+        """
+        Print the phases recorded since the previous report
+
+        Args:
+            title: Heading for this part of the breakdown
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            phases = sorted(self._phases[self._reported:], key=lambda p: p[1])
+            self._reported = len(self._phases)
+
+        elapsed = time.perf_counter() - self.origin
+        print("\n" + "="*60)
+        print(f"⏱️  {title} ({elapsed:.2f}s since start)")
+        print("="*60)
+        if not phases:
+            print("(nothing new was initialized)")
+        for name, offset, duration, depth, thread in phases:
+            label = "  " * depth + name
+            where = "" if thread == "MainThread" else f"  [{thread}]"
+            print(f"{label:<40} {duration * 1000:9.1f} ms  @ {offset:6.2f}s{where}")
+        print("="*60 + "\n")
+
+
+_profiler = StartupProfiler()
+
+
+def get_startup_profiler():
+    """Get the process-wide startup profiler (disabled until enabled by the CLI)"""
+    return _profiler
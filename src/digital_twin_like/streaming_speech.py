@@ -0,0 +1,213 @@
+"""
+Streaming text-to-speech pipeline
+Turns LLM tokens into sentences, synthesizes them concurrently and plays them in order
+"""
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+SENTENCE_END = re.compile(r"(?<=[.!?:;])[\"')\]]*\s+|\n\s*\n")
+
+
+class SentenceSplitter:
+    """Incrementally splits streamed text into speakable sentences"""
+
+    def __init__(self, min_chars=40):
+        """
+        Initialize the splitter
+
+        Args:
+            min_chars: Sentences shorter than this are merged with the next one
+                       so the TTS backend is not called for fragments like "Dr."
+        """
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text):
+        """
+        Add streamed text
+
+        Args:
+            text: Newly received chunk
+
+        Returns:
+            List of complete sentences ready to speak
+        """
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        """
+        Return whatever text is left once the stream ends
+
+        Returns:
+            List with the remaining sentence, if any
+        """
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return [remainder] if remainder else []
+
+
+def split_sentences(text, min_chars=40):
+    """
+    Split complete text into speakable sentences
+
+    Args:
+        text: Text to split
+        min_chars: Shorter sentences are merged with the next one
+
+    Returns:
+        List of sentences
+    """
+    splitter = SentenceSplitter(min_chars=min_chars)
+    return splitter.feed(text) + splitter.flush()
+
+
+class FinalAnswerFilter:
+    """Passes through only the 'Final Answer:' part of a ReAct-style LLM response"""
+
+    MARKER = "Final Answer:"
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start a new LLM call"""
+        self._buffer = ""
+        self._answering = False
+
+    def feed(self, chunk):
+        """
+        Filter a streamed chunk
+
+        Args:
+            chunk: Newly received LLM text
+
+        Returns:
+            The part of the chunk that belongs to the final answer
+        """
+        if self._answering:
+            return chunk
+
+        self._buffer += chunk
+        index = self._buffer.find(self.MARKER)
+        if index < 0:
+            return ""
+
+        self._answering = True
+        answer = self._buffer[index + len(self.MARKER):].lstrip()
+        self._buffer = ""
+        return answer
+
+
+class StreamingSpeaker:
+    """Synthesizes sentences on worker threads and plays them back in order"""
+
+    # How often a blocked submit()/finish() checks that the player is still alive
+    PUT_POLL_SECONDS = 0.5
+
+    def __init__(self, synthesize, play, max_workers=2, max_pending=4):
+        """
+        Initialize the speaker
+
+        Args:
+            synthesize: Callable taking a sentence and returning an audio file path
+            play: Callable playing an audio file path (blocks until done)
+            max_workers: Sentences synthesized concurrently
+            max_pending: Bound on synthesized-but-unplayed sentences; submit()
+                         blocks when it is reached
+        """
+        self._synthesize = synthesize
+        self._play = play
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._player = threading.Thread(target=self._playback_loop, daemon=True)
+
+        self.start_time = None
+        self.first_audio_time = None
+        self.sentences = 0
+
+    def start(self):
+        """Start the playback thread and the time-to-first-audio clock"""
+        self.start_time = time.perf_counter()
+        self._player.start()
+        return self
+
+    def submit(self, sentence):
+        """
+        Queue a sentence for synthesis and playback
+
+        Args:
+            sentence: Text to speak
+        """
+        self.sentences += 1
+        future = self._executor.submit(self._synthesize, sentence)
+        if not self._put(future):
+            future.cancel()
+
+    def finish(self):
+        """
+        Wait until every queued sentence has been played
+
+        Returns:
+            Time to first audio in seconds, or None if nothing was played
+        """
+        self._put(None)
+        self._player.join()
+        self._executor.shutdown(wait=True)
+        if self.first_audio_time is None:
+            return None
+        return self.first_audio_time - self.start_time
+
+    def _put(self, item):
+        """
+        Hand an item to the player without blocking forever if it has stopped
+
+        Returns:
+            True if queued, False if the player thread is no longer running
+        """
+        while True:
+            try:
+                self._pending.put(item, timeout=self.PUT_POLL_SECONDS)
+                return True
+            except queue.Full:
+                if not self._player.is_alive():
+                    print("⚠️  Playback stopped, dropping queued speech")
+                    return False
+
+    def _playback_loop(self):
+        while True:
+            future = self._pending.get()
+            if future is None:
+                break
+
+            try:
+                audio_file = future.result()
+            except Exception as e:
+                print(f"⚠️  Error synthesizing sentence: {e}")
+                continue
+
+            if self.first_audio_time is None:
+                self.first_audio_time = time.perf_counter()
+            try:
+                self._play(audio_file)
+            except Exception as e:
+                print(f"⚠️  Error playing sentence: {e}")
+            finally:
+                try:
+                    if os.path.exists(audio_file):
+                        os.remove(audio_file)
+                except OSError:
+                    pass
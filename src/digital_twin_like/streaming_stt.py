@@ -0,0 +1,179 @@
+"""
+Incremental speech-to-text: transcribes while the user is still speaking
+Overlapping windows of the growing recording are decoded on a worker thread;
+segments that two consecutive passes agree on are committed and dropped from
+the window, so the final pass after end of speech only decodes a short tail.
+"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class StreamingTranscriber:
+    """Emits partial transcripts during recording and finalizes right after it"""
+
+    def __init__(self, stt, step=1.0, commit_margin=1.5, max_window=25.0, on_partial=None,
+                 pre_roll=0.5):
+        """
+        Initialize the streaming transcriber
+
+        Args:
+            stt: SpeechToText instance whose model is used for decoding
+            step: Seconds of new audio between decoding passes
+            commit_margin: Segments ending within this many seconds of the live
+                           edge are never committed (the speaker may still be
+                           mid-word there)
+            max_window: Force-commit stable text once the uncommitted window
+                        grows beyond this many seconds (Whisper sees 30 s max)
+            on_partial: Optional callback receiving the current hypothesis text
+            pre_roll: Seconds of audio before the detected speech onset that are
+                      kept when blocks arrive with VAD flags (see add_audio)
+        """
+        self.stt = stt
+        self.sample_rate = stt.sample_rate
+        self.step = step
+        self.commit_margin = commit_margin
+        self.max_window = max_window
+        self.on_partial = on_partial
+        self.pre_roll = pre_roll
+
+        self._blocks = []
+        self._pre_roll_blocks = deque()
+        self._speech_seen = False
+        self._pending_samples = 0
+        self._committed = []
+        self._previous_segments = []
+        self._condition = threading.Condition()
+        self._finished = False
+        self._worker = threading.Thread(target=self._run, name="streaming-stt", daemon=True)
+
+        self.passes = 0
+        self.finalize_time = None
+
+    def start(self):
+        """Start the background decoding thread"""
+        self._worker.start()
+        return self
+
+    def add_audio(self, block, in_speech=None):
+        """
+        Append recorded samples (usable directly as an EndpointRecorder on_block callback)
+
+        With VAD flags, blocks before the speaker starts are only held as
+        pre-roll, so silence is never decoded (Whisper tends to hallucinate
+        text such as "Thank you." on it).
+
+        Args:
+            block: 1-D float32 array at the STT sample rate
+            in_speech: Whether the recorder reports speech in progress, or None
+                       to append the block unconditionally
+        """
+        block = np.asarray(block, dtype=np.float32)
+        if in_speech is not None and not self._speech_seen:
+            self._pre_roll_blocks.append(block)
+            if not in_speech:
+                # Keep only the most recent blocks covering the pre-roll
+                while (sum(len(b) for b in list(self._pre_roll_blocks)[1:])
+                       >= self.pre_roll * self.sample_rate):
+                    self._pre_roll_blocks.popleft()
+                return
+            self._speech_seen = True
+            blocks = list(self._pre_roll_blocks)
+            self._pre_roll_blocks.clear()
+        else:
+            blocks = [block]
+
+        with self._condition:
+            self._blocks.extend(blocks)
+            self._pending_samples += sum(len(b) for b in blocks)
+            if self._pending_samples >= self.step * self.sample_rate:
+                self._condition.notify()
+
+    def finish(self):
+        """
+        Stop streaming and decode whatever has not been committed yet
+
+        Returns:
+            Final transcript text
+        """
+        start = time.perf_counter()
+        with self._condition:
+            self._finished = True
+            self._condition.notify()
+        self._worker.join()
+
+        tail = self._window()
+        if len(tail) >= 0.1 * self.sample_rate:
+            text = " ".join(s["text"].strip() for s in self._decode(tail))
+            if text:
+                self._committed.append(text)
+
+        self.finalize_time = time.perf_counter() - start
+        return " ".join(t for t in self._committed if t).strip()
+
+    def _window(self):
+        with self._condition:
+            if not self._blocks:
+                return np.zeros(0, dtype=np.float32)
+            audio = np.concatenate(self._blocks)
+            self._blocks = [audio]
+            return audio
+
+    def _decode(self, audio):
+        self.passes += 1
+        prompt = " ".join(self._committed)[-200:] or None
+        with self.stt.model_lock:
+            result = self.stt.model.transcribe(
+                audio, language="en", condition_on_previous_text=False,
+                initial_prompt=prompt, temperature=0.0,
+            )
+        return result["segments"]
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._finished and self._pending_samples < self.step * self.sample_rate:
+                    self._condition.wait()
+                if self._finished:
+                    return
+                self._pending_samples = 0
+
+            audio = self._window()
+            duration = len(audio) / self.sample_rate
+            segments = self._decode(audio)
+            self._commit_stable(segments, duration)
+
+            if self.on_partial is not None:
+                live = " ".join(s["text"].strip() for s in self._previous_segments)
+                self.on_partial(" ".join(t for t in self._committed + [live] if t))
+
+    def _commit_stable(self, segments, duration):
+        """Commit leading segments that match the previous pass and lie behind the live edge"""
+        force = duration > self.max_window
+        commit_count = 0
+        for i, segment in enumerate(segments):
+            if segment["end"] > duration - self.commit_margin:
+                break
+            agreed = (i < len(self._previous_segments)
+                      and self._previous_segments[i]["text"].strip() == segment["text"].strip())
+            if not (agreed or force):
+                break
+            commit_count = i + 1
+
+        if not commit_count:
+            self._previous_segments = segments
+            return
+
+        cut_time = segments[commit_count - 1]["end"]
+        self._committed.extend(s["text"].strip() for s in segments[:commit_count])
+        cut = int(cut_time * self.sample_rate)
+        with self._condition:
+            audio = np.concatenate(self._blocks) if self._blocks else np.zeros(0, dtype=np.float32)
+            self._blocks = [audio[cut:]]
+        # Remaining segments are re-timed relative to the new window start
+        self._previous_segments = [
+            dict(s, start=s["start"] - cut_time, end=s["end"] - cut_time)
+            for s in segments[commit_count:]
+        ]
@@ -2,25 +2,29 @@
 Text-to-speech module using gTTS (Google Text-to-Speech)
 """
 from gtts import gTTS
+from digital_twin_like.audio_cache import get_audio_cache, gtts_cache_key
+from digital_twin_like.audio_playback import play_audio_file
+import io
 import tempfile
+import shutil
 import os
-import subprocess
-import platform
 
 
 class TextToSpeech:
     """Handles text-to-speech conversion using gTTS"""
 
-    def __init__(self, language='en', slow=False):
+    def __init__(self, language='en', slow=False, use_cache=True):
         """
         Initialize TTS settings
 
         Args:
             language: Language code (default 'en' for English)
             slow: Whether to speak slowly (default False)
+            use_cache: Reuse previously synthesized clips from the shared audio cache
         """
         self.language = language
         self.slow = slow
+        self.audio_cache = get_audio_cache() if use_cache else None
 
     def speak(self, text, save_to_file=None):
         """
@@ -36,25 +40,13 @@ class TextToSpeech:
 
         print(f"🔊 Speaking: {text[:100]}{'...' if len(text) > 100 else ''}")
 
-        # Create speech
-        tts = gTTS(text=text, lang=self.language, slow=self.slow)
-
-        # Determine file path
-        if save_to_file:
-            audio_file = save_to_file
-            delete_after = False
-        else:
-            # Create temporary file
-            tmp_file = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
-            audio_file = tmp_file.name
-            tmp_file.close()
-            delete_after = True
+        # Cached clips are played in place, with no synthesis at all
+        audio_file, delete_after = self._synthesize(text)
 
         try:
-            # Save audio to file
-            tts.save(audio_file)
+            if save_to_file:
+                shutil.copyfile(audio_file, save_to_file)
 
-            # Play audio based on platform
             self._play_audio(audio_file)
 
         finally:
@@ -62,33 +54,93 @@ class TextToSpeech:
             if delete_after and os.path.exists(audio_file):
                 os.remove(audio_file)
 
-    def _play_audio(self, audio_file):
+    def synthesize_to_file(self, text, audio_file=None):
         """
-        Play audio file using platform-specific command
+        Convert text to speech and write it to an audio file without playing
 
         Args:
-            audio_file: Path to audio file to play
+            text: Text to convert to speech
+            audio_file: Output path (otherwise a temp .mp3 the caller must delete)
+
+        Returns:
+            Path to the audio file
+        """
+        source, is_temp = self._synthesize(text)
+        if audio_file is None:
+            if is_temp:
+                return source
+            tmp_file = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
+            audio_file = tmp_file.name
+            tmp_file.close()
+
+        shutil.copyfile(source, audio_file)
+        if is_temp:
+            os.remove(source)
+        return audio_file
+
+    def synthesize(self, text):
+        """
+        Convert text to speech in memory without playing
+
+        Args:
+            text: Text to convert to speech
+
+        Returns:
+            Tuple of (encoded audio bytes, file extension)
         """
-        system = platform.system()
+        key = None
+        if self.audio_cache is not None:
+            key = gtts_cache_key(text, self.language, self.slow)
+            cached = self.audio_cache.get(key)
+            if cached is not None:
+                return cached
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.language, slow=self.slow).write_to_fp(buffer)
+        data = buffer.getvalue()
+        if key is not None:
+            self.audio_cache.put(key, data, "mp3")
+        return data, "mp3"
+
+    def _synthesize(self, text):
+        """
+        Get an audio file for the text, from the cache when possible
 
+        Returns:
+            Tuple of (path, is_temp); temp files must be deleted by the caller
+        """
+        key = None
+        if self.audio_cache is not None:
+            key = gtts_cache_key(text, self.language, self.slow)
+            cached = self.audio_cache.get_path(key)
+            if cached is not None:
+                return str(cached), False
+
+        tmp_file = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
+        audio_file = tmp_file.name
+        tmp_file.close()
         try:
-            if system == "Darwin":  # macOS
-                subprocess.run(["afplay", audio_file], check=True)
-            elif system == "Linux":
-                # Try multiple players
-                for player in ["mpg123", "ffplay", "cvlc"]:
-                    try:
-                        subprocess.run([player, "-q", audio_file], check=True)
-                        break
-                    except FileNotFoundError:
-                        continue
-            elif system == "Windows":
-                os.startfile(audio_file)
-            else:
-                print(f"⚠️  Cannot play audio on {system}")
-
-        except Exception as e:
-            print(f"⚠️  Error playing audio: {e}")
+            gTTS(text=text, lang=self.language, slow=self.slow).save(audio_file)
+        except Exception:
+            os.remove(audio_file)
+            raise
+
+        if key is None:
+            return audio_file, True
+
+        with open(audio_file, 'rb') as f:
+            cached = self.audio_cache.put(key, f.read(), "mp3")
+        os.remove(audio_file)
+        return str(cached), False
+
+    def _play_audio(self, audio_file):
+        """
+        Play audio file through the shared in-process playback engine
+
+        Args:
+            audio_file: Path to audio file to play
+        """
+        play_audio_file(audio_file)
 
     def save_speech(self, text, output_path):
         """
@@ -99,8 +151,7 @@ class TextToSpeech:
             output_path: Path where audio file should be saved
         """
         print(f"💾 Saving speech to: {output_path}")
-        tts = gTTS(text=text, lang=self.language, slow=self.slow)
-        tts.save(output_path)
+        self.synthesize_to_file(text, output_path)
         print("✓ Speech saved!")
 
 
@@ -0,0 +1,476 @@
+"""
+Compiled, memory-mapped knowledge bundle
+build_bundle() compiles the knowledge directory into one versioned binary file
+holding the document texts, their heading sections, the search passages and a
+BM25 inverted index. KnowledgeBundle memory-maps it: opening reads only a small
+fixed-size header, so startup does not grow with the corpus, records are decoded
+on access, and worker processes mapping the same file share its pages.
+
+Layout (little-endian):
+    "DTKB" | u32 version | u32 header length | JSON header | regions
+The header lists the byte range of each region: a UTF-8 string pool and
+fixed-width record tables for files, sections, passages, terms (sorted, for
+binary search) and postings.
+
+Usage:
+    build_knowledge_bundle [--knowledge-dir knowledge/] [--output path] [--check]
+"""
+import argparse
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from digital_twin_like.paths import KNOWLEDGE_DIR, get_cache_dir
+from digital_twin_like.tools.knowledge_index import split_passages, tokenize
+from digital_twin_like.tools.knowledge_sections import SectionTree
+
+
+MAGIC = b"DTKB"
+BUNDLE_VERSION = 1
+
+PREAMBLE = struct.Struct("<4sII")
+# name off/len, text off/len, source mtime_ns, source size, first section, section count
+FILE_RECORD = struct.Struct("<QIQIqQII")
+# file, id off/len, title off/len, text off/len, own text len, level
+SECTION_RECORD = struct.Struct("<IQIQIQIIB")
+# file, section path off/len, text off/len, line, token count
+PASSAGE_RECORD = struct.Struct("<IQIQIII")
+# term off/len, first posting, posting count
+TERM_RECORD = struct.Struct("<QIQI")
+# passage, term frequency
+POSTING_RECORD = struct.Struct("<II")
+
+REGIONS = ("strings", "files", "sections", "passages", "terms", "postings")
+
+
+def default_bundle_path():
+    """Bundle location ($DIGITAL_TWIN_KNOWLEDGE_BUNDLE, or the knowledge cache directory)"""
+    override = os.getenv("DIGITAL_TWIN_KNOWLEDGE_BUNDLE")
+    if override:
+        return Path(override)
+    return get_cache_dir("knowledge") / f"knowledge-v{BUNDLE_VERSION}.bundle"
+
+
+def list_sources(knowledge_dir):
+    """Knowledge files in a directory, sorted by name"""
+    from digital_twin_like.tools.knowledge_store import KNOWLEDGE_EXTENSIONS
+
+    knowledge_dir = Path(knowledge_dir)
+    if not knowledge_dir.is_dir():
+        return []
+    return sorted(name for name in os.listdir(knowledge_dir) if name.endswith(KNOWLEDGE_EXTENSIONS))
+
+
+def content_hash(documents):
+    """Same digest as KnowledgeStore.fingerprint() for a {filename: content} dict"""
+    digest = hashlib.sha256()
+    for filename, content in sorted(documents.items()):
+        digest.update(filename.encode())
+        digest.update(b"\0")
+        digest.update(content.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class _StringPool:
+    """Deduplicating UTF-8 pool; add() returns (byte offset, byte length)"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._offsets = {}
+
+    def add(self, text):
+        encoded = text.encode()
+        offset = self._offsets.get(encoded)
+        if offset is None:
+            offset = len(self.data)
+            self._offsets[encoded] = offset
+            self.data += encoded
+        return offset, len(encoded)
+
+
+def build_bundle(knowledge_dir=KNOWLEDGE_DIR, path=None):
+    """
+    Compile a knowledge directory into a bundle file
+
+    The file is written next to its destination and renamed into place, so
+    processes that have the previous version mapped keep reading it intact.
+
+    Args:
+        knowledge_dir: Directory of knowledge files
+        path: Output path (default: default_bundle_path())
+
+    Returns:
+        Path of the written bundle
+    """
+    knowledge_dir = Path(knowledge_dir).resolve()
+    path = Path(path) if path else default_bundle_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    pool = _StringPool()
+    files, sections, passages = bytearray(), bytearray(), bytearray()
+    postings_by_term = defaultdict(list)
+    documents = {}
+    total_length = 0
+    n_sections = n_passages = 0
+
+    for file_index, filename in enumerate(list_sources(knowledge_dir)):
+        source = knowledge_dir / filename
+        stat = source.stat()
+        with open(source, 'r') as f:
+            text = f.read()
+        documents[filename] = text
+
+        name_off, name_len = pool.add(filename)
+        text_off, text_len = pool.add(text)
+
+        tree = SectionTree(filename, text)
+        files += FILE_RECORD.pack(name_off, name_len, text_off, text_len, stat.st_mtime_ns,
+                                  stat.st_size, n_sections, len(tree.sections))
+        for section in tree.sections:
+            # Section texts are slices of the document text, addressed by byte offset
+            start = text_off + len(text[:section["start"]].encode())
+            id_off, id_len = pool.add(section["id"])
+            title_off, title_len = pool.add(section["title"])
+            sections += SECTION_RECORD.pack(file_index, id_off, id_len, title_off, title_len,
+                                            start, len(section["text"].encode()),
+                                            len(section["own_text"].encode()), section["level"])
+        n_sections += len(tree.sections)
+
+        for passage in split_passages(text):
+            tokens = tokenize(passage["section"] + " " + passage["text"])
+            if not tokens:
+                continue
+            section_off, section_len = pool.add(passage["section"])
+            passage_off, passage_len = pool.add(passage["text"])
+            passages += PASSAGE_RECORD.pack(file_index, section_off, section_len, passage_off,
+                                            passage_len, passage["line"], len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings_by_term[term].append((n_passages, tf))
+            total_length += len(tokens)
+            n_passages += 1
+
+    terms, postings = bytearray(), bytearray()
+    n_postings = 0
+    for term in sorted(postings_by_term, key=str.encode):
+        term_off, term_len = pool.add(term)
+        term_postings = postings_by_term[term]
+        terms += TERM_RECORD.pack(term_off, term_len, n_postings, len(term_postings))
+        for passage_id, tf in term_postings:
+            postings += POSTING_RECORD.pack(passage_id, tf)
+        n_postings += len(term_postings)
+
+    region_data = {"strings": pool.data, "files": files, "sections": sections,
+                   "passages": passages, "terms": terms, "postings": postings}
+    header = {
+        "version": BUNDLE_VERSION,
+        "built_at": time.time(),
+        "source_dir": str(knowledge_dir),
+        "content_hash": content_hash(documents),
+        "files": len(documents),
+        "sections": n_sections,
+        "passages": n_passages,
+        "terms": len(postings_by_term),
+        "total_length": total_length,
+    }
+
+    # Region offsets depend on the header length, which depends on the offsets:
+    # reserve fixed-width digits so one pass settles it
+    header["regions"] = {name: [10 ** 15, 10 ** 15] for name in REGIONS}
+    header_len = len(json.dumps(header).encode())
+    offset = PREAMBLE.size + header_len
+    for name in REGIONS:
+        offset += -offset % 8  # align record tables
+        header["regions"][name] = [offset, len(region_data[name])]
+        offset += len(region_data[name])
+    header_bytes = json.dumps(header).encode().ljust(header_len)
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, BUNDLE_VERSION, header_len))
+        f.write(header_bytes)
+        for name in REGIONS:
+            f.write(b"\0" * (header["regions"][name][0] - f.tell()))
+            f.write(region_data[name])
+    os.replace(tmp_path, path)
+    return path
+
+
+class KnowledgeBundle:
+    """Read-only, memory-mapped view of a compiled knowledge bundle"""
+
+    def __init__(self, path, k1=1.5, b=0.75):
+        """
+        Map a bundle file
+
+        Args:
+            path: Bundle path
+            k1: BM25 term-frequency saturation parameter
+            b: BM25 length normalization parameter
+
+        Raises:
+            ValueError: If the file is not a bundle of this version
+        """
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_len = PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a knowledge bundle")
+        if version != BUNDLE_VERSION:
+            raise ValueError(f"{self.path} is bundle version {version}, expected {BUNDLE_VERSION}")
+        self.header = json.loads(self._mmap[PREAMBLE.size:PREAMBLE.size + header_len])
+        self._regions = {name: offset for name, (offset, _) in self.header["regions"].items()}
+
+        # File records are decoded on first lookup:
+        # filename -> (index, source mtime_ns, source size)
+        self._files = {}
+
+    def __len__(self):
+        return self.header["passages"]
+
+    @property
+    def content_hash(self):
+        """Fingerprint of the compiled sources (matches KnowledgeStore.fingerprint())"""
+        return self.header["content_hash"]
+
+    def close(self):
+        self._mmap.close()
+
+    def _string(self, offset, length):
+        start = self._regions["strings"] + offset
+        return self._mmap[start:start + length].decode()
+
+    def _record(self, struct_type, region, index):
+        return struct_type.unpack_from(self._mmap, self._regions[region] + index * struct_type.size)
+
+    def _file_entry(self, filename):
+        """Binary search of the name-sorted file table; (index, mtime_ns, size) or None"""
+        entry = self._files.get(filename)
+        if entry is not None:
+            return entry
+        target = filename.encode()
+        lo, hi = 0, self.header["files"]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name_off, name_len, _, _, mtime_ns, size = self._record(FILE_RECORD, "files", mid)[:6]
+            start = self._regions["strings"] + name_off
+            name = self._mmap[start:start + name_len]
+            if name == target:
+                entry = self._files[filename] = (mid, mtime_ns, size)
+                return entry
+            if name < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _file_index(self, filename):
+        entry = self._file_entry(filename)
+        return entry[0] if entry is not None else None
+
+    def filenames(self):
+        """Names of the compiled files, sorted"""
+        return [self._string(*self._record(FILE_RECORD, "files", index)[:2])
+                for index in range(self.header["files"])]
+
+    def source_stat(self, filename):
+        """(mtime_ns, size) of a file when it was compiled, or None if not in the bundle"""
+        entry = self._file_entry(filename)
+        return entry[1:] if entry is not None else None
+
+    def get(self, filename):
+        """Compiled content of a file, or None"""
+        index = self._file_index(filename)
+        if index is None:
+            return None
+        _, _, text_off, text_len = self._record(FILE_RECORD, "files", index)[:4]
+        return self._string(text_off, text_len)
+
+    def sections(self, filename):
+        """Compiled heading sections of a file (SectionTree section dicts), or None"""
+        index = self._file_index(filename)
+        if index is None:
+            return None
+        first, count = self._record(FILE_RECORD, "files", index)[6:8]
+        sections = []
+        for i in range(first, first + count):
+            (_, id_off, id_len, title_off, title_len, text_off, text_len, own_len,
+             level) = self._record(SECTION_RECORD, "sections", i)
+            sections.append({
+                "id": self._string(id_off, id_len),
+                "title": self._string(title_off, title_len),
+                "level": level,
+                "text": self._string(text_off, text_len),
+                "own_text": self._string(text_off, own_len),
+            })
+        return sections
+
+    def _postings(self, term):
+        """Binary search of the sorted term table"""
+        target = term.encode()
+        lo, hi = 0, self.header["terms"]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            term_off, term_len, first, count = self._record(TERM_RECORD, "terms", mid)
+            start = self._regions["strings"] + term_off
+            name = self._mmap[start:start + term_len]
+            if name == target:
+                base = self._regions["postings"] + first * POSTING_RECORD.size
+                return [POSTING_RECORD.unpack_from(self._mmap, base + i * POSTING_RECORD.size)
+                        for i in range(count)]
+            if name < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return []
+
+    def search(self, query, top_k=5):
+        """
+        Rank passages against a query with BM25 (same results as KnowledgeIndex.search)
+
+        Args:
+            query: Free-text query
+            top_k: Maximum number of passages to return
+
+        Returns:
+            List of passage dicts (with a 'score' key), best first
+        """
+        terms = set(tokenize(query))
+        n = self.header["passages"]
+        if not terms or not n:
+            return []
+
+        avg_length = self.header["total_length"] / n
+        lengths = {}
+        scores = defaultdict(float)
+        for term in terms:
+            postings = self._postings(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for passage_id, tf in postings:
+                if passage_id not in lengths:
+                    lengths[passage_id] = self._record(PASSAGE_RECORD, "passages", passage_id)[6]
+                norm = self.k1 * (1 - self.b + self.b * lengths[passage_id] / avg_length)
+                scores[passage_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+        results = []
+        seen = set()
+        for passage_id, score in ranked:
+            file_index, section_off, section_len, text_off, text_len, line, _ = self._record(
+                PASSAGE_RECORD, "passages", passage_id)
+            text = self._string(text_off, text_len)
+            if text in seen:
+                continue
+            seen.add(text)
+            name_off, name_len = self._record(FILE_RECORD, "files", file_index)[:2]
+            results.append({
+                "section": self._string(section_off, section_len),
+                "text": text,
+                "line": line,
+                "filename": self._string(name_off, name_len),
+                "score": score,
+            })
+            if len(results) >= top_k:
+                break
+        return results
+
+    def stale_files(self, knowledge_dir=KNOWLEDGE_DIR):
+        """
+        Compare the bundle with the source files
+
+        Args:
+            knowledge_dir: Knowledge directory the bundle should reflect
+
+        Returns:
+            Sorted names of files added, removed or modified since the build
+            (every file if the bundle was built from another directory)
+        """
+        knowledge_dir = Path(knowledge_dir).resolve()
+        compiled = set(self.filenames())
+        current = set(list_sources(knowledge_dir))
+        if str(knowledge_dir) != self.header["source_dir"]:
+            return sorted(compiled | current)
+
+        stale = compiled ^ current
+        for filename in compiled & current:
+            try:
+                stat = (knowledge_dir / filename).stat()
+            except OSError:
+                stale.add(filename)
+                continue
+            if (stat.st_mtime_ns, stat.st_size) != self.source_stat(filename):
+                stale.add(filename)
+        return sorted(stale)
+
+    def is_fresh(self, knowledge_dir=KNOWLEDGE_DIR):
+        """True if no source file changed since the bundle was built"""
+        return not self.stale_files(knowledge_dir)
+
+
+def load_bundle(path=None):
+    """
+    Map the knowledge bundle if one has been built
+
+    Args:
+        path: Bundle path (default: default_bundle_path())
+
+    Returns:
+        KnowledgeBundle, or None if there is no usable bundle
+    """
+    path = Path(path) if path else default_bundle_path()
+    if not path.exists():
+        return None
+    try:
+        return KnowledgeBundle(path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"⚠️  Ignoring knowledge bundle {path}: {e}")
+        return None
+
+
+def main(argv=None):
+    """Entry point for the build_knowledge_bundle command"""
+    parser = argparse.ArgumentParser(prog="build_knowledge_bundle",
+                                     description="Compile knowledge/ into a memory-mapped bundle")
+    parser.add_argument("--knowledge-dir", default=str(KNOWLEDGE_DIR))
+    parser.add_argument("--output", help="Bundle path (default: the knowledge cache directory)")
+    parser.add_argument("--check", action="store_true",
+                        help="Only report whether the bundle is up to date (exit 1 if stale)")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        bundle = load_bundle(args.output)
+        stale = bundle.stale_files(args.knowledge_dir) if bundle else None
+        if bundle is None:
+            print("No knowledge bundle built yet")
+        elif stale:
+            print(f"Knowledge bundle is stale ({len(stale)} changed: {', '.join(stale[:10])})")
+        else:
+            print(f"✓ Knowledge bundle {bundle.path} is up to date")
+        sys.exit(0 if bundle is not None and not stale else 1)
+
+    start = time.perf_counter()
+    path = build_bundle(args.knowledge_dir, args.output)
+    bundle = KnowledgeBundle(path)
+    header = bundle.header
+    print(f"✓ Compiled {header['files']} files ({header['sections']} sections, "
+          f"{header['passages']} passages, {header['terms']} terms) into {path} "
+          f"[{path.stat().st_size / 1024:.0f} KB] in {time.perf_counter() - start:.2f}s")
+    bundle.close()
+
+
+if __name__ == "__main__":
+    main()
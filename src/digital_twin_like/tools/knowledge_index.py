@@ -0,0 +1,282 @@
+"""
+Inverted index with BM25 ranking over the knowledge base
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#][a-z0-9+#]*)?")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can do does did for from has have how i in
+is it its me my of on or so that the their them there these this to was were
+what when where which who why will with you your yours about tell
+s t d ll m re ve
+""".split())
+
+
+def tokenize(text):
+    """
+    Split text into lowercase search terms, dropping stopwords
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def split_passages(text):
+    """
+    Split a markdown document into paragraph-level passages
+
+    Each passage remembers the heading path it sits under so results can be
+    shown with their section context.
+
+    Args:
+        text: Markdown document
+
+    Returns:
+        List of dicts with 'section', 'text' and 'line' keys
+    """
+    passages = []
+    headings = []
+    block = []
+    block_start = 0
+
+    def flush():
+        if block:
+            passages.append({
+                "section": " > ".join(h for h in headings if h),
+                "text": "\n".join(block),
+                "line": block_start,
+            })
+            block.clear()
+
+    for line_no, line in enumerate(text.split('\n')):
+        match = HEADING_PATTERN.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            del headings[level - 1:]
+            headings.extend([""] * (level - 1 - len(headings)))
+            headings.append(match.group(2))
+            continue
+
+        if not line.strip():
+            flush()
+            continue
+
+        if not block:
+            block_start = line_no
+        block.append(line)
+
+    flush()
+    return passages
+
+
+def split_sections(text):
+    """
+    Split a markdown document into one chunk per heading
+
+    Args:
+        text: Markdown document
+
+    Returns:
+        List of dicts with 'section', 'text' and 'line' keys
+    """
+    sections = []
+    for passage in split_passages(text):
+        if sections and sections[-1]["section"] == passage["section"]:
+            sections[-1]["text"] += "\n\n" + passage["text"]
+        else:
+            sections.append(dict(passage))
+    return sections
+
+
+class KnowledgeIndex:
+    """Tokenized inverted index over knowledge passages, scored with BM25"""
+
+    def __init__(self, k1=1.5, b=0.75):
+        """
+        Initialize an empty index
+
+        Args:
+            k1: BM25 term-frequency saturation parameter
+            b: BM25 length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+
+        self._passages = {}                   # passage id -> passage dict
+        self._lengths = {}                    # passage id -> token count
+        self._postings = defaultdict(dict)    # term -> {passage id: tf}
+        self._by_file = {}                    # filename -> [passage ids]
+        self._sources = {}                    # filename -> indexed content
+        self._total_length = 0
+        self._next_id = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._passages)
+
+    def add_document(self, filename, content):
+        """
+        Index (or re-index) a single knowledge file
+
+        Args:
+            filename: Name of the knowledge file
+            content: Markdown content of the file
+        """
+        with self._lock:
+            self.remove_document(filename)
+
+            ids = []
+            for passage in split_passages(content):
+                tokens = tokenize(passage["section"] + " " + passage["text"])
+                if not tokens:
+                    continue
+
+                passage_id = self._next_id
+                self._next_id += 1
+                passage["filename"] = filename
+
+                self._passages[passage_id] = passage
+                self._lengths[passage_id] = len(tokens)
+                self._total_length += len(tokens)
+                for term, tf in Counter(tokens).items():
+                    self._postings[term][passage_id] = tf
+                ids.append(passage_id)
+
+            self._by_file[filename] = ids
+            self._sources[filename] = content
+
+    def remove_document(self, filename):
+        """
+        Remove a knowledge file from the index
+
+        Args:
+            filename: Name of the knowledge file
+        """
+        with self._lock:
+            for passage_id in self._by_file.pop(filename, []):
+                passage = self._passages.pop(passage_id)
+                self._total_length -= self._lengths.pop(passage_id)
+                for term in set(tokenize(passage["section"] + " " + passage["text"])):
+                    postings = self._postings.get(term)
+                    if postings is not None:
+                        postings.pop(passage_id, None)
+                        if not postings:
+                            del self._postings[term]
+            self._sources.pop(filename, None)
+
+    def sync(self, documents):
+        """
+        Bring the index up to date with the given documents
+
+        Only files whose content changed are re-indexed, and files that
+        disappeared are dropped.
+
+        Args:
+            documents: Dict mapping filename to current content
+
+        Returns:
+            List of filenames that were (re-)indexed or removed
+        """
+        changed = []
+        with self._lock:
+            for filename in list(self._sources):
+                if filename not in documents:
+                    self.remove_document(filename)
+                    changed.append(filename)
+
+            for filename, content in documents.items():
+                indexed = self._sources.get(filename)
+                # The store hands back the same string object until a file changes
+                if indexed is content or indexed == content:
+                    continue
+                self.add_document(filename, content)
+                changed.append(filename)
+        return changed
+
+    def search(self, query, top_k=5):
+        """
+        Rank passages against a query with BM25
+
+        Args:
+            query: Free-text query
+            top_k: Maximum number of passages to return
+
+        Returns:
+            List of passage dicts (with a 'score' key), best first
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._passages)
+            if not terms or not n:
+                return []
+
+            avg_length = self._total_length / n
+            scores = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for passage_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[passage_id] / avg_length)
+                    scores[passage_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+            results = []
+            seen = set()
+            for passage_id, score in ranked:
+                passage = self._passages[passage_id]
+                if passage["text"] in seen:
+                    continue
+                seen.add(passage["text"])
+                results.append(dict(passage, score=score))
+                if len(results) >= top_k:
+                    break
+            return results
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+_stale_bundle_warned = False
+
+
+def get_knowledge_index():
+    """
+    Get the process-wide knowledge index, synced with the knowledge store
+
+    The compiled bundle's index is used while it matches the knowledge files;
+    once a file changes the index is built in memory from the store instead.
+
+    Returns:
+        KnowledgeBundle or KnowledgeIndex reflecting the current knowledge files
+    """
+    global _index, _stale_bundle_warned
+    from digital_twin_like.tools.knowledge_store import get_knowledge_store
+
+    store = get_knowledge_store()
+    if store.bundle_is_fresh():
+        return store.bundle
+    if store.bundle is not None and not _stale_bundle_warned:
+        _stale_bundle_warned = True
+        print("⚠️  Knowledge bundle is out of date, indexing in memory "
+              "(run build_knowledge_bundle to recompile)")
+
+    with _index_lock:
+        if _index is None:
+            _index = KnowledgeIndex()
+        _index.sync(store.load_all())
+    return _index
@@ -0,0 +1,318 @@
+"""
+Section-addressable access to the knowledge base files
+Each markdown file is parsed once into a tree of heading sections, so tools can
+return a compact table of contents or only the sections a question needs,
+within a per-response token budget, instead of the whole file.
+"""
+import os
+import re
+import threading
+
+from digital_twin_like.tools.knowledge_index import HEADING_PATTERN
+
+
+# Most tokens a knowledge tool returns in one response
+DEFAULT_TOKEN_BUDGET = int(os.getenv("DIGITAL_TWIN_TOOL_TOKEN_BUDGET", "500"))
+
+# Files up to this multiple of the budget are returned whole when no sections
+# are requested: an outline costs an extra ReAct round trip, which resends the
+# whole prompt, and that outweighs a few hundred extra tokens of file text
+WHOLE_FILE_FACTOR = 2.0
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English text)"""
+    return (len(text) + 3) // 4
+
+
+def slugify(title):
+    """Section id component for a heading, e.g. 'Awards & Recognition' -> 'awards-recognition'"""
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
+
+
+class SectionTree:
+    """Heading structure of one markdown document"""
+
+    def __init__(self, filename, text, sections=None):
+        """
+        Parse a document into sections
+
+        Every heading starts a section spanning its subsections. Section ids
+        are the slugged heading path, e.g. 'educational-background/previous-education';
+        a single top-level '#' title is left out of the ids and becomes the
+        overview section ''.
+
+        Args:
+            filename: Knowledge file name
+            text: Markdown content
+            sections: Already parsed sections (e.g. from the compiled knowledge
+                      bundle); the text is not parsed again
+        """
+        self.filename = filename
+        self.text = text
+        if sections is not None:
+            self.sections = sections
+            self._by_id = {s["id"]: s for s in self.sections}
+            return
+
+        lines = text.split('\n')
+        line_starts = [0]
+        for line in lines:
+            line_starts.append(line_starts[-1] + len(line) + 1)
+
+        headings = []   # (line, level, title)
+        for line_no, line in enumerate(lines):
+            match = HEADING_PATTERN.match(line)
+            if match:
+                headings.append((line_no, len(match.group(1)), match.group(2)))
+        single_title = sum(1 for _, level, _ in headings if level == 1) == 1
+
+        self.sections = []
+        path = []   # (level, slug) of the enclosing headings
+        for index, (line_no, level, title) in enumerate(headings):
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, slugify(title)))
+
+            # A section's own text stops at the next heading; its subtree at the
+            # next heading of the same or a higher level
+            own_end = headings[index + 1][0] if index + 1 < len(headings) else len(lines)
+            end = next((next_line for next_line, next_level, _ in headings[index + 1:]
+                        if next_level <= level), len(lines))
+
+            slugs = [slug for lvl, slug in path if not (single_title and lvl == 1)]
+            self.sections.append({
+                "id": "/".join(slugs),
+                "title": title,
+                "level": level,
+                "text": "\n".join(lines[line_no:end]).strip(),
+                "own_text": "\n".join(lines[line_no:own_end]).strip(),
+                "start": line_starts[line_no],
+            })
+
+        self._by_id = {s["id"]: s for s in self.sections}
+
+    def children(self, section):
+        """Direct subsections of a section"""
+        prefix = f"{section['id']}/" if section["id"] else ""
+        depth = section["id"].count("/") + 1 if section["id"] else 0
+        return [s for s in self.sections
+                if s["id"].startswith(prefix) and s["id"] and s["id"].count("/") == depth]
+
+    def find(self, ref):
+        """
+        Look up a section by id, heading title or last id component
+
+        Args:
+            ref: e.g. 'notable-achievements/awards-recognition', 'Awards & Recognition'
+                 or 'awards-recognition'
+
+        Returns:
+            Section dict, or None
+        """
+        ref = ref.strip().strip("/")
+        section = self._by_id.get(ref)
+        if section is not None:
+            return section
+        slug = slugify(ref)
+        for section in self.sections:
+            if section["id"] == slug or section["id"].rsplit("/", 1)[-1] == slug:
+                return section
+        return None
+
+    def toc(self):
+        """
+        Compact table of contents with approximate token counts
+
+        Returns:
+            One line per section: indented id, title and size
+        """
+        lines = [f"Sections of {self.filename} (request by id):"]
+        for section in self.sections:
+            if not section["id"]:
+                continue
+            indent = "  " * section["id"].count("/")
+            lines.append(f"{indent}- {section['id']}: {section['title']} "
+                         f"(~{estimate_tokens(section['text'])} tokens)")
+        return "\n".join(lines)
+
+
+def truncate_to_tokens(text, budget, note=""):
+    """
+    Shorten text to a token budget, keeping whole paragraphs where possible
+
+    Args:
+        text: Text to shorten
+        budget: Token budget
+        note: Appended after the cut (e.g. which subsections to request)
+
+    Returns:
+        Text within roughly `budget` tokens
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+
+    kept = []
+    used = 0
+    for paragraph in text.split("\n\n"):
+        cost = estimate_tokens(paragraph) + 1
+        if used + cost > budget:
+            if not kept:
+                kept.append(paragraph[:max(0, budget * 4)].rsplit(" ", 1)[0])
+            break
+        kept.append(paragraph)
+        used += cost
+
+    omitted = estimate_tokens(text) - estimate_tokens("\n\n".join(kept))
+    return "\n\n".join(kept) + f"\n[... ~{omitted} tokens truncated{note}]"
+
+
+_trees = {}
+_trees_lock = threading.Lock()
+
+
+def get_section_tree(filename):
+    """
+    Get the parsed section tree of a knowledge file (re-parsed only when it changes)
+
+    Args:
+        filename: Knowledge file name
+
+    Returns:
+        SectionTree, or None if the file does not exist
+    """
+    from digital_twin_like.tools.knowledge_store import get_knowledge_store
+
+    store = get_knowledge_store()
+    content = store.get(filename)
+    if content is None:
+        return None
+    with _trees_lock:
+        tree = _trees.get(filename)
+        # The store hands back the same string object until a file changes
+        if tree is None or tree.text is not content:
+            sections = store.bundle.sections(filename) if store.is_bundled(filename) else None
+            tree = SectionTree(filename, content, sections)
+            _trees[filename] = tree
+    return tree
+
+
+def read_sections(filename, sections="", token_budget=None):
+    """
+    Tool response for a knowledge file
+
+    Without `sections` the whole file is returned if it is within
+    WHOLE_FILE_FACTOR times the budget, otherwise its table of contents. With
+    `sections` (comma-separated ids or titles) only those sections are
+    returned, each truncated to the budget that remains, with a pointer to
+    its subsections.
+
+    Args:
+        filename: Knowledge file name
+        sections: Comma-separated section ids or titles
+        token_budget: Token budget for the response (default: DEFAULT_TOKEN_BUDGET)
+
+    Returns:
+        Response text
+    """
+    budget = token_budget or DEFAULT_TOKEN_BUDGET
+    tree = get_section_tree(filename)
+    if tree is None:
+        return f"Knowledge file {filename} not found"
+
+    refs = [r for r in re.split(r"[,;\n]", sections or "") if r.strip()]
+    if not refs:
+        if estimate_tokens(tree.text) <= budget * WHOLE_FILE_FACTOR:
+            response = tree.text
+            record_usage(response, tree.text)
+        else:
+            overview = tree.find("")
+            intro = overview["own_text"] if overview else ""
+            response = "\n\n".join(p for p in (intro, tree.toc()) if p)
+            # Nothing is saved yet: the follow-up section request is measured
+            # against the whole file, and this call forces that extra round trip
+            record_usage(response, response, outline=True)
+        return response
+
+    parts = []
+    remaining = budget
+    for ref in refs:
+        section = tree.find(ref)
+        if section is None:
+            parts.append(f"[Unknown section '{ref.strip()}' - call without sections for the file or its outline]")
+            continue
+        if remaining <= 0:
+            parts.append(f"[Section '{section['id']}' omitted: response token budget reached]")
+            continue
+        children = tree.children(section)
+        note = f"; request subsections: {', '.join(c['id'] for c in children)}" if children else ""
+        text = truncate_to_tokens(section["text"], remaining, note)
+        remaining -= estimate_tokens(text)
+        parts.append(text)
+
+    response = "\n\n".join(parts)
+    record_usage(response, tree.text)
+    return response
+
+
+# Token accounting: totals for the process and per turn (per thread, since
+# each conversation turn runs its tools on the thread that kicked it off)
+_usage_lock = threading.Lock()
+_totals = {"calls": 0, "outline_calls": 0, "returned_tokens": 0, "full_tokens": 0}
+_turn = threading.local()
+
+
+def record_usage(returned_text, full_text, outline=False):
+    """
+    Record one tool response against what returning the whole source would cost
+
+    Args:
+        returned_text: Text the tool returned
+        full_text: Text the tool would have returned without sectioning or trimming
+        outline: The response is an outline, so the agent needs another LLM
+                 round trip to request sections
+    """
+    returned, full = estimate_tokens(returned_text), estimate_tokens(full_text)
+    usages = [_totals]
+    usage = getattr(_turn, "usage", None)
+    if usage is not None:
+        usages.append(usage)
+    with _usage_lock:
+        for counts in usages:
+            counts["calls"] += 1
+            counts["outline_calls"] += outline
+            counts["returned_tokens"] += returned
+            counts["full_tokens"] += full
+
+
+def start_turn_usage():
+    """Start counting knowledge tool tokens for a turn on this thread"""
+    _turn.usage = {"calls": 0, "outline_calls": 0, "returned_tokens": 0, "full_tokens": 0}
+
+
+def turn_usage():
+    """
+    Knowledge tool tokens used by the current turn on this thread
+
+    Returns:
+        Dict with 'calls', 'outline_calls' (extra LLM round trips forced by
+        outlines), 'returned_tokens', 'full_tokens' and 'saved_tokens'
+    """
+    usage = dict(getattr(_turn, "usage", None)
+                 or {"calls": 0, "outline_calls": 0, "returned_tokens": 0, "full_tokens": 0})
+    usage["saved_tokens"] = usage["full_tokens"] - usage["returned_tokens"]
+    return usage
+
+
+def usage_stats():
+    """
+    Knowledge tool tokens used since the process started
+
+    Returns:
+        Dict with 'calls', 'outline_calls', 'returned_tokens', 'full_tokens'
+        and 'saved_tokens'
+    """
+    with _usage_lock:
+        stats = dict(_totals)
+    stats["saved_tokens"] = stats["full_tokens"] - stats["returned_tokens"]
+    return stats
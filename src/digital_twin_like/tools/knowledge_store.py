@@ -0,0 +1,302 @@
+"""
+Process-wide in-memory store for the knowledge base files
+When a compiled knowledge bundle is available (see knowledge_bundle.py), files
+whose mtime/size still match the bundle are served from its memory map instead
+of being read from disk.
+"""
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+from digital_twin_like.paths import KNOWLEDGE_DIR
+
+
+KNOWLEDGE_EXTENSIONS = (".md",)
+
+
+class KnowledgeStore:
+    """Keeps knowledge base files in memory and revalidates them by mtime/size"""
+
+    def __init__(self, knowledge_dir=KNOWLEDGE_DIR, poll_interval=1.0, bundle=None,
+                 bundle_check_interval=30.0):
+        """
+        Initialize the knowledge store
+
+        Args:
+            knowledge_dir: Directory containing the knowledge base files
+            poll_interval: Seconds between stat() checks of a cached file.
+                           Within this window cached content is served without
+                           touching the disk; 0 revalidates on every access.
+            bundle: Optional KnowledgeBundle compiled from knowledge_dir
+            bundle_check_interval: Seconds between full re-stats of every file
+                                   against the bundle, run on a background thread
+        """
+        self.knowledge_dir = Path(knowledge_dir)
+        self.poll_interval = poll_interval
+        if bundle is not None and bundle.header["source_dir"] != str(self.knowledge_dir.resolve()):
+            bundle = None
+        self.bundle = bundle
+        self.bundle_check_interval = bundle_check_interval
+        self._bundle_fresh = None
+        self._bundle_checked_at = 0.0
+        self._dir_mtime_ns = None
+        self._dir_checked_at = 0.0
+        self._bundle_sweeper = None
+        self._fingerprint_sources = None
+        self._fingerprint = None
+
+        # filename -> {"content", "mtime_ns", "size", "checked_at", "bundled"}
+        self._entries = {}
+        self._listing = None
+        self._listed_at = 0.0
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bundle_reads = 0
+
+    def get(self, filename):
+        """
+        Get the content of a knowledge file
+
+        Args:
+            filename: Name of the file inside the knowledge directory
+
+        Returns:
+            File content as a string, or None if the file does not exist
+        """
+        with self._lock:
+            entry = self._entries.get(filename)
+            now = time.monotonic()
+
+            if entry is not None and now - entry["checked_at"] < self.poll_interval:
+                self.hits += 1
+                return entry["content"]
+
+            file_path = self.knowledge_dir / filename
+            try:
+                stat = file_path.stat()
+            except OSError:
+                self._entries.pop(filename, None)
+                return None
+
+            if (entry is not None
+                    and entry["mtime_ns"] == stat.st_mtime_ns
+                    and entry["size"] == stat.st_size):
+                entry["checked_at"] = now
+                self.hits += 1
+                return entry["content"]
+
+            self.misses += 1
+            bundled = (self.bundle is not None
+                       and self.bundle.source_stat(filename) == (stat.st_mtime_ns, stat.st_size))
+            if bundled:
+                self.bundle_reads += 1
+                content = self.bundle.get(filename)
+            else:
+                if self.bundle is not None and filename.endswith(KNOWLEDGE_EXTENSIONS):
+                    # A file edited or added since the build: stop searching the bundle
+                    self._bundle_fresh = False
+                with open(file_path, 'r') as f:
+                    content = f.read()
+
+            self._entries[filename] = {
+                "content": content,
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "checked_at": now,
+                "bundled": bundled,
+            }
+            return content
+
+    def is_bundled(self, filename):
+        """
+        Check whether a file's current content came from the compiled bundle
+
+        Args:
+            filename: Name of the file inside the knowledge directory
+
+        Returns:
+            True if the file is unchanged since the bundle was built
+        """
+        if self.get(filename) is None:
+            return False
+        with self._lock:
+            entry = self._entries.get(filename)
+            return entry is not None and entry["bundled"]
+
+    def bundle_is_fresh(self):
+        """
+        Check whether the compiled bundle still matches every knowledge file
+
+        The bundle is assumed fresh until the first full re-stat of every
+        file, which runs on a background thread started by the first call
+        and repeated every bundle_check_interval. On the request path only
+        the directory's mtime is checked (at most once per poll_interval),
+        which catches added and removed files; in-place edits are caught
+        when get() revalidates the file. Once stale, the bundle stays stale
+        until it is rebuilt and the process restarted.
+
+        Returns:
+            True if there is a bundle and no file was added, removed or edited since it was built
+        """
+        if self.bundle is None:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if self._bundle_fresh is None:
+                # Files read before the first sweep finishes are still checked one by one in get()
+                self._dir_mtime_ns = self._dir_mtime()
+                self._bundle_fresh = True
+                self._dir_checked_at = now
+                self._bundle_checked_at = now - self.bundle_check_interval
+            elif self._bundle_fresh and now - self._dir_checked_at >= self.poll_interval:
+                self._dir_checked_at = now
+                dir_mtime = self._dir_mtime()
+                if dir_mtime != self._dir_mtime_ns:
+                    self._dir_mtime_ns = dir_mtime
+                    self._bundle_fresh = self.bundle.is_fresh(self.knowledge_dir)
+                    self._bundle_checked_at = now
+
+            sweeping = self._bundle_sweeper is not None and self._bundle_sweeper.is_alive()
+            if (self._bundle_fresh and not sweeping
+                    and now - self._bundle_checked_at >= self.bundle_check_interval):
+                self._bundle_checked_at = now
+                self._bundle_sweeper = threading.Thread(target=self._sweep_bundle,
+                                                        name="knowledge-bundle-check", daemon=True)
+                self._bundle_sweeper.start()
+            return self._bundle_fresh
+
+    def _dir_mtime(self):
+        try:
+            return self.knowledge_dir.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _sweep_bundle(self):
+        """Re-stat every file against the bundle (runs off the request path)"""
+        fresh = self.bundle.is_fresh(self.knowledge_dir)
+        with self._lock:
+            self._bundle_fresh = self._bundle_fresh and fresh
+
+    def filenames(self):
+        """
+        List the knowledge files currently present on disk
+
+        Returns:
+            Sorted list of filenames
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._listing is None or now - self._listed_at >= self.poll_interval:
+                if self.knowledge_dir.is_dir():
+                    self._listing = sorted(
+                        name for name in os.listdir(self.knowledge_dir)
+                        if name.endswith(KNOWLEDGE_EXTENSIONS)
+                    )
+                else:
+                    self._listing = []
+                self._listed_at = now
+            return list(self._listing)
+
+    def load_all(self):
+        """
+        Load every knowledge file into memory
+
+        Returns:
+            Dict mapping filename to content
+        """
+        documents = {}
+        for filename in self.filenames():
+            content = self.get(filename)
+            if content is not None:
+                documents[filename] = content
+        return documents
+
+    def fingerprint(self):
+        """
+        Hash of every knowledge file's name and content
+
+        Returns:
+            Hex digest that changes whenever a knowledge file is added, removed or edited
+        """
+        if self.bundle_is_fresh():
+            return self.bundle.content_hash
+
+        documents = sorted(self.load_all().items())
+        with self._lock:
+            # The store hands back the same string objects until a file changes
+            previous = self._fingerprint_sources
+            if previous is not None and len(previous) == len(documents) and all(
+                    a[0] == b[0] and a[1] is b[1] for a, b in zip(previous, documents)):
+                return self._fingerprint
+
+        digest = hashlib.sha256()
+        for filename, content in documents:
+            digest.update(filename.encode())
+            digest.update(b"\0")
+            digest.update(content.encode())
+            digest.update(b"\0")
+        with self._lock:
+            self._fingerprint_sources = documents
+            self._fingerprint = digest.hexdigest()
+            return self._fingerprint
+
+    def invalidate(self, filename=None):
+        """
+        Drop cached content so the next access re-reads from disk
+
+        Args:
+            filename: File to invalidate, or None to clear everything
+        """
+        with self._lock:
+            if filename is None:
+                self._entries.clear()
+                self._listing = None
+            else:
+                self._entries.pop(filename, None)
+
+    def stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            Dict with hit/miss counters, hit rate and cached size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "bundle_reads": self.bundle_reads,
+                "bundled": self.bundle is not None,
+                "files": len(self._entries),
+                "bytes": sum(len(e["content"]) for e in self._entries.values()),
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_knowledge_store():
+    """
+    Get the process-wide knowledge store, creating it on first use
+
+    With a compiled bundle the files are mapped rather than read up front;
+    without one every file is loaded eagerly.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from digital_twin_like.tools.knowledge_bundle import load_bundle
+
+                store = KnowledgeStore(bundle=load_bundle())
+                if store.bundle is None:
+                    store.load_all()
+                _store = store
+    return _store
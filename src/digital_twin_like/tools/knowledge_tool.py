@@ -2,61 +2,91 @@
 Knowledge base tool for accessing Tim's background information
 """
 from crewai.tools import tool
-import os
-from pathlib import Path
+from digital_twin_like.tools.knowledge_store import get_knowledge_store
+from digital_twin_like.tools.knowledge_index import get_knowledge_index
+from digital_twin_like.tools.knowledge_sections import (
+    DEFAULT_TOKEN_BUDGET, estimate_tokens, read_sections, record_usage
+)
 
 
-def load_knowledge_file(filename):
-    """Load content from knowledge base file"""
-    knowledge_dir = Path(__file__).parent.parent.parent.parent / "knowledge"
-    file_path = knowledge_dir / filename
+# Display names for the knowledge files in search results
+KNOWLEDGE_CATEGORIES = {
+    "tim_bio.md": "Biography",
+    "tim_skills.md": "Skills",
+    "tim_research.md": "Research",
+}
+
+# Number of ranked passages returned by search_knowledge
+SEARCH_TOP_K = 5
+
+# Number of heading-level sections returned by semantic_search_knowledge
+SEMANTIC_TOP_K = 3
+
 
-    if file_path.exists():
-        with open(file_path, 'r') as f:
-            return f.read()
+def load_knowledge_file(filename):
+    """Load content from knowledge base file (served from the in-memory store)"""
+    content = get_knowledge_store().get(filename)
+    if content is not None:
+        return content
     return f"Knowledge file {filename} not found"
 
 
 @tool("Get Tim's Biography")
-def get_biography() -> str:
+def get_biography(sections: str = "") -> str:
     """
     Retrieves Tim Cao's biographical information including education,
-    current position, and notable achievements.
+    current position, and notable achievements. Without sections the whole
+    file is returned, or an outline of section ids if it is too large; then
+    pass the section ids you need, comma-separated.
+
+    Args:
+        sections: Comma-separated section ids, e.g. "educational-background, current-position"
 
     Returns:
-        str: Complete biography with educational background and achievements
+        str: The biography, the requested sections, or an outline
     """
-    return load_knowledge_file("tim_bio.md")
+    return read_sections("tim_bio.md", sections)
 
 
 @tool("Get Tim's Technical Skills")
-def get_skills() -> str:
+def get_skills(sections: str = "") -> str:
     """
     Retrieves Tim Cao's technical skills and expertise including programming
     languages, machine learning capabilities, and computational biology tools.
+    Without sections the whole file is returned, or an outline of section ids
+    if it is too large; then pass the section ids you need.
+
+    Args:
+        sections: Comma-separated section ids, e.g. "programming-languages/python"
 
     Returns:
-        str: Detailed technical skills and capabilities
+        str: The skills, the requested sections, or an outline
     """
-    return load_knowledge_file("tim_skills.md")
+    return read_sections("tim_skills.md", sections)
 
 
 @tool("Get Tim's Research Background")
-def get_research() -> str:
+def get_research(sections: str = "") -> str:
     """
     Retrieves Tim Cao's research background, publications, and current
     research projects in spatial transcriptomics and neural stem cells.
+    Without sections the whole file is returned, or an outline of section ids
+    if it is too large; then pass the section ids you need.
+
+    Args:
+        sections: Comma-separated section ids, e.g. "publications, current-research"
 
     Returns:
-        str: Research background and publications
+        str: The research background, the requested sections, or an outline
     """
-    return load_knowledge_file("tim_research.md")
+    return read_sections("tim_research.md", sections)
 
 
 @tool("Search Knowledge Base")
 def search_knowledge(query: str) -> str:
     """
     Search across all knowledge base files for specific information.
+    Returns the best-matching passages ranked by relevance.
 
     Args:
         query: The search query or topic to find information about
@@ -64,38 +94,53 @@ def search_knowledge(query: str) -> str:
     Returns:
         str: Relevant information from the knowledge base
     """
-    # Load all knowledge files
-    bio = load_knowledge_file("tim_bio.md")
-    skills = load_knowledge_file("tim_skills.md")
-    research = load_knowledge_file("tim_research.md")
-
-    # Simple search - return sections that contain the query (case-insensitive)
-    results = []
-    query_lower = query.lower()
-
-    all_content = {
-        "Biography": bio,
-        "Skills": skills,
-        "Research": research
-    }
-
-    for category, content in all_content.items():
-        if query_lower in content.lower():
-            # Extract relevant paragraphs
-            lines = content.split('\n')
-            relevant_lines = []
-            for i, line in enumerate(lines):
-                if query_lower in line.lower():
-                    # Include context (previous and next lines)
-                    start = max(0, i-2)
-                    end = min(len(lines), i+3)
-                    relevant_lines.extend(lines[start:end])
-
-            if relevant_lines:
-                results.append(f"\n## From {category}:\n" + '\n'.join(relevant_lines))
+    results = get_knowledge_index().search(query, top_k=SEARCH_TOP_K)
 
     if results:
-        return '\n'.join(results)
+        passages = []
+        for result in results:
+            category = KNOWLEDGE_CATEGORIES.get(result["filename"], result["filename"])
+            heading = f"{category} - {result['section']}" if result["section"] else category
+            passages.append(f"\n## From {heading}:\n{result['text']}")
+
+        sections = []
+        used = 0
+        for passage in passages:
+            # Best passages first, until the response token budget is spent
+            if sections and used + estimate_tokens(passage) > DEFAULT_TOKEN_BUDGET:
+                break
+            sections.append(passage)
+            used += estimate_tokens(passage)
+        response = '\n'.join(sections)
+        record_usage(response, '\n'.join(passages))
+        return response
+    else:
+        return f"No specific information found for: {query}. Try using the biography, skills, or research tools for general information."
+
+
+@tool("Semantic Search Knowledge Base")
+def semantic_search_knowledge(query: str) -> str:
+    """
+    Find the knowledge base sections closest in meaning to a question, even
+    when it is phrased differently from the source text.
+
+    Args:
+        query: The question or topic to find information about
+
+    Returns:
+        str: The most relevant sections from the knowledge base
+    """
+    from digital_twin_like.tools.semantic_search import get_semantic_index
+
+    results = get_semantic_index().search(query, top_k=SEMANTIC_TOP_K)
+
+    if results:
+        sections = []
+        for result in results:
+            category = KNOWLEDGE_CATEGORIES.get(result["filename"], result["filename"])
+            heading = f"{category} - {result['section']}" if result["section"] else category
+            sections.append(f"\n## From {heading}:\n{result['text']}")
+        return '\n'.join(sections)
     else:
         return f"No specific information found for: {query}. Try using the biography, skills, or research tools for general information."
 
@@ -107,3 +152,6 @@ KNOWLEDGE_TOOLS = [
     get_research,
     search_knowledge
 ]
+
+# Knowledge tools plus the optional embedding-based search
+SEMANTIC_KNOWLEDGE_TOOLS = KNOWLEDGE_TOOLS + [semantic_search_knowledge]
@@ -0,0 +1,248 @@
+"""
+Embedding-based semantic retrieval over the knowledge base
+
+Sections are embedded with a hashed TF-IDF vectorizer, or with a local
+sentence-transformers model when $DIGITAL_TWIN_EMBEDDING_BACKEND asks for it,
+stored as a NumPy matrix that is persisted to disk, and queried with a
+vectorized top-k cosine search.
+"""
+import hashlib
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from digital_twin_like.paths import get_cache_dir
+from digital_twin_like.tools.knowledge_index import split_sections, tokenize
+
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Backend of the process-wide index: 'hashed' needs nothing beyond NumPy;
+# 'sentence-transformers' (or 'auto') downloads DEFAULT_MODEL on first use
+EMBEDDING_BACKEND = os.getenv("DIGITAL_TWIN_EMBEDDING_BACKEND", "hashed")
+
+
+class HashedTfidfEmbedder:
+    """Hashed TF-IDF vectorizer over words, word bigrams and character trigrams"""
+
+    name = "hashed-tfidf"
+
+    def __init__(self, n_features=2 ** 14):
+        """
+        Initialize the vectorizer
+
+        Args:
+            n_features: Number of hash buckets (embedding dimension)
+        """
+        self.n_features = n_features
+        self.idf = np.ones(n_features, dtype=np.float32)
+
+    def _features(self, text):
+        tokens = tokenize(text)
+        features = list(tokens)
+        features.extend(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+        for token in tokens:
+            padded = f"<{token}>"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def _counts(self, texts):
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                matrix[row, zlib.crc32(feature.encode()) % self.n_features] += 1.0
+        # Sublinear term frequency keeps long sections from dominating
+        np.log1p(matrix, out=matrix)
+        return matrix
+
+    def fit(self, texts):
+        """
+        Learn IDF weights from the corpus
+
+        Args:
+            texts: List of section texts
+        """
+        counts = self._counts(texts)
+        df = np.count_nonzero(counts, axis=0).astype(np.float32)
+        self.idf = np.log((1.0 + len(texts)) / (1.0 + df)) + 1.0
+
+    def encode(self, texts):
+        """
+        Embed texts into L2-normalized vectors
+
+        Args:
+            texts: List of strings
+
+        Returns:
+            float32 array of shape (len(texts), n_features)
+        """
+        matrix = self._counts(texts) * self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SentenceTransformerEmbedder:
+    """Local CPU embedding model via sentence-transformers"""
+
+    def __init__(self, model_name=DEFAULT_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def fit(self, texts):
+        """Pretrained model, nothing to learn"""
+
+    def encode(self, texts):
+        """Embed texts into L2-normalized vectors"""
+        return np.asarray(
+            self.model.encode(texts, normalize_embeddings=True, show_progress_bar=False),
+            dtype=np.float32,
+        )
+
+
+def create_embedder(backend="hashed"):
+    """
+    Create an embedding backend
+
+    Args:
+        backend: 'hashed', 'sentence-transformers' or 'auto'. 'auto' uses
+                 sentence-transformers when installed (downloading the model
+                 on first use), otherwise hashed TF-IDF.
+
+    Returns:
+        Embedder instance
+    """
+    if backend in ("auto", "sentence-transformers"):
+        try:
+            return SentenceTransformerEmbedder()
+        except Exception as e:
+            if backend == "sentence-transformers":
+                raise
+            print(f"⚠️ sentence-transformers unavailable ({e}), using hashed TF-IDF")
+    return HashedTfidfEmbedder()
+
+
+class SemanticIndex:
+    """Heading-level section embeddings with vectorized cosine search"""
+
+    def __init__(self, embedder=None, cache_dir=None):
+        """
+        Initialize the semantic index
+
+        Args:
+            embedder: Embedding backend (default: create_embedder(EMBEDDING_BACKEND))
+            cache_dir: Directory for the persisted embedding matrix
+        """
+        self.embedder = embedder or create_embedder(EMBEDDING_BACKEND)
+        self.cache_dir = cache_dir or get_cache_dir("knowledge")
+        self.sections = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.fingerprint = None
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, documents):
+        digest = hashlib.sha256(self.embedder.name.encode())
+        for filename in sorted(documents):
+            digest.update(filename.encode())
+            digest.update(documents[filename].encode())
+        return digest.hexdigest()
+
+    def _cache_path(self):
+        safe_name = self.embedder.name.replace("/", "_")
+        return self.cache_dir / f"semantic_{safe_name}.npz"
+
+    def sync(self, documents):
+        """
+        Rebuild the embeddings if the knowledge files changed
+
+        A persisted matrix is reused when its fingerprint matches the current
+        files, so restarts skip re-embedding.
+
+        Args:
+            documents: Dict mapping filename to content
+
+        Returns:
+            True if the embeddings were recomputed
+        """
+        fingerprint = self._fingerprint(documents)
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return False
+
+            sections = []
+            for filename in sorted(documents):
+                for section in split_sections(documents[filename]):
+                    section["filename"] = filename
+                    sections.append(section)
+            texts = [f"{s['section']}\n{s['text']}" for s in sections]
+
+            cache_path = self._cache_path()
+            if cache_path.exists():
+                try:
+                    cached = np.load(cache_path)
+                    if str(cached["fingerprint"]) == fingerprint:
+                        self.matrix = cached["matrix"]
+                        if "idf" in cached.files and isinstance(self.embedder, HashedTfidfEmbedder):
+                            self.embedder.idf = cached["idf"]
+                        self.sections = sections
+                        self.fingerprint = fingerprint
+                        return False
+                except Exception as e:
+                    print(f"⚠️ Ignoring unreadable embedding cache: {e}")
+
+            self.embedder.fit(texts)
+            self.matrix = self.embedder.encode(texts) if texts else np.zeros((0, 0), dtype=np.float32)
+            self.sections = sections
+            self.fingerprint = fingerprint
+
+            extra = {"idf": self.embedder.idf} if isinstance(self.embedder, HashedTfidfEmbedder) else {}
+            try:
+                np.savez(cache_path, matrix=self.matrix, fingerprint=fingerprint, **extra)
+            except OSError as e:
+                print(f"⚠️ Could not persist embeddings: {e}")
+            return True
+
+    def search(self, query, top_k=3):
+        """
+        Find the sections most similar to a query
+
+        Args:
+            query: Free-text query
+            top_k: Maximum number of sections to return
+
+        Returns:
+            List of section dicts (with a 'score' key), best first
+        """
+        with self._lock:
+            if not self.sections:
+                return []
+            scores = self.matrix @ self.embedder.encode([query])[0]
+            k = min(top_k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [dict(self.sections[i], score=float(scores[i])) for i in top if scores[i] > 0]
+
+
+_semantic_index = None
+_semantic_lock = threading.Lock()
+
+
+def get_semantic_index():
+    """
+    Get the process-wide semantic index, synced with the knowledge store
+
+    Returns:
+        SemanticIndex reflecting the current knowledge files
+    """
+    global _semantic_index
+    from digital_twin_like.tools.knowledge_store import get_knowledge_store
+
+    with _semantic_lock:
+        if _semantic_index is None:
+            _semantic_index = SemanticIndex()
+        _semantic_index.sync(get_knowledge_store().load_all())
+    return _semantic_index
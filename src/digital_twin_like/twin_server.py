@@ -0,0 +1,492 @@
+"""
+Multi-session HTTP server for the digital twin
+Many clients hold conversations concurrently; all of them share one Whisper
+model (with batched transcription), one knowledge index and one response
+cache, while a fixed pool of conversation crews bounds how many LLM turns run
+at once. Audio is transcribed before a crew is taken from the pool, so
+transcriptions never hold an LLM slot and can fill whole batches. Sessions idle
+for longer than the session TTL are closed.
+
+Endpoints (JSON unless noted):
+    POST   /sessions                    -> {"session_id"}
+    POST   /sessions/<id>/text          {"text"} -> {"response", "timings"}
+    POST   /sessions/<id>/audio         WAV body -> {"transcript", "response", "timings"}
+    DELETE /sessions/<id>
+    GET    /stats
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from digital_twin_like.conversation_memory import ConversationMemory
+from digital_twin_like.model_registry import WHISPER_BACKENDS
+
+
+class ServerError(Exception):
+    """Request error reported to the client with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile
+
+    Args:
+        values: Sequence of numbers
+        fraction: Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        The percentile, or None for an empty sequence
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class Session:
+    """One client conversation; its requests are handled strictly in order"""
+
+    def __init__(self, session_id, max_queue, memory_tokens=800):
+        self.session_id = session_id
+        self.requests = queue.Queue(maxsize=max_queue)
+        self.scheduled = False
+        self.lock = threading.Lock()
+        self.created = time.time()
+        self.last_active = self.created
+        self.turns = 0
+        self.memory = ConversationMemory(max_tokens=memory_tokens)
+
+
+class TwinServer:
+    """Routes session requests onto a bounded pool of conversation workers"""
+
+    def __init__(self, workers=4, whisper_model="base", max_queue=8, max_sessions=256,
+                 batch_size=8, batch_wait=0.02, use_response_cache=True, request_timeout=120.0,
+                 whisper_backend="torch", whisper_threads=None, fast_path=False,
+                 memory_tokens=800, session_ttl=1800.0, twin_factory=None, transcriber=None):
+        """
+        Initialize the server core (no sockets are opened here)
+
+        Args:
+            workers: Conversation turns processed concurrently (one crew each)
+            whisper_model: Whisper model size shared by every session
+            max_queue: Pending requests allowed per session before 429
+            max_sessions: Open sessions allowed before 503
+            batch_size: Most concurrent transcriptions decoded together
+            batch_wait: Seconds a transcription waits for others to batch with
+            use_response_cache: Reuse answers to repeated questions
+            request_timeout: Seconds a request may wait for its result
+            whisper_backend: Whisper inference backend ('torch', 'int8', 'faster-whisper')
+            whisper_threads: CPU threads for Whisper inference (None: one per core)
+            fast_path: Answer confidently retrievable questions in a single LLM call
+            memory_tokens: Token budget of each session's conversation history
+            session_ttl: Seconds without requests after which a session is
+                         closed (checked when sessions are created)
+            twin_factory: Callable(response_cache) creating one conversation
+                          twin (default: a VoiceDigitalTwin per worker)
+            transcriber: Shared transcriber (default: a BatchTranscriber)
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_sessions = max_sessions
+        self.request_timeout = request_timeout
+        self.whisper_threads = whisper_threads
+        self.memory_tokens = memory_tokens
+        self.session_ttl = session_ttl
+
+        self.sessions = {}
+        self._sessions_lock = threading.Lock()
+        # Session drains only wait on transcripts and twins, so there can be
+        # more of them than twins; the twin pool bounds concurrent LLM turns
+        self._executor = ThreadPoolExecutor(max_workers=workers + batch_size,
+                                            thread_name_prefix="twin-worker")
+        # Enough concurrent callers for the batch transcriber to fill a batch
+        self._transcribe_executor = ThreadPoolExecutor(max_workers=batch_size,
+                                                       thread_name_prefix="twin-stt")
+
+        if twin_factory is None:
+            from digital_twin_like.voice_agent import VoiceDigitalTwin
+
+            def twin_factory(response_cache):
+                return VoiceDigitalTwin(whisper_model=whisper_model, warm_up_stt=False,
+                                        use_response_cache=use_response_cache,
+                                        response_cache=response_cache,
+                                        preload_crew=True, whisper_backend=whisper_backend,
+                                        whisper_threads=whisper_threads,
+                                        fast_path=fast_path, conversation_memory=False)
+
+        # One crew per worker: kickoff is not re-entrant. Whisper, the knowledge
+        # store/index and the knowledge tools are process-wide singletons, and
+        # the workers share the first one's response cache so hits are pooled.
+        self._twins = queue.Queue()
+        self.response_cache = None
+        for _ in range(workers):
+            twin = twin_factory(self.response_cache)
+            self.response_cache = twin.response_cache
+            self._twins.put(twin)
+        if transcriber is None:
+            from digital_twin_like.batch_transcriber import BatchTranscriber
+
+            transcriber = BatchTranscriber(whisper_model, max_batch_size=batch_size,
+                                           max_wait=batch_wait, backend=whisper_backend)
+        self.transcriber = transcriber
+
+        self._stats_lock = threading.Lock()
+        self._latencies = {"text": deque(maxlen=10000), "audio": deque(maxlen=10000)}
+        self._counts = {"requests": 0, "errors": 0, "rejected": 0, "llm_calls": 0,
+                        "fast_path_turns": 0, "sessions_expired": 0}
+        self.started = time.time()
+
+    def warm_up(self):
+        """Load and warm up the shared Whisper model and knowledge index"""
+        from digital_twin_like.model_registry import get_model_registry
+        from digital_twin_like.tools.knowledge_index import get_knowledge_index
+
+        get_knowledge_index()
+        get_model_registry().preload(self.transcriber.model_size, warm_up=True, background=False,
+                                     backend=self.transcriber.backend, threads=self.whisper_threads)
+
+    # Sessions
+
+    def create_session(self):
+        with self._sessions_lock:
+            if len(self.sessions) >= self.max_sessions:
+                self._expire_idle_sessions()
+            if len(self.sessions) >= self.max_sessions:
+                raise ServerError(503, "too many open sessions")
+            session = Session(uuid.uuid4().hex, self.max_queue, self.memory_tokens)
+            self.sessions[session.session_id] = session
+        return session
+
+    def get_session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise ServerError(404, f"unknown session {session_id}")
+        return session
+
+    def _expire_idle_sessions(self):
+        """Close sessions idle for longer than session_ttl (caller holds _sessions_lock)"""
+        if self.session_ttl is None:
+            return
+        cutoff = time.time() - self.session_ttl
+        expired = [session_id for session_id, session in self.sessions.items()
+                   if session.last_active < cutoff and not session.scheduled
+                   and session.requests.empty()]
+        for session_id in expired:
+            del self.sessions[session_id]
+        if expired:
+            with self._stats_lock:
+                self._counts["sessions_expired"] += len(expired)
+
+    def expire_idle_sessions(self):
+        """Close every session idle for longer than session_ttl"""
+        with self._sessions_lock:
+            self._expire_idle_sessions()
+
+    def close_session(self, session_id):
+        with self._sessions_lock:
+            if self.sessions.pop(session_id, None) is None:
+                raise ServerError(404, f"unknown session {session_id}")
+
+    # Request processing
+
+    def submit(self, session, kind, payload):
+        """
+        Queue a request on a session and schedule the session on the worker pool
+
+        Returns:
+            Future resolving to the result dict
+        """
+        future = Future()
+        queued_at = time.perf_counter()
+        if kind == "audio":
+            # Transcription does not depend on earlier turns, so it starts right
+            # away; only the answers are produced in session order
+            payload = self._transcribe_executor.submit(self._transcribe, *payload)
+        try:
+            session.requests.put_nowait((kind, payload, future, queued_at))
+        except queue.Full:
+            if kind == "audio":
+                payload.cancel()
+            with self._stats_lock:
+                self._counts["rejected"] += 1
+            raise ServerError(429, "too many pending requests for this session")
+
+        session.last_active = time.time()
+        with session.lock:
+            if not session.scheduled:
+                session.scheduled = True
+                self._executor.submit(self._drain, session)
+        return future
+
+    def _drain(self, session):
+        """Process a session's queued requests in order on one worker"""
+        while True:
+            with session.lock:
+                try:
+                    kind, payload, future, queued_at = session.requests.get_nowait()
+                except queue.Empty:
+                    session.scheduled = False
+                    return
+
+            try:
+                result = self._process(session, kind, payload, queued_at)
+            except Exception as e:
+                with self._stats_lock:
+                    self._counts["errors"] += 1
+                future.set_exception(e)
+            else:
+                session.turns += 1
+                session.last_active = time.time()
+                future.set_result(result)
+
+    def _transcribe(self, samples, sample_rate):
+        """Transcribe on the transcription pool; returns (text, seconds)"""
+        start = time.perf_counter()
+        text = self.transcriber.transcribe(samples, sample_rate)
+        return text, time.perf_counter() - start
+
+    def _process(self, session, kind, payload, queued_at):
+        timings = {"queue_s": time.perf_counter() - queued_at}
+        result = {}
+
+        text = payload
+        if kind == "audio":
+            # No twin is held while the transcript is pending
+            text, timings["transcribe_s"] = payload.result()
+            result["transcript"] = text
+
+        if text:
+            wait_start = time.perf_counter()
+            twin = self._twins.get()
+            llm_start = time.perf_counter()
+            timings["twin_wait_s"] = llm_start - wait_start
+            try:
+                result["response"] = twin.respond_to_text(text, memory=session.memory)
+            finally:
+                self._twins.put(twin)
+            timings["respond_s"] = time.perf_counter() - llm_start
+            turn = twin.last_turn_timings
+            timings["llm_calls"] = turn.get("llm_calls", 0)
+            with self._stats_lock:
+                self._counts["llm_calls"] += timings["llm_calls"]
+                self._counts["fast_path_turns"] += turn.get("path") == "fast"
+        else:
+            result["response"] = ""
+
+        timings["total_s"] = time.perf_counter() - queued_at
+        result["timings"] = timings
+        with self._stats_lock:
+            self._counts["requests"] += 1
+            self._latencies[kind].append(timings["total_s"])
+        return result
+
+    def wait(self, future):
+        try:
+            return future.result(timeout=self.request_timeout)
+        except FutureTimeoutError:
+            raise ServerError(504, "request timed out")
+
+    def handle(self, method, path, body=b"", content_type=""):
+        """
+        Route one HTTP request
+
+        Args:
+            method: HTTP method
+            path: Request path
+            body: Raw request body
+            content_type: Content-Type header
+
+        Returns:
+            Tuple of (status, JSON-serializable dict)
+        """
+        parts = [p for p in urlparse(path).path.split("/") if p]
+
+        if method == "GET" and parts == ["stats"]:
+            return 200, self.stats()
+        if method == "POST" and parts == ["sessions"]:
+            return 201, {"session_id": self.create_session().session_id}
+
+        if len(parts) >= 2 and parts[0] == "sessions":
+            if method == "DELETE" and len(parts) == 2:
+                self.close_session(parts[1])
+                return 200, {"closed": parts[1]}
+
+            if method == "POST" and len(parts) == 3:
+                session = self.get_session(parts[1])
+                if parts[2] == "text":
+                    try:
+                        text = json.loads(body or b"{}").get("text", "").strip()
+                    except (ValueError, AttributeError):
+                        raise ServerError(400, "expected a JSON body with a 'text' field")
+                    if not text:
+                        raise ServerError(400, "empty text")
+                    return 200, self.wait(self.submit(session, "text", text))
+
+                if parts[2] == "audio":
+                    from digital_twin_like.audio_codec import decode_audio
+
+                    if not body:
+                        raise ServerError(400, "empty audio body")
+                    ext = "mp3" if "mpeg" in content_type else "wav"
+                    try:
+                        samples, sample_rate = decode_audio(body, ext)
+                    except Exception as e:
+                        raise ServerError(400, f"could not decode audio: {e}")
+                    return 200, self.wait(self.submit(session, "audio", (samples, sample_rate)))
+
+        raise ServerError(404, f"no route for {method} {path}")
+
+    def stats(self):
+        """
+        Get server statistics
+
+        Returns:
+            Dict with counters, latency percentiles, queue depths and batching stats
+        """
+        from digital_twin_like.tools.knowledge_sections import usage_stats
+
+        with self._stats_lock:
+            latencies = {kind: list(values) for kind, values in self._latencies.items()}
+            counts = dict(self._counts)
+        sessions = list(self.sessions.values())
+        return {
+            "uptime_s": time.time() - self.started,
+            "workers": self.workers,
+            "sessions": len(sessions),
+            "queued_requests": sum(s.requests.qsize() for s in sessions),
+            **counts,
+            "latency_s": {
+                kind: {
+                    "count": len(values),
+                    "p50": percentile(values, 0.50),
+                    "p95": percentile(values, 0.95),
+                    "p99": percentile(values, 0.99),
+                }
+                for kind, values in latencies.items()
+            },
+            "transcription": self.transcriber.stats(),
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "knowledge_tool_tokens": usage_stats(),
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._transcribe_executor.shutdown(wait=False, cancel_futures=True)
+        self.transcriber.close()
+
+
+class TwinRequestHandler(BaseHTTPRequestHandler):
+    """Thin HTTP adapter over TwinServer.handle()"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients reuse connections
+
+    def _dispatch(self, method):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        try:
+            status, payload = self.server.twin.handle(method, self.path, body,
+                                                      self.headers.get("Content-Type", ""))
+        except ServerError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": str(e)}
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_http_server(twin, host="127.0.0.1", port=8765):
+    """
+    Bind an HTTP server to a TwinServer
+
+    Args:
+        twin: TwinServer instance
+        host: Interface to listen on
+        port: Port to listen on (0 picks a free port)
+
+    Returns:
+        ThreadingHTTPServer (call serve_forever() to run it)
+    """
+    server = ThreadingHTTPServer((host, port), TwinRequestHandler)
+    server.daemon_threads = True
+    server.twin = twin
+    return server
+
+
+def main(argv=None):
+    """Entry point for `voice_twin --serve`"""
+    parser = argparse.ArgumentParser(prog="voice_twin --serve",
+                                     description="Serve the digital twin to many concurrent sessions")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent conversation turns")
+    parser.add_argument("--whisper-model", default="base")
+    parser.add_argument("--whisper-backend", default="torch",
+                        choices=WHISPER_BACKENDS,
+                        help="Whisper inference backend (int8/faster-whisper: quantized CPU)")
+    parser.add_argument("--whisper-threads", type=int, default=None,
+                        help="CPU threads for Whisper inference")
+    parser.add_argument("--max-queue", type=int, default=8, help="Pending requests per session")
+    parser.add_argument("--batch-size", type=int, default=8, help="Max transcriptions per batch")
+    parser.add_argument("--batch-wait", type=float, default=0.02, help="Batching window in seconds")
+    parser.add_argument("--no-response-cache", action="store_true")
+    parser.add_argument("--memory-tokens", type=int, default=800,
+                        help="Token budget of each session's conversation history")
+    parser.add_argument("--session-ttl", type=float, default=1800.0,
+                        help="Seconds without requests before a session is closed")
+    parser.add_argument("--fast-path", action="store_true",
+                        help="Answer from retrieved knowledge in one LLM call when confident")
+    args = parser.parse_args(argv)
+
+    print("\n=== Starting Digital Twin Server ===")
+    twin = TwinServer(workers=args.workers, whisper_model=args.whisper_model,
+                      max_queue=args.max_queue, batch_size=args.batch_size,
+                      batch_wait=args.batch_wait, use_response_cache=not args.no_response_cache,
+                      whisper_backend=args.whisper_backend, whisper_threads=args.whisper_threads,
+                      fast_path=args.fast_path, memory_tokens=args.memory_tokens,
+                      session_ttl=args.session_ttl)
+    twin.warm_up()
+    server = create_http_server(twin, args.host, args.port)
+    print(f"\n✓ Serving on http://{args.host}:{server.server_port} "
+          f"({args.workers} workers, Whisper {args.whisper_model}/{args.whisper_backend})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\nShutting down...")
+    finally:
+        server.server_close()
+        twin.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Voice activity detection and end-of-speech recording
+Streams audio blocks from a microphone (or a WAV file in tests) and stops
+recording shortly after the speaker goes quiet
+"""
+import queue
+import time
+
+import numpy as np
+import soundfile as sf
+
+
+class EnergyVAD:
+    """Frame-level speech detector based on energy and zero-crossing rate"""
+
+    def __init__(self, sample_rate=16000, frame_duration=0.03, energy_ratio=3.0,
+                 min_energy=1e-4, max_zero_crossing_rate=0.35, max_noise_floor=0.01):
+        """
+        Initialize the detector
+
+        Args:
+            sample_rate: Sample rate of the audio
+            frame_duration: Analysis frame length in seconds
+            energy_ratio: A frame is speech when its RMS energy exceeds the
+                          estimated noise floor by this factor
+            min_energy: Absolute RMS floor below which a frame is never speech
+            max_zero_crossing_rate: Frames crossing zero more often than this
+                                    (hiss, fan noise) are not treated as speech
+            max_noise_floor: Cap on the initial noise floor estimate, so a
+                             recording that starts mid-speech does not take
+                             the speech level as its noise floor
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, int(sample_rate * frame_duration))
+        self.energy_ratio = energy_ratio
+        self.min_energy = min_energy
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.max_noise_floor = max_noise_floor
+        self.noise_floor = None
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+    def reset(self):
+        """Forget the noise floor estimate and any buffered samples (e.g. for a new recording)"""
+        self.noise_floor = None
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+    def frames(self, audio):
+        """
+        Split audio into whole analysis frames
+
+        Args:
+            audio: 1-D float array
+
+        Returns:
+            2-D array of shape (n_frames, frame_length)
+        """
+        n_frames = len(audio) // self.frame_length
+        return audio[:n_frames * self.frame_length].reshape(n_frames, self.frame_length)
+
+    def is_speech(self, audio):
+        """
+        Classify every whole frame of a complete recording
+
+        Args:
+            audio: 1-D float array
+
+        Returns:
+            Boolean array with one entry per frame
+        """
+        return self._classify(self.frames(audio))
+
+    def feed(self, block):
+        """
+        Classify a streamed block, carrying samples that do not fill a frame into the next one
+
+        Args:
+            block: 1-D float array
+
+        Returns:
+            Boolean array with one entry per frame completed by this block
+        """
+        audio = np.concatenate([self._remainder, np.asarray(block, dtype=np.float32)])
+        n_samples = len(audio) // self.frame_length * self.frame_length
+        self._remainder = audio[n_samples:]
+        return self._classify(self.frames(audio[:n_samples]))
+
+    def _classify(self, frames):
+        if not len(frames):
+            return np.zeros(0, dtype=bool)
+
+        energy = np.sqrt(np.mean(frames ** 2, axis=1))
+        signs = np.signbit(frames)
+        zero_crossing_rate = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        if self.noise_floor is None:
+            self.noise_floor = min(max(float(np.percentile(energy, 10)), self.min_energy),
+                                   self.max_noise_floor)
+
+        speech = ((energy > self.noise_floor * self.energy_ratio)
+                  & (energy > self.min_energy)
+                  & (zero_crossing_rate < self.max_zero_crossing_rate))
+
+        # Track the noise floor slowly on non-speech frames
+        quiet = energy[~speech]
+        if len(quiet):
+            self.noise_floor = max(0.95 * self.noise_floor + 0.05 * float(np.mean(quiet)),
+                                   self.min_energy)
+        return speech
+
+
+class MicrophoneSource:
+    """Microphone input delivered as fixed-size blocks"""
+
+    def __init__(self, sample_rate=16000, block_duration=0.1):
+        self.sample_rate = sample_rate
+        self.block_size = int(sample_rate * block_duration)
+        self._blocks = queue.Queue()
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        self._blocks.put(indata[:, 0].copy())
+
+    def __enter__(self):
+        import sounddevice as sd
+
+        self._stream = sd.InputStream(samplerate=self.sample_rate, channels=1,
+                                      dtype=np.float32, blocksize=self.block_size,
+                                      callback=self._callback)
+        self._stream.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stream.stop()
+        self._stream.close()
+
+    def read(self):
+        """Return the next block of samples (blocks until available)"""
+        return self._blocks.get()
+
+
+class WavFileSource:
+    """WAV file input delivered as blocks, optionally paced like a live microphone"""
+
+    def __init__(self, path, block_duration=0.1, realtime=False):
+        """
+        Initialize the file source
+
+        Args:
+            path: Path to a WAV file (mono or multi-channel)
+            block_duration: Block length in seconds
+            realtime: Sleep between blocks so they arrive at speaking pace
+        """
+        from digital_twin_like.speech_to_text import prepare_audio
+
+        audio, file_rate = sf.read(path, dtype="float32")
+        self.audio = prepare_audio(audio, file_rate)
+        self.sample_rate = 16000
+        self.block_size = int(self.sample_rate * block_duration)
+        self.realtime = realtime
+        self._position = 0
+        self._next_time = None
+
+    def __enter__(self):
+        self._position = 0
+        self._next_time = time.monotonic()
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def read(self):
+        """Return the next block of samples, or None at the end of the file"""
+        if self._position >= len(self.audio):
+            return None
+        if self.realtime:
+            self._next_time += self.block_size / self.sample_rate
+            time.sleep(max(0.0, self._next_time - time.monotonic()))
+        block = self.audio[self._position:self._position + self.block_size]
+        self._position += self.block_size
+        return block
+
+
+def trim_silence(audio, vad, padding=0.1):
+    """
+    Remove leading and trailing non-speech from a recording
+
+    Args:
+        audio: 1-D float array
+        vad: EnergyVAD used to classify frames
+        padding: Seconds of audio kept around the detected speech
+
+    Returns:
+        Trimmed array (the input unchanged if no speech was found)
+    """
+    speech = np.flatnonzero(vad.is_speech(audio))
+    if not len(speech):
+        return audio
+    pad = int(padding * vad.sample_rate)
+    start = max(0, speech[0] * vad.frame_length - pad)
+    end = min(len(audio), (speech[-1] + 1) * vad.frame_length + pad)
+    return audio[start:end]
+
+
+class EndpointRecorder:
+    """Records until a configurable silence follows detected speech"""
+
+    def __init__(self, vad=None, silence_duration=0.8, max_duration=30.0,
+                 no_speech_timeout=8.0, min_speech_duration=0.2, pre_roll=0.3):
+        """
+        Initialize the recorder
+
+        Args:
+            vad: Speech detector (default EnergyVAD at 16 kHz)
+            silence_duration: Seconds of silence after speech that end the recording
+            max_duration: Hard cap on recording length in seconds
+            no_speech_timeout: Give up if nobody speaks within this many seconds
+            min_speech_duration: Speech shorter than this (clicks, coughs) is ignored
+            pre_roll: Seconds of audio kept before the detected speech start
+        """
+        self.vad = vad or EnergyVAD()
+        self.silence_duration = silence_duration
+        self.max_duration = max_duration
+        self.no_speech_timeout = no_speech_timeout
+        self.min_speech_duration = min_speech_duration
+        self.pre_roll = pre_roll
+
+    def record(self, source, on_block=None):
+        """
+        Record one utterance from a source
+
+        Args:
+            source: MicrophoneSource, WavFileSource or any object with read()
+                    inside a context manager
+            on_block: Optional callback receiving (block, in_speech) for every block
+
+        Returns:
+            1-D float32 array with leading/trailing silence trimmed (empty if
+            no speech was detected)
+        """
+        self.vad.reset()
+        frame_seconds = self.vad.frame_length / self.vad.sample_rate
+        blocks = []
+        total = 0.0
+        speech_run = 0.0
+        silence_run = 0.0
+        speech_started = False
+
+        with source:
+            while total < self.max_duration:
+                block = source.read()
+                if block is None:
+                    break
+                blocks.append(block)
+                total += len(block) / self.vad.sample_rate
+
+                for is_speech in self.vad.feed(block):
+                    if is_speech:
+                        speech_run += frame_seconds
+                        silence_run = 0.0
+                        if speech_run >= self.min_speech_duration:
+                            speech_started = True
+                    else:
+                        speech_run = 0.0
+                        silence_run += frame_seconds
+
+                if on_block is not None:
+                    on_block(block, speech_started and silence_run == 0.0)
+
+                if speech_started and silence_run >= self.silence_duration:
+                    break
+                if not speech_started and total >= self.no_speech_timeout:
+                    break
+
+        if not speech_started or not blocks:
+            return np.zeros(0, dtype=np.float32)
+
+        audio = np.concatenate(blocks)
+        return trim_silence(audio, self.vad, padding=self.pre_roll)
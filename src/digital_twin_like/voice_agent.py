@@ -2,10 +2,15 @@
 Voice-enabled digital twin agent
 Combines speech-to-text and text-to-speech with the CrewAI digital twin
 """
-from digital_twin_like.crew import DigitalTwinLike
-from digital_twin_like.speech_to_text import SpeechToText
-from digital_twin_like.text_to_speech import TextToSpeech
-from crewai import Agent, Task, Crew, Process
+from digital_twin_like.conversation_memory import ConversationMemory
+from digital_twin_like.fast_answer import MIN_COVERAGE, fast_path_messages
+from digital_twin_like.response_cache import ResponseCache, depends_on_context
+from digital_twin_like.model_registry import get_model_registry
+from digital_twin_like.startup_profile import get_startup_profiler
+from digital_twin_like.streaming_speech import FinalAnswerFilter, SentenceSplitter, StreamingSpeaker
+from digital_twin_like.tools.knowledge_sections import estimate_tokens, start_turn_usage, turn_usage
+import threading
+import time
 import warnings
 import os
 from dotenv import load_dotenv
@@ -19,95 +24,368 @@ os.environ["CREWAI_TELEMETRY_OPT_OUT"] = "true"  # Opt out of telemetry
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
+# Response cache entry name for the full crew introduction run
+INTRODUCTION_CACHE_KEY = "introduction"
+
+# Conversation agent persona; kept here so the response cache can be
+# fingerprinted without importing CrewAI
+CONVERSATION_ROLE = "Conversational Digital Twin of Tim Cao"
+CONVERSATION_GOAL = "Answer questions about Tim Cao authentically, representing his expertise and personality"
+CONVERSATION_BACKSTORY = """You are the digital representation of Wuxinhao (Tim) Cao, a graduate student and researcher
+            at Harvard University specializing in computational biology and spatial transcriptomics.
+
+            You have access to a comprehensive knowledge base through these tools:
+            - "Get Tim's Biography" for educational background and achievements
+            - "Get Tim's Technical Skills" for programming and technical capabilities
+            - "Get Tim's Research Background" for research projects and publications
+            - "Search Knowledge Base" to find specific information
+
+            Called without sections, the biography, skills and research tools return the whole file,
+            or an outline of section ids when the file is too large for one response; only in that case
+            call the tool again with the sections the question needs.
+
+            Use these tools to retrieve accurate information when answering questions. Keep responses conversational,
+            informative, and authentic to Tim's voice. Answer questions naturally, as if Tim himself is speaking."""
+
+# Added to the backstory when the embedding-based search tool is enabled
+SEMANTIC_SEARCH_BACKSTORY = """
+
+            When a question is phrased differently from the knowledge base, use
+            "Semantic Search Knowledge Base" to find the sections closest in meaning."""
+
 
 class VoiceDigitalTwin:
     """Voice-enabled digital twin that can listen and speak"""
 
-    def __init__(self, whisper_model="base"):
+    def __init__(self, whisper_model="base", use_response_cache=True, response_cache_db=None,
+                 warm_up_stt=True, streaming_stt=False, preload_crew=False,
+                 whisper_backend="torch", whisper_threads=None, fast_path=False,
+                 fast_path_min_confidence=None, conversation_memory=True, memory_tokens=800,
+                 response_cache=None, semantic_search=None):
         """
         Initialize voice-enabled digital twin
 
+        Speech-to-text, text-to-speech and the CrewAI pipeline are created on
+        first use, so a mode only pays for the components it needs.
+
         Args:
             whisper_model: Size of Whisper model for STT (tiny, base, small, medium, large)
+            use_response_cache: Reuse answers to repeated questions instead of calling the LLM
+            response_cache_db: Optional SQLite path so cached answers survive restarts
+                               (defaults to $DIGITAL_TWIN_RESPONSE_CACHE_DB if set)
+            warm_up_stt: Load and warm up Whisper on a background thread right away
+            streaming_stt: Transcribe while the user is still speaking (VAD recording only)
+            preload_crew: Import CrewAI and build the conversation crew on a
+                          background thread (e.g. while the user types or speaks)
+            whisper_backend: Whisper inference backend ('torch', 'int8', 'faster-whisper')
+            whisper_threads: CPU threads for Whisper inference (None: one per core)
+            fast_path: Answer from up-front retrieved knowledge in a single LLM
+                       call, using the tool-calling agent only when retrieval
+                       confidence is low
+            fast_path_min_confidence: Retrieval confidence (0-1) needed for the
+                                      fast path (default: fast_answer.MIN_COVERAGE)
+            conversation_memory: Remember earlier turns so follow-up questions work
+            memory_tokens: Token budget for the conversation history in each prompt
+            response_cache: ResponseCache to share with other twins (e.g. a
+                            server's worker pool) instead of creating one
+            semantic_search: Give the agent the embedding-based search tool
+                             (default: $DIGITAL_TWIN_SEMANTIC_SEARCH is set to 1)
         """
         print("\n=== Initializing Voice-Enabled Digital Twin ===")
 
-        # Initialize speech components
-        print("\n1. Loading Speech-to-Text (Whisper)...")
-        self.stt = SpeechToText(model_size=whisper_model)
+        self.whisper_model = whisper_model
+        self.whisper_backend = whisper_backend
+        self.whisper_threads = whisper_threads
+        self.streaming_stt = streaming_stt
+        self.fast_path = fast_path
+        self.fast_path_min_confidence = (MIN_COVERAGE if fast_path_min_confidence is None
+                                         else fast_path_min_confidence)
+        self.memory = ConversationMemory(max_tokens=memory_tokens) if conversation_memory else None
+        if semantic_search is None:
+            semantic_search = os.getenv("DIGITAL_TWIN_SEMANTIC_SEARCH", "0") not in ("", "0")
+        self.semantic_search = semantic_search
+        self.backstory = CONVERSATION_BACKSTORY + (SEMANTIC_SEARCH_BACKSTORY if semantic_search else "")
+        self._components = {}
+        self._component_locks = {}
+        self._component_lock = threading.Lock()
+        self._crew_lock = threading.Lock()
+        self.pipeline_build_time = None
+        self.last_turn_timings = {}
+
+        # Streamed LLM tokens are routed to the active turn's sink, if any
+        self._stream_sink = None
+        self._answer_filter = FinalAnswerFilter()
+        self._direct_call = False  # fast path: no ReAct format to filter
+        self._llm_calls = 0
+
+        self.response_cache = response_cache if use_response_cache else None
+        if use_response_cache and response_cache is None:
+            with get_startup_profiler().phase("init response cache"):
+                self.response_cache = ResponseCache(
+                    db_path=response_cache_db or os.getenv("DIGITAL_TWIN_RESPONSE_CACHE_DB"),
+                    extra_fingerprint="\n".join([CONVERSATION_ROLE, CONVERSATION_GOAL,
+                                                  self.backstory]),
+                )
+
+        # Start loading Whisper early so it overlaps everything else
+        if warm_up_stt:
+            get_model_registry().preload(whisper_model, warm_up=True, background=True,
+                                         backend=whisper_backend, threads=whisper_threads)
+        if preload_crew:
+            threading.Thread(target=lambda: self.conversation_crew, name="crew-preload",
+                             daemon=True).start()
 
-        print("\n2. Loading Text-to-Speech (gTTS)...")
-        self.tts = TextToSpeech()
-
-        print("\n3. Loading Digital Twin (CrewAI)...")
-        self.digital_twin = DigitalTwinLike()
+        print("\n✓ Voice-Enabled Digital Twin Ready!\n")
 
-        # Import knowledge tools
-        from digital_twin_like.tools.knowledge_tool import KNOWLEDGE_TOOLS
+    def _component(self, name, factory):
+        """Get a lazily constructed component, building it once on first use"""
+        component = self._components.get(name)
+        if component is None:
+            # One lock per component, so a background crew build does not block TTS/STT
+            with self._component_lock:
+                lock = self._component_locks.setdefault(name, threading.Lock())
+            with lock:
+                component = self._components.get(name)
+                if component is None:
+                    with get_startup_profiler().phase(f"init {name}"):
+                        component = factory()
+                    self._components[name] = component
+        return component
+
+    @property
+    def tts(self):
+        """Text-to-speech engine (gTTS), created on first use"""
+        def create():
+            print("\n🔧 Loading Text-to-Speech (gTTS)...")
+            from digital_twin_like.text_to_speech import TextToSpeech
+            return TextToSpeech()
+        return self._component("tts", create)
+
+    @property
+    def stt(self):
+        """Speech-to-text engine, created on first use (joins a running background load)"""
+        def create():
+            print("\n🔧 Loading Speech-to-Text (Whisper)...")
+            from digital_twin_like.speech_to_text import SpeechToText
+            return SpeechToText(model_size=self.whisper_model, backend=self.whisper_backend,
+                                threads=self.whisper_threads)
+        return self._component("stt", create)
+
+    @property
+    def digital_twin(self):
+        """Original introduction crew, created on first use"""
+        def create():
+            print("\n🔧 Loading Digital Twin (CrewAI)...")
+            with get_startup_profiler().phase("import crewai"):
+                from digital_twin_like.crew import DigitalTwinLike
+            return DigitalTwinLike()
+        return self._component("digital_twin", create)
+
+    @property
+    def conversation_agent(self):
+        """Conversational Q&A agent, created on first use"""
+        def create():
+            with get_startup_profiler().phase("import crewai"):
+                from crewai import Agent
+            # Import knowledge tools
+            from digital_twin_like.tools.knowledge_tool import KNOWLEDGE_TOOLS, SEMANTIC_KNOWLEDGE_TOOLS
+
+            # Create a conversational agent for Q&A
+            agent = Agent(
+                role=CONVERSATION_ROLE,
+                goal=CONVERSATION_GOAL,
+                backstory=self.backstory,
+                verbose=True,
+                allow_delegation=False,
+                tools=SEMANTIC_KNOWLEDGE_TOOLS if self.semantic_search else KNOWLEDGE_TOOLS
+            )
+
+            from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+            from crewai.events.types.llm_events import LLMCallStartedEvent
+            crewai_event_bus.register_handler(LLMCallStartedEvent, self._on_llm_call_started)
+            crewai_event_bus.register_handler(LLMStreamChunkEvent, self._on_llm_chunk)
+            return agent
+        return self._component("conversation_agent", create)
+
+    @property
+    def conversation_crew(self):
+        """Conversation pipeline, built once on first use; each turn only changes the input"""
+        def create():
+            print("\n🔧 Loading conversation crew (CrewAI)...")
+            build_start = time.perf_counter()
+            crew = self._build_conversation_crew()
+            self.pipeline_build_time = time.perf_counter() - build_start
+            return crew
+        return self._component("conversation_crew", create)
+
+    def _build_conversation_crew(self):
+        """
+        Create the single-task crew used for every conversational turn
 
-        # Create a conversational agent for Q&A
-        self.conversation_agent = Agent(
-            role="Conversational Digital Twin of Tim Cao",
-            goal="Answer questions about Tim Cao authentically, representing his expertise and personality",
-            backstory="""You are the digital representation of Wuxinhao (Tim) Cao, a graduate student and researcher
-            at Harvard University specializing in computational biology and spatial transcriptomics.
+        The task description is a template; the user's input is interpolated
+        by CrewAI on each kickoff.
 
-            You have access to a comprehensive knowledge base through these tools:
-            - "Get Tim's Biography" for educational background and achievements
-            - "Get Tim's Technical Skills" for programming and technical capabilities
-            - "Get Tim's Research Background" for research projects and publications
-            - "Search Knowledge Base" to find specific information
+        Returns:
+            Crew wrapping the conversation agent
+        """
+        from crewai import Task, Crew, Process
 
-            Use these tools to retrieve accurate information when answering questions. Keep responses conversational,
-            informative, and authentic to Tim's voice. Answer questions naturally, as if Tim himself is speaking.""",
-            verbose=True,
-            allow_delegation=False,
-            tools=KNOWLEDGE_TOOLS
+        response_task = Task(
+            description="{conversation_context}Respond to this question or prompt conversationally: {user_input}",
+            expected_output="A natural, conversational response that authentically represents Tim Cao",
+            agent=self.conversation_agent
         )
 
-        print("\n✓ Voice-Enabled Digital Twin Ready!\n")
+        return Crew(
+            agents=[self.conversation_agent],
+            tasks=[response_task],
+            process=Process.sequential,
+            verbose=False,  # Less verbose for cleaner output
+            memory=False,   # Disable memory to avoid prompts
+            cache=False     # Disable cache for faster execution
+        )
 
-    def listen(self, duration=5):
+    def _is_conversation_event(self, source, event):
+        agent = self._components.get("conversation_agent")
+        if agent is None:
+            return False
+        # Agent calls carry the agent id; fast-path calls go straight to its LLM
+        return source is agent.llm or str(getattr(event, "agent_id", None)) == str(agent.id)
+
+    def _on_llm_call_started(self, source, event):
+        if not self._is_conversation_event(source, event):
+            return
+        self._llm_calls += 1
+        if self._stream_sink is not None:
+            self._answer_filter.reset()
+
+    def _on_llm_chunk(self, source, event):
+        if (self._stream_sink is None or event.tool_call
+                or not self._is_conversation_event(source, event)):
+            return
+        if self._direct_call:
+            self._stream_sink(event.chunk)
+            return
+        # Only the final answer is spoken, not the agent's thoughts and tool calls
+        text = self._answer_filter.feed(event.chunk)
+        if text:
+            self._stream_sink(text)
+
+    def listen(self, duration=None):
         """
         Listen to user's voice input
 
         Args:
-            duration: Recording duration in seconds
+            duration: Recording duration in seconds, or None to stop when the
+                      user stops speaking
 
         Returns:
             Transcribed text
         """
+        if duration is None and self.streaming_stt:
+            return self.stt.listen_and_transcribe_streaming()
         return self.stt.listen_and_transcribe(duration=duration)
 
-    def respond_to_text(self, user_input):
+    def respond_to_text(self, user_input, on_text=None, memory=None, cancelled=None):
         """
         Generate text response to user input using the digital twin
 
         Args:
             user_input: User's question or input text
+            on_text: Optional callback receiving the answer text incrementally
+                     as the LLM streams it
+            memory: ConversationMemory of the conversation this turn belongs to
+                    (default: the twin's own memory)
+            cancelled: Optional threading.Event set when the user interrupts
+                       the turn (barge-in); from then on no more text is
+                       streamed and the answer is not added to memory
 
         Returns:
             Digital twin's response text
         """
-        # Create a task for responding to the user's input
-        response_task = Task(
-            description=f"Respond to this question or prompt conversationally: {user_input}",
-            expected_output="A natural, conversational response that authentically represents Tim Cao",
-            agent=self.conversation_agent
-        )
-
-        # Create a crew with just the conversation agent
-        crew = Crew(
-            agents=[self.conversation_agent],
-            tasks=[response_task],
-            process=Process.sequential,
-            verbose=False,  # Less verbose for cleaner output
-            memory=False,   # Disable memory to avoid prompts
-            cache=False     # Disable cache for faster execution
-        )
-
-        # Get response
-        result = crew.kickoff()
+        memory = memory if memory is not None else self.memory
+        if on_text is not None and cancelled is not None:
+            stream_to = on_text
+
+            def on_text(text):
+                if not cancelled.is_set():
+                    stream_to(text)
+        history = memory.context() if memory is not None else ""
+
+        # Self-contained questions share one cache entry across turns and
+        # sessions; follow-ups are keyed on the history they refer to
+        cache_context = history if depends_on_context(user_input) else ""
+        if self.response_cache is not None:
+            cached = self.response_cache.get(user_input, cache_context)
+            if cached is not None:
+                stats = self.response_cache.stats()
+                print(f"💾 Cached response (hit rate {stats['hit_rate']:.0%})")
+                self.last_turn_timings = {"llm_s": 0.0, "pipeline_build_s": self.pipeline_build_time,
+                                         "cached": True}
+                if memory is not None:
+                    memory.add_turn(user_input, cached)
+                if on_text is not None:
+                    on_text(cached)
+                return cached
+
+        messages = None
+        if self.fast_path:
+            messages, retrieval = fast_path_messages(user_input, history,
+                                                     self.fast_path_min_confidence)
+            if messages is None:
+                print(f"🔎 Low retrieval confidence ({retrieval['confidence']:.2f}), using the agent")
+
+        # The fast path only needs the agent's LLM; the crew is built (once)
+        # for the first turn that goes through the agent
+        crew = self.conversation_crew if messages is None else None
+        # Reuse the persistent crew; kickoff is not re-entrant, so serialize turns
+        with self._crew_lock:
+            llm = self.conversation_agent.llm
+            was_streaming = getattr(llm, "stream", False)
+            if on_text is not None:
+                llm.stream = True
+                self._answer_filter.reset()
+                self._stream_sink = on_text
+
+            self._llm_calls = 0
+            self._direct_call = messages is not None
+            start_turn_usage()
+            try:
+                llm_start = time.perf_counter()
+                if messages is not None:
+                    # One LLM call: the knowledge is already in the prompt
+                    result = llm.call(messages)
+                else:
+                    result = crew.kickoff(inputs={"user_input": user_input,
+                                                  "conversation_context": history})
+                llm_time = time.perf_counter() - llm_start
+            finally:
+                self._stream_sink = None
+                self._direct_call = False
+                if on_text is not None:
+                    llm.stream = was_streaming
+            llm_calls = self._llm_calls
+            tool_usage = turn_usage()
+
+        path = "fast" if messages is not None else "agent"
+        self.last_turn_timings = {
+            "llm_s": llm_time,
+            "pipeline_build_s": self.pipeline_build_time,
+            "path": path,
+            "llm_calls": llm_calls,
+            "tool_tokens": tool_usage["returned_tokens"],
+            "tool_tokens_saved": tool_usage["saved_tokens"],
+            "tool_outline_calls": tool_usage["outline_calls"],
+            "memory_tokens": estimate_tokens(history),
+        }
+        build_note = (f" (pipeline built once in {self.pipeline_build_time * 1000:.0f} ms)"
+                      if self.pipeline_build_time is not None else "")
+        print(f"⏱️  Turn timing: LLM {llm_time:.2f} s over {llm_calls} call(s) via {path} path, "
+              f"history {self.last_turn_timings['memory_tokens']} tokens{build_note}")
+        if tool_usage["calls"]:
+            print(f"📉 Knowledge tools: {tool_usage['returned_tokens']} tokens over "
+                  f"{tool_usage['calls']} call(s), {tool_usage['saved_tokens']} saved by sectioning, "
+                  f"{tool_usage['outline_calls']} outline round trip(s)")
 
         # Extract text from result
         if hasattr(result, 'raw'):
@@ -115,6 +393,13 @@ class VoiceDigitalTwin:
         else:
             response_text = str(result)
 
+        if self.response_cache is not None:
+            self.response_cache.put(user_input, response_text, cache_context)
+        if cancelled is not None and cancelled.is_set():
+            print("✋ Interrupted answer left out of the conversation memory")
+        elif memory is not None:
+            memory.add_turn(user_input, response_text)
+
         return response_text
 
     def speak(self, text):
@@ -126,12 +411,52 @@ class VoiceDigitalTwin:
         """
         self.tts.speak(text)
 
-    def voice_interaction(self, recording_duration=5):
+    def respond_and_speak_streaming(self, user_input):
+        """
+        Generate a response and speak it while it is still being generated
+
+        LLM tokens are split into sentences as they arrive; each sentence is
+        synthesized on a worker thread and played in order, so speech starts
+        after the first sentence instead of after the whole answer.
+
+        Args:
+            user_input: User's question or input text
+
+        Returns:
+            Digital twin's response text
+        """
+        splitter = SentenceSplitter()
+        speaker = StreamingSpeaker(self.tts.synthesize_to_file, self.tts._play_audio).start()
+
+        def on_text(text):
+            for sentence in splitter.feed(text):
+                speaker.submit(sentence)
+
+        try:
+            response = self.respond_to_text(user_input, on_text=on_text)
+        finally:
+            for sentence in splitter.flush():
+                speaker.submit(sentence)
+            time_to_first_audio = speaker.finish()
+
+        # No final-answer chunks were streamed (e.g. the model ignored the format): speak it all now
+        if speaker.sentences == 0:
+            self.speak(response)
+
+        self.last_turn_timings["time_to_first_audio_s"] = time_to_first_audio
+        if time_to_first_audio is not None:
+            print(f"⏱️  Time to first audio: {time_to_first_audio:.2f} s "
+                  f"({speaker.sentences} sentences streamed)")
+        return response
+
+    def voice_interaction(self, recording_duration=None, streaming=False):
         """
         Complete voice interaction: listen, process, and respond
 
         Args:
-            recording_duration: Duration for recording user's voice in seconds
+            recording_duration: Duration for recording user's voice in seconds,
+                                or None to stop when the user stops speaking
+            streaming: Start speaking while the answer is still being generated
 
         Returns:
             Tuple of (user_input, response)
@@ -142,16 +467,23 @@ class VoiceDigitalTwin:
 
         # Listen to user
         user_input = self.listen(duration=recording_duration)
+        if not user_input:
+            print("\n👂 Didn't catch that - please try again.")
+            return user_input, ""
         print(f"\n👤 You said: {user_input}")
 
         # Generate response
         print("\n🤔 Thinking...")
-        response = self.respond_to_text(user_input)
-        print(f"\n🤖 Tim's Digital Twin: {response}")
+        if streaming:
+            response = self.respond_and_speak_streaming(user_input)
+            print(f"\n🤖 Tim's Digital Twin: {response}")
+        else:
+            response = self.respond_to_text(user_input)
+            print(f"\n🤖 Tim's Digital Twin: {response}")
 
-        # Speak response
-        print("\n🔊 Speaking response...")
-        self.speak(response)
+            # Speak response
+            print("\n🔊 Speaking response...")
+            self.speak(response)
 
         print("\n" + "="*60 + "\n")
 
@@ -164,14 +496,24 @@ class VoiceDigitalTwin:
         """
         print("\n=== Running Introduction with Voice ===")
 
-        # Run the original crew
-        result = self.digital_twin.crew().kickoff(inputs={})
+        # Replays reuse the cached text, so the audio cache also hits and
+        # playback starts without any synthesis
+        intro_text = None
+        if self.response_cache is not None:
+            intro_text = self.response_cache.get_crew_run(INTRODUCTION_CACHE_KEY)
 
-        # Extract and speak the result
-        if hasattr(result, 'raw'):
-            intro_text = result.raw
-        else:
-            intro_text = str(result)
+        if intro_text is None:
+            # Run the original crew
+            result = self.digital_twin.crew().kickoff(inputs={})
+
+            # Extract and speak the result
+            if hasattr(result, 'raw'):
+                intro_text = result.raw
+            else:
+                intro_text = str(result)
+
+            if self.response_cache is not None:
+                self.response_cache.put_crew_run(INTRODUCTION_CACHE_KEY, intro_text)
 
         print(f"\n📝 Introduction Text:\n{intro_text}")
         print("\n🔊 Speaking introduction...")
@@ -199,7 +541,8 @@ def run_voice_demo():
     if choice == "1":
         # Voice interaction mode
         print("\n📢 Voice Q&A Mode - Speak your question when prompted")
-        recording_time = int(input("Recording duration in seconds (default 5): ").strip() or "5")
+        answer = input("Recording duration in seconds (blank = stop when you pause): ").strip()
+        recording_time = int(answer) if answer else None
         voice_twin.voice_interaction(recording_duration=recording_time)
 
     elif choice == "2":
@@ -0,0 +1,335 @@
+"""
+Asynchronous voice conversation engine
+Listening, thinking, synthesis and playback run as asyncio stages connected by
+queues, so the microphone is re-armed while the previous answer is still being
+generated or played, and the user can interrupt playback by speaking (barge-in).
+Blocking work (recording, Whisper, the CrewAI turn, TTS) runs in executors.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from digital_twin_like.audio_playback import get_playback_engine, play_audio_bytes
+from digital_twin_like.streaming_speech import SentenceSplitter, split_sentences
+
+
+QUIT_WORDS = ('quit', 'exit', 'stop', 'goodbye')
+
+# Marks the end of a turn in the speech and playback queues
+END_OF_TURN = object()
+
+
+class VoiceSession:
+    """Runs an overlapped listen → think → synthesize → play loop around a VoiceDigitalTwin"""
+
+    def __init__(self, twin, tts=None, recording_duration=None, silence_duration=0.8,
+                 barge_in=False, synthesis_workers=2, quit_words=QUIT_WORDS):
+        """
+        Initialize the session
+
+        Args:
+            twin: VoiceDigitalTwin providing STT and the conversation crew
+            tts: Object with synthesize(text) -> (bytes, ext) (default: twin.tts)
+            recording_duration: Fixed recording length in seconds, or None to
+                                stop when the user pauses
+            silence_duration: Seconds of silence that end a VAD recording
+            barge_in: Stop playback and drop the answer as soon as the user
+                      starts speaking (needs headphones: on loudspeakers the
+                      twin's own voice triggers it)
+            synthesis_workers: Sentences synthesized ahead of playback
+            quit_words: Saying any of these ends the session
+        """
+        self.twin = twin
+        self.tts = tts
+        self.recording_duration = recording_duration
+        self.silence_duration = silence_duration
+        self.barge_in = barge_in
+        self.quit_words = quit_words
+
+        # Separate executors so a long LLM call never delays recording or playback
+        self._listen_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-listen")
+        self._stt_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-stt")
+        self._llm_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-llm")
+        self._tts_executor = ThreadPoolExecutor(max_workers=synthesis_workers,
+                                                thread_name_prefix="session-tts")
+        self._play_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-play")
+
+        self._engine = None
+        self._utterances = {}      # turn number -> playback cancel token
+        self._cancelled = {}       # turn number -> set when the user barges in
+        self._turn_done = None
+        self._speaking_turn = None
+        self._barged_turn = None
+        self._state_lock = threading.Lock()
+
+        self.turns = []
+
+    def run(self, max_turns=None):
+        """
+        Run the conversation until a quit word, Ctrl+C or max_turns
+
+        Args:
+            max_turns: Stop after this many user utterances
+
+        Returns:
+            List of per-turn metric dicts
+        """
+        try:
+            asyncio.run(self.run_async(max_turns))
+        finally:
+            self.close()
+        return self.turns
+
+    async def run_async(self, max_turns=None):
+        """Coroutine version of run()"""
+        self._engine = get_playback_engine()
+        if self.tts is None:
+            self.tts = self.twin.tts
+        # Make sure Whisper is ready before the first recording
+        await asyncio.get_running_loop().run_in_executor(self._stt_executor, lambda: self.twin.stt)
+
+        self._turn_done = asyncio.Event()
+        transcripts = asyncio.Queue(maxsize=2)
+        sentences = asyncio.Queue()
+        clips = asyncio.Queue(maxsize=4)
+
+        await asyncio.gather(
+            self._listen_stage(transcripts, max_turns),
+            self._think_stage(transcripts, sentences),
+            self._synthesize_stage(sentences, clips),
+            self._play_stage(clips),
+        )
+
+    def close(self):
+        """Stop playback and shut down the stage executors"""
+        if self._engine is not None:
+            self._engine.stop()
+        for executor in (self._listen_executor, self._stt_executor, self._llm_executor,
+                         self._tts_executor, self._play_executor):
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _record(self):
+        """Record one utterance (runs on the listen executor)"""
+        stt = self.twin.stt
+        if self.recording_duration is not None:
+            return stt.record_audio(self.recording_duration, stt.sample_rate)
+
+        from digital_twin_like.voice_activity import EndpointRecorder, MicrophoneSource
+
+        recorder = EndpointRecorder(silence_duration=self.silence_duration)
+        return recorder.record(MicrophoneSource(stt.sample_rate), on_block=self._on_block)
+
+    def _on_block(self, block, in_speech):
+        """Barge-in: the user started talking while an answer is playing"""
+        if not (self.barge_in and in_speech):
+            return
+        with self._state_lock:
+            turn = self._speaking_turn
+            if turn is None or self._barged_turn == turn:
+                return
+            self._barged_turn = turn
+        cancelled = self._cancelled.get(turn)
+        if cancelled is not None:
+            cancelled.set()
+        if self._engine is not None:
+            self._engine.stop()
+        print("\n✋ Barge-in: stopping playback")
+
+    async def _listen_stage(self, transcripts, max_turns):
+        loop = asyncio.get_running_loop()
+        stt = self.twin.stt
+        heard = 0
+        prompted = False
+
+        while max_turns is None or heard < max_turns:
+            if not prompted:
+                print("\n🎤 Listening... Speak now! (recording stops when you pause)")
+                prompted = True
+            audio = await loop.run_in_executor(self._listen_executor, self._record)
+            end_of_speech = time.perf_counter()
+            if not len(audio):
+                continue  # nobody spoke before the timeout; re-arm quietly
+
+            transcribe_start = time.perf_counter()
+            text = await loop.run_in_executor(self._stt_executor, stt.transcribe_audio,
+                                              audio, stt.sample_rate)
+            if not text:
+                print("\n👂 Didn't catch that - please try again.")
+                prompted = False
+                continue
+
+            heard += 1
+            prompted = False
+            turn = {
+                "turn": heard,
+                "user_input": text,
+                "speech_s": len(audio) / stt.sample_rate,
+                "end_of_speech": end_of_speech,
+                "transcribe_s": time.perf_counter() - transcribe_start,
+                "barged_in": False,
+            }
+            self.turns.append(turn)
+            print(f"\n👤 You said: {text}")
+
+            if any(word in text.lower() for word in self.quit_words):
+                print("\nGoodbye!")
+                break
+            self._turn_done.clear()
+            await transcripts.put(turn)
+
+            if not self.barge_in:
+                # Without barge-in the microphone would record the twin's own
+                # answer, so only re-arm once it has been spoken
+                await self._turn_done.wait()
+
+        await transcripts.put(None)
+
+    async def _think_stage(self, transcripts, sentences):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            turn = await transcripts.get()
+            if turn is None:
+                await sentences.put(None)
+                return
+
+            print("\n🤔 Thinking...")
+            cancelled = self._cancelled[turn["turn"]] = threading.Event()
+            splitter = SentenceSplitter()
+            streamed = []
+            think_start = time.perf_counter()
+
+            def on_text(text, turn=turn):
+                # Called on the LLM executor thread as tokens stream in
+                for sentence in splitter.feed(text):
+                    if not streamed:
+                        turn["first_sentence_s"] = time.perf_counter() - think_start
+                    streamed.append(sentence)
+                    loop.call_soon_threadsafe(sentences.put_nowait, (turn, sentence))
+
+            try:
+                response = await loop.run_in_executor(
+                    self._llm_executor, lambda: self.twin.respond_to_text(
+                        turn["user_input"], on_text=on_text, cancelled=cancelled))
+            except Exception as e:
+                print(f"⚠️  Error generating response: {e}")
+                response = ""
+
+            turn["think_s"] = time.perf_counter() - think_start
+            turn["response"] = response
+            print(f"\n🤖 Tim's Digital Twin: {response}")
+
+            # Cached answers and models that ignored the streaming format arrive in one piece
+            remaining = splitter.flush() if streamed else split_sentences(response)
+            for sentence in remaining:
+                turn.setdefault("first_sentence_s", time.perf_counter() - think_start)
+                await sentences.put((turn, sentence))
+            await sentences.put((turn, END_OF_TURN))
+
+    async def _synthesize_stage(self, sentences, clips):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            item = await sentences.get()
+            if item is None:
+                await clips.put(None)
+                return
+
+            turn, sentence = item
+            if sentence is END_OF_TURN or self._barged_turn == turn["turn"]:
+                await clips.put((turn, END_OF_TURN if sentence is END_OF_TURN else None))
+                continue
+
+            # Started now, awaited in order by the play stage
+            future = loop.run_in_executor(self._tts_executor, self._synthesize_timed, turn, sentence)
+            await clips.put((turn, future))
+
+    def _synthesize_timed(self, turn, sentence):
+        start = time.perf_counter()
+        clip = self.tts.synthesize(sentence)
+        turn.setdefault("first_synthesis_s", time.perf_counter() - start)
+        return clip
+
+    async def _play_stage(self, clips):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            item = await clips.get()
+            if item is None:
+                return
+
+            turn, future = item
+            if future is END_OF_TURN:
+                self._finish_turn(turn)
+                continue
+            if future is None:
+                continue
+
+            try:
+                data, ext = await future
+            except Exception as e:
+                print(f"⚠️  Error synthesizing sentence: {e}")
+                continue
+            if self._barged_turn == turn["turn"]:
+                continue
+
+            with self._state_lock:
+                self._speaking_turn = turn["turn"]
+            if "first_audio_s" not in turn:
+                turn["first_audio_s"] = time.perf_counter() - turn["end_of_speech"]
+                turn["play_start"] = time.perf_counter()
+
+            if self._engine is not None:
+                # Every sentence of a turn shares one cancel token, so a barge-in
+                # also drops the sentences that were already on their way
+                utterance = self._utterances.get(turn["turn"])
+                if utterance is None:
+                    utterance = self._utterances[turn["turn"]] = self._engine.begin_utterance()
+                await loop.run_in_executor(self._play_executor, lambda: self._engine.play_bytes(
+                    data, ext, utterance=utterance))
+            else:
+                await loop.run_in_executor(self._play_executor, play_audio_bytes, data, ext)
+
+    def _finish_turn(self, turn):
+        utterance = self._utterances.pop(turn["turn"], None)
+        if utterance is not None:
+            self._engine.end_utterance(utterance)
+        with self._state_lock:
+            self._speaking_turn = None
+            turn["barged_in"] = self._barged_turn == turn["turn"]
+        self._cancelled.pop(turn["turn"], None)
+
+        # The answer may have been recorded before the user cut it off
+        memory = getattr(self.twin, "memory", None)
+        if turn["barged_in"] and memory is not None:
+            memory.forget_turn(turn["user_input"], turn.get("response", ""))
+
+        if "play_start" in turn:
+            turn["play_s"] = time.perf_counter() - turn.pop("play_start")
+        turn["total_s"] = time.perf_counter() - turn.pop("end_of_speech")
+        print(format_turn_metrics(turn))
+        self._turn_done.set()
+
+
+def format_turn_metrics(turn):
+    """
+    Format one turn's per-stage latencies
+
+    Args:
+        turn: Metric dict produced by VoiceSession
+
+    Returns:
+        One-line summary
+    """
+    def seconds(key):
+        value = turn.get(key)
+        return "-" if value is None else f"{value:.2f}s"
+
+    line = (f"⏱️  Turn {turn['turn']}: speech {seconds('speech_s')}, transcribe {seconds('transcribe_s')}, "
+            f"think {seconds('think_s')} (first sentence {seconds('first_sentence_s')}), "
+            f"synthesis {seconds('first_synthesis_s')}, first audio {seconds('first_audio_s')} after speech, "
+            f"playback {seconds('play_s')}")
+    if turn.get("barged_in"):
+        line += " [barge-in]"
+    return line
@@ -40,6 +40,12 @@ research_result = get_research.func()
 print(f"✓ Retrieved {len(research_result)} characters")
 print(f"Preview: {research_result[:200]}...")
 
+# Test section-addressed access
+print("\n📑 Testing Section Access:")
+section_result = get_biography.func("notable-achievements/awards-recognition")
+print(f"✓ Retrieved {len(section_result)} characters (vs {len(bio_result)} for the outline)")
+print(f"Preview: {section_result[:200]}...")
+
 # Test search tool
 print("\n🔍 Testing Search Tool:")
 search_result = search_knowledge.func("spatial transcriptomics")
@@ -0,0 +1,83 @@
+"""Tests for AdvancedTTS chunked synthesis"""
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("soundfile")
+
+from digital_twin_like import advanced_tts  # noqa: E402
+
+
+class FakeKokoro:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, text, voice, speed, lang):
+        self.calls.append(text)
+        return np.zeros(240, dtype=np.float32), 24000
+
+
+class FakeProcessPool:
+    """Records jobs; worker start-up stays pending until the test releases it"""
+
+    created = []
+
+    def __init__(self, max_workers, mp_context, initializer, initargs):
+        FakeProcessPool.created.append(self)
+        self.warmup = []
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        if fn is advanced_tts._kokoro_worker_ready:
+            self.warmup.append(future)
+        else:
+            self.jobs.append(args[0])
+            future.set_result((np.zeros(240, dtype=np.float32), 24000))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@pytest.fixture
+def kokoro_tts(monkeypatch):
+    FakeProcessPool.created = []
+    monkeypatch.setattr(advanced_tts, "ProcessPoolExecutor", FakeProcessPool)
+    tts = advanced_tts.AdvancedTTS(backend="gtts", use_cache=False, chunk_workers=3)
+    tts.backend = "kokoro"
+    tts.kokoro = FakeKokoro()
+    return tts
+
+
+def test_concurrent_chunks_share_one_pool_and_never_wait_for_it(kokoro_tts):
+    threads = [threading.Thread(target=kokoro_tts.synthesize, args=(f"Sentence {i}.", True))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(FakeProcessPool.created) == 1
+    pool = FakeProcessPool.created[0]
+    assert len(pool.warmup) == 3
+    # Workers are still starting, so every chunk ran in this process
+    assert len(kokoro_tts.kokoro.calls) == 8 and pool.jobs == []
+
+    for future in pool.warmup:
+        future.set_result(True)
+    kokoro_tts.synthesize("Another sentence.", parallel=True)
+    assert pool.jobs == ["Another sentence."]
+    assert len(FakeProcessPool.created) == 1
+
+
+def test_failed_workers_fall_back_to_in_process(kokoro_tts):
+    kokoro_tts.prepare_chunked()
+    for future in FakeProcessPool.created[0].warmup:
+        future.set_exception(RuntimeError("model missing"))
+    kokoro_tts.synthesize("Hello.", parallel=True)
+    assert kokoro_tts.kokoro.calls == ["Hello."]
+    kokoro_tts.close()
+    assert kokoro_tts._kokoro_pool is None
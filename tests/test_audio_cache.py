@@ -0,0 +1,90 @@
+"""Tests for the shared synthesized-audio cache"""
+import os
+
+import pytest
+
+from digital_twin_like.audio_cache import AudioCache, audio_cache_key, gtts_cache_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AudioCache(cache_dir=tmp_path, max_bytes=10, memory_items=1)
+
+
+def test_keys_normalize_whitespace_and_separate_voices():
+    assert audio_cache_key("openai", "alloy", "en", 1.0, "Hello  there\n") == \
+        audio_cache_key("openai", "alloy", "en", 1.0, "Hello there")
+    assert audio_cache_key("openai", "alloy", "en", 1.0, "Hi") != \
+        audio_cache_key("openai", "nova", "en", 1.0, "Hi")
+    assert gtts_cache_key("Hi", slow=True) != gtts_cache_key("Hi")
+
+
+def test_put_get_and_disk_lru_eviction(cache, tmp_path):
+    cache.put("a", b"1234", "mp3")
+    cache.put("b", b"5678", "mp3")
+    assert cache.get("a") == (b"1234", "mp3")
+    cache.put("c", b"9012", "wav")
+
+    # 'b' was least recently used once the 10-byte budget was exceeded
+    assert cache.get("b") is None
+    assert cache.get_path("c") == tmp_path / "c.wav"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+
+def test_clips_survive_a_restart(tmp_path):
+    AudioCache(cache_dir=tmp_path).put("a", b"clip", "mp3")
+    assert AudioCache(cache_dir=tmp_path).get("a") == (b"clip", "mp3")
+
+
+def gtts_engines(monkeypatch, cache):
+    pytest.importorskip("gtts")
+    pytest.importorskip("numpy")
+    from digital_twin_like import advanced_tts, text_to_speech
+
+    synthesized = []
+
+    class FakeGTTS:
+        def __init__(self, text, lang, slow):
+            synthesized.append(text)
+
+        def write_to_fp(self, fp):
+            fp.write(b"mp3 data")
+
+        def save(self, path):
+            with open(path, 'wb') as f:
+                f.write(b"mp3 data")
+
+    def synthesize_gtts(self, text):
+        synthesized.append(text)
+        return b"mp3 data", "mp3"
+
+    monkeypatch.setattr(text_to_speech, "gTTS", FakeGTTS)
+    monkeypatch.setattr(advanced_tts.AdvancedTTS, "_synthesize_gtts", synthesize_gtts)
+    tts = text_to_speech.TextToSpeech()
+    advanced = advanced_tts.AdvancedTTS(backend="gtts")
+    tts.audio_cache = advanced.audio_cache = cache
+    return tts, advanced, synthesized
+
+
+def test_gtts_clips_are_shared_between_tts_engines(monkeypatch, tmp_path):
+    cache = AudioCache(cache_dir=tmp_path)
+    tts, advanced, synthesized = gtts_engines(monkeypatch, cache)
+
+    assert tts.synthesize("Hello from Tim.") == (b"mp3 data", "mp3")
+    assert advanced.synthesize("Hello from Tim.") == (b"mp3 data", "mp3")
+    assert synthesized == ["Hello from Tim."]
+
+
+def test_file_synthesis_counts_one_miss(monkeypatch, tmp_path):
+    cache = AudioCache(cache_dir=tmp_path)
+    _, advanced, synthesized = gtts_engines(monkeypatch, cache)
+
+    path, is_temp = advanced._audio_file("A new sentence.")
+    assert cache.stats()["misses"] == 1
+    assert synthesized == ["A new sentence."]
+    if is_temp:
+        os.remove(path)
+
+    advanced._audio_file("A new sentence.")
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
@@ -0,0 +1,74 @@
+"""Tests for the in-process playback ring buffer and engine"""
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("soundfile")
+
+from digital_twin_like.audio_playback import PlaybackEngine, RingBuffer  # noqa: E402
+
+
+def samples(n, value=1.0):
+    return np.full(n, value, dtype=np.float32)
+
+
+def test_ring_buffer_wraps_and_pads_with_silence():
+    buffer = RingBuffer(8)
+    assert buffer.write(np.arange(6, dtype=np.float32))
+    out = np.empty(4, dtype=np.float32)
+    assert buffer.read_into(out) == 4
+    assert buffer.write(np.arange(6, 12, dtype=np.float32))   # wraps around the end
+
+    out = np.empty(10, dtype=np.float32)
+    assert buffer.read_into(out) == 8
+    np.testing.assert_array_equal(out, [4, 5, 6, 7, 8, 9, 10, 11, 0, 0])
+    assert len(buffer) == 0
+
+
+def test_ring_buffer_write_blocks_until_cancelled():
+    buffer = RingBuffer(4)
+    cancelled = threading.Event()
+    result = []
+    writer = threading.Thread(target=lambda: result.append(buffer.write(samples(10), cancelled)))
+    writer.start()
+    writer.join(0.2)
+    assert writer.is_alive() and len(buffer) == 4
+    cancelled.set()
+    writer.join(1)
+    assert result == [False]
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = PlaybackEngine(sample_rate=100, buffer_seconds=10)
+    monkeypatch.setattr(engine, "_ensure_stream", lambda: None)
+    return engine
+
+
+def test_stop_cancels_every_later_chunk_of_an_utterance(engine):
+    utterance = engine.begin_utterance()
+    assert engine.play(samples(50), 100, block=False, utterance=utterance)
+    engine.stop()
+    assert len(engine.buffer) == 0
+
+    # Streamed chunks arriving after the stop are dropped, not played
+    for _ in range(3):
+        assert not engine.play(samples(50), 100, block=False, utterance=utterance)
+    assert len(engine.buffer) == 0
+    engine.end_utterance(utterance)
+
+    # The next utterance plays normally
+    assert engine.play(samples(50), 100, block=False)
+    assert len(engine.buffer) == 50
+
+
+def test_stop_wakes_a_blocked_wait(engine):
+    engine.play(samples(50), 100, block=False)
+    waiter = threading.Thread(target=engine.wait)
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+    engine.stop()
+    waiter.join(1)
+    assert not waiter.is_alive()
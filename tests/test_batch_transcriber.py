@@ -0,0 +1,99 @@
+"""Tests for batched Whisper decoding and the micro-batching scheduler"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("soundfile")
+
+from digital_twin_like import batch_transcriber  # noqa: E402
+from digital_twin_like.batch_transcriber import (  # noqa: E402
+    BatchTranscriber, decode_in_windows, transcribe_batch,
+)
+
+
+def window_text(samples):
+    """Stub decode: each window is labelled by its first sample"""
+    return f"w{int(samples[0])}" if samples[0] >= 0 else ""
+
+
+def test_windows_are_split_chunked_and_mapped_back_in_order():
+    audios = [
+        np.array([1, 1, 1, 1, 2, 2], dtype=np.float32),          # two windows
+        np.array([], dtype=np.float32),                           # no windows
+        np.array([3, 3, 3], dtype=np.float32),                    # one short window
+        np.array([4, 4, 4, 4, -1, -1, -1, -1, 5], dtype=np.float32),  # silent middle window
+    ]
+    chunks = []
+
+    def decode_chunk(chunk):
+        chunks.append(len(chunk))
+        return [window_text(samples) for samples in chunk]
+
+    texts = decode_in_windows(audios, window_samples=4, max_windows=2, decode_chunk=decode_chunk)
+
+    assert texts == ["w1 w2", "", "w3", "w4 w5"]
+    assert chunks == [2, 2, 2]
+
+
+def test_transcribe_batch_with_stubbed_whisper(monkeypatch):
+    torch = pytest.importorskip("torch")
+    whisper = pytest.importorskip("whisper")
+    from whisper.audio import N_SAMPLES
+
+    def fake_log_mel(audio, n_mels):
+        return torch.full((n_mels, 3000), float(audio[0]))
+
+    decoded = []
+
+    def fake_decode(model, mels, options):
+        decoded.append(len(mels))
+        return [SimpleNamespace(text=f" w{int(mel[0, 0])}", no_speech_prob=0.0,
+                                avg_logprob=0.0, compression_ratio=1.0) for mel in mels]
+
+    monkeypatch.setattr(whisper.audio, "log_mel_spectrogram", fake_log_mel)
+    monkeypatch.setattr(whisper, "decode", fake_decode)
+    model = SimpleNamespace(dims=SimpleNamespace(n_mels=80), device=torch.device("cpu"))
+
+    audios = [np.full(N_SAMPLES + 10, 1, dtype=np.float32),
+              np.full(100, 2, dtype=np.float32),
+              np.full(N_SAMPLES, 3, dtype=np.float32)]
+    texts = transcribe_batch(model, audios, max_windows=3)
+
+    assert texts == ["w1 w1", "w2", "w3"]
+    assert decoded == [3, 1]
+
+
+class FakeRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def get(self, model_size="base", backend="torch"):
+        return object()
+
+    def lock_for(self, model_size="base", backend="torch"):
+        return self.lock
+
+
+def test_batched_results_reach_their_callers(monkeypatch):
+    batches = []
+
+    def fake_transcribe_batch(model, audios, max_windows=16):
+        batches.append(len(audios))
+        return decode_in_windows(audios, 16000, max_windows,
+                                 lambda chunk: [window_text(samples) for samples in chunk])
+
+    monkeypatch.setattr(batch_transcriber, "get_model_registry", FakeRegistry)
+    monkeypatch.setattr(batch_transcriber, "transcribe_batch", fake_transcribe_batch)
+
+    transcriber = BatchTranscriber(max_batch_size=3, max_wait=0.5)
+    try:
+        futures = [transcriber.submit(np.full(1600, n, dtype=np.float32)) for n in range(5)]
+        texts = [future.result(timeout=5) for future in futures]
+    finally:
+        transcriber.close()
+
+    assert texts == [f"w{n}" for n in range(5)]
+    assert sum(batches) == 5 and max(batches) <= 3
+    assert transcriber.stats()["requests"] == 5
@@ -0,0 +1,93 @@
+"""Tests for checkpointed resume in bulk transcription"""
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+sf = pytest.importorskip("soundfile")
+
+from digital_twin_like import bulk_transcribe  # noqa: E402
+from digital_twin_like.bulk_transcribe import transcribe_file  # noqa: E402
+
+
+SAMPLE_RATE = 16000
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FakeModel:
+    """Whisper stand-in; one segment per chunk, labelled by the chunk's audio"""
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def transcribe(self, audio, language="en", condition_on_previous_text=True,
+                   initial_prompt=None):
+        if self.fail_after is not None and self.calls >= self.fail_after:
+            raise Interrupted()
+        self.calls += 1
+        text = f"{len(audio)} samples from {audio[0]:.4f}"
+        return {"text": text,
+                "segments": [{"start": 0.0, "end": len(audio) / SAMPLE_RATE, "text": text}]}
+
+
+def write_recording(path, seconds, seed):
+    audio = np.random.default_rng(seed).uniform(-0.5, 0.5, int(seconds * SAMPLE_RATE))
+    sf.write(str(path), audio.astype(np.float32), SAMPLE_RATE, subtype="FLOAT")
+
+
+def run(monkeypatch, path, output_dir, model):
+    monkeypatch.setattr(bulk_transcribe, "_worker_model", model)
+    return transcribe_file(str(path), "talk.wav", str(output_dir), chunk_seconds=1.0)
+
+
+def reference_output(monkeypatch, path, tmp_path):
+    """Transcript of an uninterrupted run"""
+    reference_dir = tmp_path / "reference"
+    run(monkeypatch, path, reference_dir, FakeModel())
+    return (reference_dir / "talk.wav.jsonl").read_text()
+
+
+def test_interrupted_run_resumes_from_checkpoint(monkeypatch, tmp_path):
+    recording = tmp_path / "talk.wav"
+    write_recording(recording, 4.5, seed=1)
+    output_dir = tmp_path / "out"
+
+    with pytest.raises(Interrupted):
+        run(monkeypatch, recording, output_dir, FakeModel(fail_after=2))
+    progress = json.loads(Path(f"{output_dir / 'talk.wav.jsonl'}.progress").read_text())
+    assert progress["segments"] == 2
+    assert not (output_dir / "talk.wav.jsonl").exists()
+
+    resumed = FakeModel()
+    summary = run(monkeypatch, recording, output_dir, resumed)
+    expected = reference_output(monkeypatch, recording, tmp_path)
+
+    assert (output_dir / "talk.wav.jsonl").read_text() == expected
+    assert summary["segments"] == len(expected.splitlines())
+    assert resumed.calls == summary["segments"] - 2
+    assert not Path(f"{output_dir / 'talk.wav.jsonl'}.progress").exists()
+
+
+def test_changed_recording_discards_partial_output(monkeypatch, tmp_path):
+    recording = tmp_path / "talk.wav"
+    write_recording(recording, 4.5, seed=1)
+    output_dir = tmp_path / "out"
+
+    with pytest.raises(Interrupted):
+        run(monkeypatch, recording, output_dir, FakeModel(fail_after=2))
+
+    write_recording(recording, 3.5, seed=2)
+    stat = recording.stat()
+    os.utime(recording, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    restarted = FakeModel()
+    summary = run(monkeypatch, recording, output_dir, restarted)
+
+    assert (output_dir / "talk.wav.jsonl").read_text() == reference_output(
+        monkeypatch, recording, tmp_path)
+    assert restarted.calls == summary["segments"]
@@ -0,0 +1,112 @@
+"""Tests for concurrent crew task execution and per-task output caching"""
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("yaml")
+
+from digital_twin_like import concurrent_crew  # noqa: E402
+from digital_twin_like.concurrent_crew import ConcurrentCrewRunner  # noqa: E402
+
+
+TASKS_YAML = """
+first_task:
+  description: First question for {topic}
+  agent: twin
+second_task:
+  description: Second question for {topic}
+  agent: twin
+third_task:
+  description: Third question for {topic}
+  agent: twin
+"""
+
+AGENTS_YAML = """
+twin:
+  role: Digital twin
+"""
+
+
+class FakeKnowledgeStore:
+    def fingerprint(self):
+        return "knowledge-v1"
+
+
+class StubTasks:
+    """Stands in for run_task; records calls and how many overlap"""
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, task_name, inputs, verbose=False):
+        with self.lock:
+            self.calls.append(task_name)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return f"{task_name} about {inputs['topic']}"
+
+
+@pytest.fixture
+def stub_tasks(monkeypatch, tmp_path):
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "tasks.yaml").write_text(TASKS_YAML)
+    (config_dir / "agents.yaml").write_text(AGENTS_YAML)
+    monkeypatch.setattr(concurrent_crew, "CONFIG_DIR", config_dir)
+    monkeypatch.setattr(concurrent_crew, "get_knowledge_store", FakeKnowledgeStore)
+    stub = StubTasks()
+    monkeypatch.setattr(concurrent_crew, "run_task", stub)
+    return stub
+
+
+def make_runner(tmp_path, **kwargs):
+    return ConcurrentCrewRunner(cache_dir=tmp_path / "cache", **kwargs)
+
+
+def test_independent_tasks_overlap(stub_tasks, tmp_path):
+    report = make_runner(tmp_path, max_concurrency=3, use_cache=False).run({"topic": "cells"})
+
+    assert stub_tasks.peak == 3
+    assert report["wall_s"] < report["task_s"]
+    # Outputs follow the definition order, not completion order
+    assert [t["name"] for t in report["tasks"]] == ["first_task", "second_task", "third_task"]
+    assert report["tasks"][1]["output"] == "second_task about cells"
+
+
+def test_concurrency_is_bounded(stub_tasks, tmp_path):
+    make_runner(tmp_path, max_concurrency=2, use_cache=False).run({"topic": "cells"})
+
+    assert stub_tasks.peak == 2
+    assert len(stub_tasks.calls) == 3
+
+
+def test_cached_outputs_are_reused(stub_tasks, tmp_path):
+    make_runner(tmp_path).run({"topic": "cells"})
+    report = make_runner(tmp_path).run({"topic": "cells"})
+
+    assert len(stub_tasks.calls) == 3
+    assert all(t["cached"] for t in report["tasks"])
+    assert report["tasks"][0]["output"] == "first_task about cells"
+
+    # Different kickoff inputs are different outputs
+    make_runner(tmp_path).run({"topic": "neurons"})
+    assert len(stub_tasks.calls) == 6
+
+
+def test_tasks_yaml_edit_invalidates_that_task(stub_tasks, tmp_path):
+    make_runner(tmp_path).run({"topic": "cells"})
+
+    tasks_yaml = concurrent_crew.CONFIG_DIR / "tasks.yaml"
+    tasks_yaml.write_text(TASKS_YAML.replace("Second question", "Reworded second question"))
+    report = make_runner(tmp_path).run({"topic": "cells"})
+
+    assert [t["cached"] for t in report["tasks"]] == [True, False, True]
+    assert stub_tasks.calls[3:] == ["second_task"]
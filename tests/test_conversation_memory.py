@@ -0,0 +1,94 @@
+"""Tests for token-bounded conversation memory"""
+from digital_twin_like.conversation_memory import ConversationMemory, summary_topic
+from digital_twin_like.tools.knowledge_sections import estimate_tokens
+
+
+def answer(i):
+    return (f"Answer number {i} is about topic {i}. "
+            + "It goes on with more detail about the work. " * 6)
+
+
+def test_empty_memory_has_no_context():
+    memory = ConversationMemory()
+    assert memory.context() == ""
+    memory.add_turn("", "ignored")
+    assert len(memory) == 0
+
+
+def test_context_stays_within_budget_over_a_long_conversation():
+    memory = ConversationMemory(max_tokens=300, max_recent_turns=3, summary_tokens=100)
+    for i in range(60):
+        memory.add_turn(f"What about topic {i}?", answer(i))
+        context = memory.context()
+        assert estimate_tokens(context) <= memory.max_tokens
+        # The newest turn is always there in full
+        assert f"User: What about topic {i}?\nTim: {answer(i)}" in context
+    assert memory.stats()["turns"] == 60
+
+
+def test_evicted_turns_are_compacted_not_dropped():
+    memory = ConversationMemory(max_tokens=400, max_recent_turns=2, summary_tokens=120)
+    for i in range(8):
+        memory.add_turn(f"Where did you study subject {i}?", answer(i))
+    context = memory.context()
+    assert "- Earlier: Where did you study subject 0" in context
+    for i in range(6):
+        assert f"subject {i}" in context
+
+
+def test_oldest_topics_are_counted_once_they_no_longer_fit():
+    memory = ConversationMemory(max_tokens=200, max_recent_turns=1, summary_tokens=40)
+    for i in range(40):
+        memory.add_turn(f"Question {i}?", answer(i))
+        assert estimate_tokens(memory.context()) <= memory.max_tokens
+    assert "older): " in memory.context()
+
+
+def test_oversized_newest_turn_keeps_question_and_end_of_answer():
+    memory = ConversationMemory(max_tokens=100)
+    memory.add_turn("First question?", "Short answer.")
+    long_answer = "Start of a very long answer. " + "filler words " * 200 + "The final point."
+    memory.add_turn("Second question?", long_answer)
+    context = memory.context()
+    assert estimate_tokens(context) <= memory.max_tokens
+    assert "User: Second question?" in context
+    assert context.rstrip().endswith("The final point.")
+    assert "Start of a very long answer" not in context
+
+
+def test_oversized_question_is_shortened_without_cutting_the_answer():
+    memory = ConversationMemory(max_tokens=200)
+    question = " ".join(f"word{i}" for i in range(300)) + "?"
+    memory.add_turn(question, "A short answer that fits.")
+    context = memory.context()
+    assert estimate_tokens(context) <= memory.max_tokens
+    assert "User: word0" in context
+    assert context.rstrip().endswith("Tim: A short answer that fits.")
+    assert "Tim: ..." not in context
+
+
+def test_summary_topic():
+    assert summary_topic("- Asked: Where did you go to school? | Answered: Harvard.") == (
+        "Where did you go to school")
+    assert summary_topic("- Talked about spatial transcriptomics methods in detail") == (
+        "Talked about spatial transcriptomics methods in...")
+
+
+def test_clear_forgets_everything():
+    memory = ConversationMemory(max_tokens=200, max_recent_turns=1, summary_tokens=40)
+    for i in range(10):
+        memory.add_turn(f"Question {i}?", answer(i))
+    memory.clear()
+    assert memory.context() == ""
+    assert memory.stats()["summary_lines"] == 0
+
+
+def test_forget_turn_removes_an_interrupted_answer():
+    memory = ConversationMemory()
+    memory.add_turn("What do you study?", "Spatial transcriptomics.")
+    memory.add_turn("Tell me more", "A long answer the user cut off.")
+    assert memory.forget_turn("Tell me more", "A long answer the user cut off.")
+    assert "cut off" not in memory.context()
+    assert "Spatial transcriptomics." in memory.context()
+    assert len(memory) == 1
+    assert not memory.forget_turn("Tell me more", "A long answer the user cut off.")
@@ -0,0 +1,85 @@
+"""Tests for routing questions to the single-call fast path"""
+import pytest
+
+from digital_twin_like import fast_answer
+from digital_twin_like.fast_answer import (
+    FAST_PATH_INSTRUCTIONS, build_messages, fast_path_messages, retrieve_context,
+)
+
+
+PASSAGES = [
+    {"filename": "research.md", "section": "Spatial transcriptomics",
+     "text": "I map gene expression in mouse brain tissue.", "score": 4.2},
+    {"filename": "biography.md", "section": "",
+     "text": "I grew up in Toronto before moving to Boston.", "score": 2.1},
+]
+
+
+class FakeIndex:
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+
+    def search(self, question, top_k=5):
+        self.queries.append(question)
+        return self.results[:top_k]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    fake = FakeIndex(PASSAGES)
+    monkeypatch.setattr(fast_answer, "get_knowledge_index", lambda: fake)
+    return fake
+
+
+def test_well_covered_question_takes_the_fast_path(index):
+    messages, retrieval = fast_path_messages("gene expression in brain tissue")
+
+    assert messages is not None
+    assert retrieval["coverage"] == 1.0
+    assert retrieval["confidence"] == 1.0
+
+
+def test_poorly_covered_question_goes_to_the_agent(index):
+    messages, retrieval = fast_path_messages("favourite hiking trails near Boston")
+
+    assert messages is None
+    assert retrieval["confidence"] < fast_answer.MIN_COVERAGE
+
+
+def test_low_scoring_passages_go_to_the_agent(monkeypatch):
+    weak = [dict(PASSAGES[0], score=fast_answer.MIN_SCORE / 2)]
+    monkeypatch.setattr(fast_answer, "get_knowledge_index", lambda: FakeIndex(weak))
+
+    messages, retrieval = fast_path_messages("gene expression in brain tissue")
+
+    assert retrieval["coverage"] == 1.0
+    assert retrieval["confidence"] == 0.0
+    assert messages is None
+
+
+def test_min_confidence_is_configurable(index):
+    question = "gene expression and hiking"
+    assert fast_path_messages(question, min_confidence=0.9)[0] is None
+    assert fast_path_messages(question, min_confidence=0.1)[0] is not None
+
+
+def test_context_is_capped(monkeypatch):
+    long_passages = [dict(PASSAGES[0], text="x" * 400), dict(PASSAGES[1], text="y" * 400)]
+    monkeypatch.setattr(fast_answer, "get_knowledge_index", lambda: FakeIndex(long_passages))
+
+    retrieval = retrieve_context("expression", max_chars=500)
+
+    assert [p["text"][0] for p in retrieval["passages"]] == ["x"]
+
+
+def test_single_call_prompt_holds_knowledge_and_history():
+    history = "Earlier in this conversation:\nUser: hi\nYou: hello\n\n"
+    messages = build_messages("Where did you grow up?", PASSAGES, history)
+
+    assert [m["role"] for m in messages] == ["system", "user"]
+    system = messages[0]["content"]
+    assert system.startswith(FAST_PATH_INSTRUCTIONS)
+    assert "[research.md - Spatial transcriptomics]\nI map gene expression" in system
+    assert "[biography.md]\nI grew up in Toronto" in system
+    assert messages[1]["content"] == history + "Where did you grow up?"
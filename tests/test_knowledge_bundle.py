@@ -0,0 +1,142 @@
+"""Tests for the compiled, memory-mapped knowledge bundle"""
+import os
+import threading
+
+import pytest
+
+from digital_twin_like.tools.knowledge_bundle import KnowledgeBundle, build_bundle, load_bundle
+from digital_twin_like.tools.knowledge_index import KnowledgeIndex
+from digital_twin_like.tools.knowledge_sections import SectionTree
+from digital_twin_like.tools.knowledge_store import KnowledgeStore
+
+
+DOCS = {
+    "bio.md": "# Tim Cao\n\nComputational biologist.\n\n## Education\n\n"
+              "PhD at Harvard on neural stem cells.\n\nBS in biology.\n",
+    "research.md": "# Research\n\n## Spatial transcriptomics\n\n"
+                   "MERFISH imaging of the adult brain.\n\n## Methods\n\nPython and R pipelines.\n",
+}
+
+
+@pytest.fixture
+def knowledge_dir(tmp_path):
+    directory = tmp_path / "knowledge"
+    directory.mkdir()
+    for filename, text in DOCS.items():
+        (directory / filename).write_text(text)
+    return directory
+
+
+@pytest.fixture
+def bundle(knowledge_dir, tmp_path):
+    bundle = KnowledgeBundle(build_bundle(knowledge_dir, tmp_path / "test.bundle"))
+    yield bundle
+    bundle.close()
+
+
+def bump_dir_mtime(directory):
+    # Directory mtimes are coarse; make sure an add/remove is visible as a change
+    stat = directory.stat()
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_round_trip_matches_sources(bundle):
+    assert bundle.filenames() == sorted(DOCS)
+    for filename, text in DOCS.items():
+        assert bundle.get(filename) == text
+        expected = [{k: s[k] for k in ("id", "title", "level", "text", "own_text")}
+                    for s in SectionTree(filename, text).sections]
+        assert bundle.sections(filename) == expected
+    assert bundle.get("missing.md") is None
+    assert bundle.source_stat("missing.md") is None
+
+
+@pytest.mark.parametrize("query", ["neural stem cells", "MERFISH brain", "python", "nothing here"])
+def test_search_matches_in_memory_index(bundle, query):
+    index = KnowledgeIndex()
+    index.sync(DOCS)
+    assert bundle.search(query) == index.search(query)
+
+
+def test_bad_magic_is_rejected(tmp_path):
+    path = tmp_path / "bad.bundle"
+    path.write_bytes(b"NOPE" + b"\0" * 64)
+    with pytest.raises(ValueError):
+        KnowledgeBundle(path)
+    assert load_bundle(path) is None
+
+
+def test_stale_files_after_edit_add_and_remove(bundle, knowledge_dir):
+    assert bundle.is_fresh(knowledge_dir)
+    (knowledge_dir / "bio.md").write_text(DOCS["bio.md"] + "\nMore.\n")
+    (knowledge_dir / "new.md").write_text("# New\n")
+    (knowledge_dir / "research.md").unlink()
+    assert bundle.stale_files(knowledge_dir) == ["bio.md", "new.md", "research.md"]
+
+
+def test_store_serves_unchanged_files_from_bundle(bundle, knowledge_dir):
+    store = KnowledgeStore(knowledge_dir, poll_interval=0, bundle=bundle)
+    assert store.get("bio.md") == DOCS["bio.md"]
+    assert store.is_bundled("bio.md")
+    assert store.stats()["bundle_reads"] == 1
+    assert store.bundle_is_fresh()
+    assert store.fingerprint() == bundle.content_hash
+
+
+def test_store_notices_added_file_by_directory_mtime(bundle, knowledge_dir):
+    store = KnowledgeStore(knowledge_dir, poll_interval=0, bundle=bundle)
+    assert store.bundle_is_fresh()
+    (knowledge_dir / "new.md").write_text("# New\n")
+    bump_dir_mtime(knowledge_dir)
+    assert not store.bundle_is_fresh()
+
+
+def test_store_notices_in_place_edit_on_read(bundle, knowledge_dir):
+    store = KnowledgeStore(knowledge_dir, poll_interval=0, bundle=bundle)
+    assert store.bundle_is_fresh()
+    (knowledge_dir / "bio.md").write_text(DOCS["bio.md"] + "\nMore.\n")
+    assert store.get("bio.md").endswith("More.\n")
+    assert not store.is_bundled("bio.md")
+    assert not store.bundle_is_fresh()
+
+
+def test_background_check_notices_in_place_edit(bundle, knowledge_dir):
+    store = KnowledgeStore(knowledge_dir, poll_interval=0, bundle=bundle, bundle_check_interval=0)
+    assert store.bundle_is_fresh()
+    store._bundle_sweeper.join()
+    (knowledge_dir / "research.md").write_text(DOCS["research.md"] + "\nMore.\n")
+    store.bundle_is_fresh()
+    store._bundle_sweeper.join()
+    assert not store.bundle_is_fresh()
+
+
+def test_file_records_are_decoded_on_lookup(bundle):
+    assert bundle._files == {}
+    assert bundle.source_stat("research.md") is not None
+    assert list(bundle._files) == ["research.md"]
+    assert bundle.source_stat("aaa.md") is None and bundle.source_stat("zzz.md") is None
+
+
+def test_first_full_check_runs_in_the_background(bundle, knowledge_dir, monkeypatch):
+    store = KnowledgeStore(knowledge_dir, poll_interval=60, bundle=bundle)
+    (knowledge_dir / "research.md").write_text(DOCS["research.md"] + "\nMore.\n")
+    threads = []
+    is_fresh = bundle.is_fresh
+    monkeypatch.setattr(bundle, "is_fresh",
+                        lambda *args: threads.append(threading.current_thread()) or is_fresh(*args))
+
+    assert store.bundle_is_fresh()
+    store._bundle_sweeper.join()
+    assert threads == [store._bundle_sweeper]
+    assert not store.bundle_is_fresh()
+
+
+def test_repeated_freshness_checks_do_not_restat_every_file(bundle, knowledge_dir, monkeypatch):
+    store = KnowledgeStore(knowledge_dir, poll_interval=0, bundle=bundle)
+    assert store.bundle_is_fresh()
+    store._bundle_sweeper.join()
+    calls = []
+    monkeypatch.setattr(bundle, "is_fresh", lambda *args: calls.append(args) or True)
+    for _ in range(100):
+        assert store.bundle_is_fresh()
+    assert calls == []
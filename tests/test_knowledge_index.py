@@ -0,0 +1,94 @@
+"""Tests for the BM25 knowledge index"""
+from digital_twin_like.tools.knowledge_index import (
+    KnowledgeIndex,
+    split_passages,
+    split_sections,
+    tokenize,
+)
+
+
+DOC = """# Tim Cao
+
+## Research
+
+I study spatial transcriptomics with MERFISH.
+
+Neural stem cells in the adult brain.
+
+## Skills
+
+### Programming
+
+Python and R for data analysis.
+C++ for performance.
+"""
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("What is your research about?") == ["research"]
+    assert tokenize("C++ and C# are languages") == ["c++", "c#", "languages"]
+
+
+def test_split_passages_tracks_heading_path_and_line():
+    passages = split_passages(DOC)
+    assert [p["section"] for p in passages] == [
+        "Tim Cao > Research",
+        "Tim Cao > Research",
+        "Tim Cao > Skills > Programming",
+    ]
+    assert passages[2]["text"] == "Python and R for data analysis.\nC++ for performance."
+    assert DOC.split("\n")[passages[0]["line"]].startswith("I study")
+
+
+def test_split_sections_merges_passages_under_one_heading():
+    sections = split_sections(DOC)
+    assert len(sections) == 2
+    assert "MERFISH" in sections[0]["text"] and "Neural stem" in sections[0]["text"]
+
+
+def test_search_ranks_matching_passage_first():
+    index = KnowledgeIndex()
+    index.add_document("bio.md", DOC)
+    index.add_document("other.md", "## Hobbies\n\nHiking and photography.\n")
+
+    results = index.search("spatial transcriptomics")
+    assert results[0]["filename"] == "bio.md"
+    assert "MERFISH" in results[0]["text"]
+    assert results[0]["score"] > 0
+    assert index.search("python programming")[0]["section"] == "Tim Cao > Skills > Programming"
+
+
+def test_search_without_matches_or_terms_is_empty():
+    index = KnowledgeIndex()
+    index.add_document("bio.md", DOC)
+    assert index.search("zebrafish") == []
+    assert index.search("what is the") == []
+    assert KnowledgeIndex().search("research") == []
+
+
+def test_search_deduplicates_identical_passages():
+    index = KnowledgeIndex()
+    index.add_document("a.md", DOC)
+    index.add_document("b.md", DOC)
+    texts = [r["text"] for r in index.search("MERFISH neural python", top_k=10)]
+    assert len(texts) == len(set(texts))
+
+
+def test_sync_reindexes_only_changed_and_removes_missing():
+    index = KnowledgeIndex()
+    assert sorted(index.sync({"a.md": DOC, "b.md": "## B\n\nzebrafish\n"})) == ["a.md", "b.md"]
+    assert index.sync({"a.md": DOC, "b.md": "## B\n\nzebrafish\n"}) == []
+
+    assert index.sync({"a.md": DOC.replace("MERFISH", "seqFISH")}) == ["b.md", "a.md"]
+    assert index.search("zebrafish") == []
+    assert index.search("MERFISH") == []
+    assert index.search("seqFISH")[0]["filename"] == "a.md"
+
+
+def test_remove_document_restores_empty_index():
+    index = KnowledgeIndex()
+    index.add_document("a.md", DOC)
+    index.remove_document("a.md")
+    assert len(index) == 0
+    assert index._postings == {}
+    assert index._total_length == 0
@@ -0,0 +1,104 @@
+"""Tests for section-addressable knowledge tool responses"""
+import pytest
+
+from digital_twin_like.tools import knowledge_sections, knowledge_store
+from digital_twin_like.tools.knowledge_sections import (
+    SectionTree,
+    estimate_tokens,
+    read_sections,
+    start_turn_usage,
+    truncate_to_tokens,
+    turn_usage,
+)
+from digital_twin_like.tools.knowledge_store import KnowledgeStore
+
+
+DOC = """# Tim Cao
+
+Computational biologist.
+
+## Educational Background
+
+### Previous Education
+
+BS in biology.
+
+## Notable Achievements
+
+### Awards & Recognition
+
+Best poster award.
+"""
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    (tmp_path / "bio.md").write_text(DOC)
+    store = KnowledgeStore(tmp_path)
+    monkeypatch.setattr(knowledge_store, "_store", store)
+    monkeypatch.setattr(knowledge_sections, "_trees", {})
+    start_turn_usage()
+    return store
+
+
+def test_section_tree_ids_children_and_lookup():
+    tree = SectionTree("bio.md", DOC)
+    assert [s["id"] for s in tree.sections] == [
+        "",
+        "educational-background",
+        "educational-background/previous-education",
+        "notable-achievements",
+        "notable-achievements/awards-recognition",
+    ]
+    assert [c["id"] for c in tree.children(tree.find(""))] == [
+        "educational-background", "notable-achievements",
+    ]
+    assert tree.find("Awards & Recognition")["id"] == "notable-achievements/awards-recognition"
+    assert tree.find("previous-education")["text"].endswith("BS in biology.")
+    assert tree.find("missing") is None
+    assert "- notable-achievements/awards-recognition: Awards & Recognition" in tree.toc()
+
+
+def test_truncate_to_tokens_keeps_whole_paragraphs():
+    text = "\n\n".join(["word " * 20] * 5)
+    short = truncate_to_tokens(text, 60, "; see more")
+    assert short.count("word " * 20) == 2
+    assert short.endswith("tokens truncated; see more]")
+    assert truncate_to_tokens("short", 10) == "short"
+
+
+def test_small_file_is_returned_whole_without_an_outline(store):
+    budget = estimate_tokens(DOC) // 2 + 1
+    assert read_sections("bio.md", token_budget=budget) == DOC
+    usage = turn_usage()
+    assert usage["calls"] == 1 and usage["outline_calls"] == 0
+    assert usage["saved_tokens"] == 0
+
+
+def test_large_file_gets_an_outline_and_saves_nothing_by_itself(store):
+    budget = estimate_tokens(DOC) // 3
+    outline = read_sections("bio.md", token_budget=budget)
+    assert "Sections of bio.md" in outline
+    assert "educational-background/previous-education" in outline
+    usage = turn_usage()
+    assert usage["outline_calls"] == 1
+    assert usage["saved_tokens"] == 0
+
+    # The follow-up request is what saves tokens against the whole file
+    response = read_sections("bio.md", "awards-recognition", token_budget=budget)
+    assert "Best poster award." in response
+    assert "BS in biology." not in response
+    usage = turn_usage()
+    assert usage["calls"] == 2
+    assert usage["saved_tokens"] == estimate_tokens(DOC) - estimate_tokens(response)
+
+
+def test_requested_sections_stay_within_budget(store):
+    response = read_sections("bio.md", "educational-background, nope", token_budget=8)
+    assert "[Unknown section 'nope'" in response
+    assert "request subsections: educational-background/previous-education" in response
+    assert "BS in biology." not in response
+
+
+def test_missing_file(store):
+    assert read_sections("missing.md") == "Knowledge file missing.md not found"
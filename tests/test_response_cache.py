@@ -0,0 +1,121 @@
+"""Tests for the twin response cache"""
+import pytest
+
+from digital_twin_like.response_cache import ResponseCache, depends_on_context, normalize_question
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Where did you go to school?", "When did you go to school?"),
+    ("Where did you go to school?", "Why did you go to school?"),
+    ("When did you go to school?", "Why did you go to school?"),
+    ("Do you like Python more than R?", "Do you like R more than Python?"),
+    ("What can you do?", "What can't you do?"),
+    ("Is it good?", "Is it good good?"),
+])
+def test_different_questions_get_different_keys(a, b):
+    assert normalize_question(a) != normalize_question(b)
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Can you introduce yourself?", "introduce yourself"),
+    ("Introduce yourself, please.", "introduce   YOURSELF"),
+    ("What’s your research about?", "whats your research about"),
+    ("Um, so what languages do you use?", "What languages do you use"),
+])
+def test_trivial_variations_share_a_key(a, b):
+    assert normalize_question(a) == normalize_question(b)
+
+
+def test_negations_and_interrogatives_are_kept():
+    assert normalize_question("What can't you do?") == "what cant you do"
+    assert normalize_question("Where did you go to school?") == "where did you go to school"
+
+
+@pytest.mark.parametrize("question", ["", "?!", "please", "Can you please?"])
+def test_empty_keys_are_never_cached(question):
+    cache = ResponseCache()
+    assert normalize_question(question) == ""
+    cache.put(question, "An answer")
+    assert cache.stats()["entries"] == 0
+    assert cache.get(question) is None
+    assert cache.stats()["misses"] == 0
+
+
+def test_hit_miss_and_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    cache.put("Where did you go to school?", "Toronto")
+    assert cache.get("Why did you go to school?") is None
+    assert cache.get("where did you go to school") == "Toronto"
+
+    cache.put("What is your research?", "Spatial transcriptomics")
+    cache.put("What languages do you use?", "Python and R")
+    assert cache.get("Where did you go to school?") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 2, 1)
+
+
+def test_ttl_expiry():
+    cache = ResponseCache(ttl=-1)
+    cache.put("What is your research?", "Spatial transcriptomics")
+    assert cache.get("What is your research?") is None
+
+
+def test_sqlite_store_survives_restart(tmp_path):
+    db_path = tmp_path / "responses.db"
+    ResponseCache(db_path=db_path).put("What is your research?", "Spatial transcriptomics")
+    assert ResponseCache(db_path=db_path).get("what is your research") == "Spatial transcriptomics"
+
+
+def test_sqlite_store_is_bounded_and_purged(tmp_path):
+    db_path = tmp_path / "responses.db"
+    cache = ResponseCache(max_entries=2, db_path=db_path)
+    for i in range(5):
+        cache.put(f"Question number {i}?", f"Answer {i}")
+    rows = cache._db.execute("SELECT question FROM responses ORDER BY created_at").fetchall()
+    assert [row[0] for row in rows] == ["Question number 3?", "Question number 4?"]
+
+    # Rows that expired while the process was down are deleted at startup
+    cache._db.execute("UPDATE responses SET created_at = created_at - 100")
+    cache._db.commit()
+    reopened = ResponseCache(ttl=50, db_path=db_path)
+    assert reopened._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 0
+
+
+def test_extra_fingerprint_separates_configurations():
+    cache = ResponseCache(extra_fingerprint="persona A")
+    cache.put("What is your research?", "Spatial transcriptomics")
+    other = ResponseCache(extra_fingerprint="persona B")
+    other._entries = cache._entries
+    assert other.get("What is your research?") is None
+
+
+def test_crew_runs_use_raw_names_and_track_tasks_config(tmp_path):
+    from digital_twin_like.tools.knowledge_store import KnowledgeStore
+
+    (tmp_path / "agents.yaml").write_text("agent: v1\n")
+    (tmp_path / "tasks.yaml").write_text("task: v1\n")
+    cache = ResponseCache()
+    cache._config_store = KnowledgeStore(tmp_path, poll_interval=0)
+
+    cache.put_crew_run("introduction", "Hi, I'm Tim.")
+    assert cache.get_crew_run("introduction") == "Hi, I'm Tim."
+    # Not reachable through the question path, and not normalized
+    assert cache.get("introduction") is None
+    assert cache.get_crew_run("Introduction") is None
+
+    (tmp_path / "tasks.yaml").write_text("task: v2, rewritten\n")
+    assert cache.get_crew_run("introduction") is None
+
+
+def test_follow_up_questions_are_keyed_on_history():
+    assert depends_on_context("What tools did you build for that?")
+    assert depends_on_context("And your PhD?")
+    assert depends_on_context("Why?")
+    assert not depends_on_context("Where did you go to school?")
+    assert not depends_on_context("Introduce yourself")
+
+    cache = ResponseCache()
+    cache.put("Tell me more", "More about MERFISH", context="User: research?")
+    assert cache.get("tell me more", context="User: research?") == "More about MERFISH"
+    assert cache.get("tell me more", context="User: skills?") is None
+    assert cache.get("tell me more") is None
@@ -0,0 +1,63 @@
+"""Tests for the embedding-based semantic index"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from digital_twin_like.tools.semantic_search import (  # noqa: E402
+    HashedTfidfEmbedder,
+    SemanticIndex,
+    create_embedder,
+)
+
+
+DOCUMENTS = {
+    "research.md": "# Research\n\n## Spatial transcriptomics\n\n"
+                   "MERFISH imaging of gene expression in the adult mouse brain.\n\n"
+                   "## Stem cells\n\nNeural stem cells and adult neurogenesis.\n",
+    "skills.md": "# Skills\n\n## Programming\n\nPython, R and SQL for data analysis pipelines.\n\n"
+                 "## Cloud\n\nAWS batch jobs and Slurm clusters.\n",
+}
+
+
+def test_default_embedder_needs_no_download():
+    assert isinstance(create_embedder(), HashedTfidfEmbedder)
+
+
+def test_sync_reuses_persisted_matrix_on_fingerprint_match(tmp_path):
+    index = SemanticIndex(embedder=HashedTfidfEmbedder(n_features=512), cache_dir=tmp_path)
+    assert index.sync(DOCUMENTS)
+    assert not index.sync(DOCUMENTS)
+
+    # A fresh process loads the matrix instead of embedding again
+    restarted = SemanticIndex(embedder=HashedTfidfEmbedder(n_features=512), cache_dir=tmp_path)
+    restarted.embedder.fit = lambda texts: pytest.fail("re-embedded despite a matching cache")
+    assert not restarted.sync(DOCUMENTS)
+    np.testing.assert_array_equal(restarted.matrix, index.matrix)
+    np.testing.assert_array_equal(restarted.embedder.idf, index.embedder.idf)
+    assert restarted.search("python") == index.search("python")
+
+    del restarted.embedder.fit
+    changed = dict(DOCUMENTS, **{"hobbies.md": "## Hobbies\n\nHiking.\n"})
+    assert restarted.sync(changed)
+    assert len(restarted.sections) == len(index.sections) + 1
+
+
+def test_search_returns_top_k_best_first(tmp_path):
+    index = SemanticIndex(embedder=HashedTfidfEmbedder(n_features=2048), cache_dir=tmp_path)
+    index.sync(DOCUMENTS)
+
+    results = index.search("python programming for data analysis", top_k=2)
+    assert len(results) == 2
+    assert results[0]["section"].endswith("Programming")
+    assert results[0]["filename"] == "skills.md"
+    assert results[0]["score"] >= results[1]["score"] > 0
+
+    scores = [r["score"] for r in index.search("adult brain neural stem cells", top_k=10)]
+    assert scores == sorted(scores, reverse=True)
+    assert len(scores) <= len(index.sections)
+
+
+def test_search_on_empty_index(tmp_path):
+    index = SemanticIndex(embedder=HashedTfidfEmbedder(n_features=64), cache_dir=tmp_path)
+    index.sync({})
+    assert index.search("anything") == []
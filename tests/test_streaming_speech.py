@@ -0,0 +1,111 @@
+"""Tests for sentence streaming, final-answer filtering and ordered playback"""
+import threading
+
+from digital_twin_like.streaming_speech import (
+    FinalAnswerFilter,
+    SentenceSplitter,
+    StreamingSpeaker,
+    split_sentences,
+)
+
+
+def test_splitter_emits_sentences_as_chunks_arrive():
+    splitter = SentenceSplitter(min_chars=10)
+    assert splitter.feed("I study spatial transcri") == []
+    assert splitter.feed("ptomics. I use MERFISH") == ["I study spatial transcriptomics."]
+    assert splitter.feed(" daily! And") == ["I use MERFISH daily!"]
+    assert splitter.flush() == ["And"]
+    assert splitter.flush() == []
+
+
+def test_splitter_merges_short_fragments():
+    assert split_sentences("Dr. Smith works at Harvard. Yes.", min_chars=20) == [
+        "Dr. Smith works at Harvard.",
+        "Yes.",
+    ]
+
+
+def test_splitter_breaks_on_blank_lines():
+    assert split_sentences("First paragraph here\n\nSecond one", min_chars=5) == [
+        "First paragraph here",
+        "Second one",
+    ]
+
+
+def test_final_answer_filter_handles_split_marker():
+    answer_filter = FinalAnswerFilter()
+    chunks = ["Thought: I know this\nFinal ", "Ans", "wer:  Hello", " there."]
+    assert "".join(answer_filter.feed(c) for c in chunks) == "Hello there."
+
+    answer_filter.reset()
+    assert answer_filter.feed("Action: Search Knowledge Base") == ""
+
+
+def run_speaker(speaker, sentences):
+    done = threading.Event()
+
+    def run():
+        speaker.start()
+        for sentence in sentences:
+            speaker.submit(sentence)
+        speaker.finish()
+        done.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    assert done.wait(10), "speaker hung"
+
+
+def test_speaker_plays_in_submission_order(tmp_path):
+    played = []
+
+    def synthesize(sentence):
+        path = tmp_path / f"{len(sentence)}-{sentence[:3]}.mp3"
+        path.write_text(sentence)
+        return str(path)
+
+    speaker = StreamingSpeaker(synthesize, lambda path: played.append(open(path).read()),
+                               max_workers=3)
+    run_speaker(speaker, ["one", "two two", "three three three"])
+    assert played == ["one", "two two", "three three three"]
+    assert speaker.first_audio_time is not None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_speaker_skips_sentences_that_fail(tmp_path):
+    played = []
+
+    def synthesize(sentence):
+        if sentence == "bad synthesis":
+            raise RuntimeError("TTS down")
+        path = tmp_path / f"{sentence}.mp3"
+        path.write_text(sentence)
+        return str(path)
+
+    def play(path):
+        if path.endswith("bad playback.mp3"):
+            raise RuntimeError("no audio device")
+        played.append(path)
+
+    speaker = StreamingSpeaker(synthesize, play, max_pending=1)
+    run_speaker(speaker, ["a", "bad synthesis", "bad playback", "b", "c", "d"])
+    assert [p.rsplit("/", 1)[-1] for p in played] == ["a.mp3", "b.mp3", "c.mp3", "d.mp3"]
+
+
+def test_submit_does_not_block_when_player_has_died(tmp_path):
+    speaker = StreamingSpeaker(lambda s: str(tmp_path / "x.mp3"), lambda p: None, max_pending=1)
+    speaker.PUT_POLL_SECONDS = 0.05
+    # Simulate a player thread that exited unexpectedly
+    speaker._player = threading.Thread(target=lambda: None)
+    speaker._player.start()
+    speaker._player.join()
+
+    done = threading.Event()
+
+    def run():
+        for sentence in ["a", "b", "c"]:
+            speaker.submit(sentence)
+        speaker.finish()
+        done.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    assert done.wait(5), "submit()/finish() blocked on a dead player"
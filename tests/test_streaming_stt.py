@@ -0,0 +1,90 @@
+"""Tests for incremental transcription while the user is speaking"""
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+sf = pytest.importorskip("soundfile")
+
+from digital_twin_like.streaming_stt import StreamingTranscriber  # noqa: E402
+
+
+SAMPLE_RATE = 16000
+
+
+class RecordingModel:
+    """Whisper stand-in that records what it was asked to decode"""
+
+    def __init__(self, text="hello there"):
+        self.text = text
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append(np.array(audio))
+        duration = len(audio) / SAMPLE_RATE
+        return {"segments": [{"start": 0.0, "end": duration, "text": f" {self.text}"}]}
+
+
+class FakeSTT:
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self, model):
+        self.model = model
+        self.model_lock = threading.Lock()
+
+
+def block(value, seconds=0.1):
+    return np.full(int(seconds * SAMPLE_RATE), value, dtype=np.float32)
+
+
+def test_silence_before_speech_is_never_decoded():
+    model = RecordingModel()
+    transcriber = StreamingTranscriber(FakeSTT(model), step=0.2).start()
+    for _ in range(30):
+        transcriber.add_audio(block(0.0), in_speech=False)
+    assert transcriber.finish() == ""
+    assert model.calls == []
+
+
+def test_speech_is_decoded_with_bounded_pre_roll():
+    model = RecordingModel()
+    transcriber = StreamingTranscriber(FakeSTT(model), step=10.0, pre_roll=0.3)
+    transcriber.start()
+    for _ in range(20):
+        transcriber.add_audio(block(0.0), in_speech=False)
+    for _ in range(5):
+        transcriber.add_audio(block(0.5), in_speech=True)
+
+    assert transcriber.finish() == "hello there"
+    decoded = model.calls[-1]
+    # 0.3 s of pre-roll silence followed by the 0.5 s of speech
+    assert len(decoded) == int(0.8 * SAMPLE_RATE)
+    assert (decoded[:int(0.3 * SAMPLE_RATE)] == 0.0).all()
+
+
+def test_blocks_without_vad_flags_are_always_kept():
+    model = RecordingModel()
+    transcriber = StreamingTranscriber(FakeSTT(model), step=10.0).start()
+    for _ in range(3):
+        transcriber.add_audio(block(0.0))
+    transcriber.finish()
+    assert len(model.calls[-1]) == int(0.3 * SAMPLE_RATE)
+
+
+def test_listen_streaming_returns_empty_without_speech(tmp_path):
+    from digital_twin_like.speech_to_text import SpeechToText
+    from digital_twin_like.voice_activity import WavFileSource
+
+    path = tmp_path / "silence.wav"
+    rng = np.random.default_rng(0)
+    sf.write(path, (0.0005 * rng.standard_normal(3 * SAMPLE_RATE)).astype(np.float32), SAMPLE_RATE)
+
+    model = RecordingModel(text="Thank you.")
+    stt = SpeechToText.__new__(SpeechToText)
+    stt.sample_rate = SAMPLE_RATE
+    stt.model = model
+    stt.model_lock = threading.Lock()
+
+    assert stt.listen_and_transcribe_streaming(source=WavFileSource(path),
+                                               on_partial=lambda text: None) == ""
+    assert model.calls == []
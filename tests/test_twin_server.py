@@ -0,0 +1,172 @@
+"""Tests for session handling and worker scheduling in the twin server"""
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from digital_twin_like.twin_server import ServerError, TwinServer  # noqa: E402
+
+
+class FakeTwin:
+    """Conversation twin that records how many turns run at once"""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, response_cache=None, delay=0.05):
+        self.response_cache = response_cache
+        self.delay = delay
+        self.last_turn_timings = {}
+
+    def respond_to_text(self, text, memory=None):
+        with FakeTwin.lock:
+            FakeTwin.active += 1
+            FakeTwin.peak = max(FakeTwin.peak, FakeTwin.active)
+        time.sleep(self.delay)
+        with FakeTwin.lock:
+            FakeTwin.active -= 1
+        self.last_turn_timings = {"llm_calls": 1, "path": "agent"}
+        if memory is not None:
+            memory.add_turn(text, f"answer to {text}")
+        return f"answer to {text}"
+
+
+class FakeTranscriber:
+    """Transcriber whose calls block until released"""
+
+    model_size = "base"
+    backend = "torch"
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def transcribe(self, samples, sample_rate):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        self.release.wait(5)
+        with self.lock:
+            self.active -= 1
+        return f"heard {samples}"
+
+    def stats(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_twin():
+    FakeTwin.active = 0
+    FakeTwin.peak = 0
+
+
+def make_server(**kwargs):
+    transcriber = kwargs.pop("transcriber", None) or FakeTranscriber()
+    server = TwinServer(twin_factory=lambda cache: FakeTwin(), transcriber=transcriber, **kwargs)
+    return server, transcriber
+
+
+def test_idle_sessions_expire_when_full():
+    server, _ = make_server(workers=1, max_sessions=2, session_ttl=60.0)
+    try:
+        idle = server.create_session()
+        active = server.create_session()
+        idle.last_active -= 120
+
+        fresh = server.create_session()
+        assert idle.session_id not in server.sessions
+        assert {active.session_id, fresh.session_id} == set(server.sessions)
+        assert server.stats()["sessions_expired"] == 1
+
+        with pytest.raises(ServerError) as excinfo:
+            server.create_session()
+        assert excinfo.value.status == 503
+    finally:
+        server.close()
+
+
+def test_busy_sessions_are_not_expired():
+    server, transcriber = make_server(workers=1, session_ttl=60.0)
+    try:
+        session = server.create_session()
+        future = server.submit(session, "audio", ("clip", 16000))
+        session.last_active -= 120
+        server.expire_idle_sessions()
+        assert session.session_id in server.sessions
+
+        transcriber.release.set()
+        server.wait(future)
+        deadline = time.time() + 5
+        while session.scheduled and time.time() < deadline:
+            time.sleep(0.01)
+        session.last_active -= 120
+        server.expire_idle_sessions()
+        assert session.session_id not in server.sessions
+    finally:
+        server.close()
+
+
+def test_pending_transcription_does_not_hold_a_twin():
+    server, transcriber = make_server(workers=1)
+    try:
+        listening = server.create_session()
+        typing = server.create_session()
+        audio = server.submit(listening, "audio", ("clip", 16000))
+        text = server.submit(typing, "text", "hello")
+
+        # The only twin answers the text turn while the audio is still being transcribed
+        assert server.wait(text)["response"] == "answer to hello"
+        assert not audio.done()
+
+        transcriber.release.set()
+        result = server.wait(audio)
+        assert result["transcript"] == "heard clip"
+        assert result["response"] == "answer to heard clip"
+    finally:
+        server.close()
+
+
+def test_transcriptions_can_fill_a_batch_beyond_workers():
+    server, transcriber = make_server(workers=1, batch_size=4)
+    try:
+        futures = [server.submit(server.create_session(), "audio", (f"clip{i}", 16000))
+                   for i in range(4)]
+        deadline = time.time() + 5
+        while transcriber.peak < 4 and time.time() < deadline:
+            time.sleep(0.01)
+        assert transcriber.peak == 4
+
+        transcriber.release.set()
+        results = [server.wait(future) for future in futures]
+        assert [r["transcript"] for r in results] == [f"heard clip{i}" for i in range(4)]
+        # LLM turns stay bounded by the twin pool
+        assert FakeTwin.peak == 1
+    finally:
+        server.close()
+
+
+def test_llm_turns_are_bounded_and_sessions_stay_ordered():
+    server, _ = make_server(workers=2)
+    try:
+        sessions = [server.create_session() for _ in range(4)]
+        futures = {session.session_id: [server.submit(session, "text", f"{n}-{turn}")
+                                        for turn in range(3)]
+                   for n, session in enumerate(sessions)}
+
+        for n, session in enumerate(sessions):
+            responses = [server.wait(f)["response"] for f in futures[session.session_id]]
+            assert responses == [f"answer to {n}-{turn}" for turn in range(3)]
+            assert [user_input for user_input, _ in session.memory._recent] == [
+                f"{n}-{turn}" for turn in range(3)]
+        assert FakeTwin.peak == 2
+        assert server.stats()["requests"] == 12
+    finally:
+        server.close()
@@ -0,0 +1,81 @@
+"""Tests for energy-based voice activity detection and endpointing, driven by WAV files"""
+import pytest
+
+np = pytest.importorskip("numpy")
+sf = pytest.importorskip("soundfile")
+
+from digital_twin_like.voice_activity import EndpointRecorder, EnergyVAD, WavFileSource  # noqa: E402
+
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds, frequency=220.0, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def silence(seconds, noise=0.0005):
+    rng = np.random.default_rng(0)
+    return (noise * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+@pytest.fixture
+def wav(tmp_path):
+    def write(*parts):
+        path = tmp_path / f"clip{len(list(tmp_path.iterdir()))}.wav"
+        sf.write(path, np.concatenate(parts), SAMPLE_RATE)
+        return str(path)
+    return write
+
+
+def record(path, **kwargs):
+    blocks = []
+    recorder = EndpointRecorder(**kwargs)
+    audio = recorder.record(WavFileSource(path), on_block=lambda block, speaking: blocks.append(block))
+    return audio, sum(len(b) for b in blocks) / SAMPLE_RATE
+
+
+def test_records_speech_between_silences(wav):
+    audio, read_seconds = record(wav(silence(0.5), tone(1.0), silence(3.0)),
+                                 silence_duration=0.8, pre_roll=0.1)
+    # Trimmed to the tone plus padding on both sides
+    assert 1.0 <= len(audio) / SAMPLE_RATE <= 1.3
+    # Stopped about silence_duration after the tone, not at the end of the file
+    assert 2.2 <= read_seconds <= 2.6
+
+
+def test_detects_speech_already_underway_when_recording_starts(wav):
+    audio, read_seconds = record(wav(tone(1.5), silence(3.0)), silence_duration=0.5)
+    assert len(audio) / SAMPLE_RATE >= 1.4
+    assert read_seconds < 2.3
+
+
+def test_returns_empty_when_nobody_speaks(wav):
+    audio, read_seconds = record(wav(silence(5.0)), no_speech_timeout=2.0)
+    assert len(audio) == 0
+    assert read_seconds == pytest.approx(2.0, abs=0.11)
+
+
+def test_ignores_clicks_shorter_than_min_speech(wav):
+    audio, _ = record(wav(silence(0.5), tone(0.06), silence(2.0)),
+                      min_speech_duration=0.2, no_speech_timeout=2.0)
+    assert len(audio) == 0
+
+
+def test_feed_carries_partial_frames_across_blocks():
+    vad = EnergyVAD(sample_rate=SAMPLE_RATE, frame_duration=0.03)
+    audio = silence(1.0)
+    frames = sum(len(vad.feed(audio[i:i + 1600])) for i in range(0, len(audio), 1600))
+    # 1 s of 30 ms frames, not 3 whole frames per 100 ms block
+    assert frames == SAMPLE_RATE // vad.frame_length
+
+
+def test_noise_floor_is_seeded_below_speech_level():
+    vad = EnergyVAD(sample_rate=SAMPLE_RATE)
+    assert vad.feed(tone(0.3)).all()
+    assert vad.noise_floor <= vad.max_noise_floor
+
+    vad.reset()
+    assert not vad.feed(silence(0.3)).any()
+    assert vad.feed(tone(0.3)).all()
@@ -0,0 +1,59 @@
+"""Tests for barge-in handling in the overlapped voice session"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("soundfile")
+
+from digital_twin_like.conversation_memory import ConversationMemory  # noqa: E402
+from digital_twin_like.voice_session import VoiceSession  # noqa: E402
+
+
+class FakeEngine:
+    def __init__(self):
+        self.stops = 0
+
+    def stop(self):
+        self.stops += 1
+
+
+class FakeTwin:
+    def __init__(self):
+        self.memory = ConversationMemory()
+
+
+def test_barge_in_is_opt_in():
+    session = VoiceSession(FakeTwin())
+    session._engine = FakeEngine()
+    session._speaking_turn = 1
+    session._on_block(None, True)
+    assert session._engine.stops == 0
+    session.close()
+
+
+def test_barge_in_stops_playback_and_drops_the_answer():
+    twin = FakeTwin()
+    twin.memory.add_turn("Where did you study?", "Harvard.")
+    twin.memory.add_turn("Tell me about MERFISH", "MERFISH is an imaging method...")
+
+    session = VoiceSession(twin, barge_in=True)
+    session._engine = FakeEngine()
+    session._turn_done = asyncio.Event()
+    turn = {"turn": 2, "user_input": "Tell me about MERFISH",
+            "response": "MERFISH is an imaging method...", "end_of_speech": time.perf_counter()}
+    session._cancelled[2] = cancelled = threading.Event()
+    session._speaking_turn = 2
+
+    session._on_block(None, True)
+    session._on_block(None, True)
+    assert session._engine.stops == 1
+    assert cancelled.is_set()
+
+    session._finish_turn(turn)
+    assert turn["barged_in"]
+    assert "MERFISH" not in twin.memory.context()
+    assert "Harvard." in twin.memory.context()
+    session.close()